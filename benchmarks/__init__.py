@@ -0,0 +1,2 @@
+# Benchmark suite for my_package; run from the project root with
+# python -m benchmarks --help
@@ -0,0 +1,7 @@
+"""Runs the benchmark suite: python -m benchmarks [--json results.json] [--compare baseline.json]"""
+import sys
+
+from benchmarks import bench_aggregation, bench_basic_math, bench_calculator, bench_data_processor, bench_exceptions, bench_expressions, bench_formats, bench_import, bench_runner, bench_schema, bench_sources # noqa: F401 (registers benchmarks)
+from benchmarks.harness import main
+
+sys.exit(main())
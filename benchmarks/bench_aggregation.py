@@ -0,0 +1,51 @@
+"""Benchmarks for single-pass value statistics against a second pass with Calculator."""
+import random
+from array import array
+
+from src.my_package.aggregation import ValueStats
+from src.my_package.calculator import CompensatedCalculator
+from benchmarks.harness import benchmark
+
+ITEMS = 1_000_000
+PAGE = 1000
+
+def pages() -> list:
+    rng = random.Random(42)
+    return [array("d", [rng.lognormvariate(0, 1) for _ in range(PAGE)]) for _ in range(ITEMS // PAGE)]
+
+@benchmark("value statistics", params={"ValueStats pages": "stats", "Calculator second pass": "calculator"})
+def bench_statistics(how):
+    """Statistics of 1M values arriving in 1k-value pages."""
+    data = pages()
+    if how == "stats":
+        def run():
+            stats = ValueStats()
+            for page in data:
+                stats.update(page)
+            return stats.summary()
+        return run
+
+    def second_pass():
+        """Sum, mean and exact quantiles from the collected values, as done before."""
+        values = [value for page in data for value in page]
+        total = CompensatedCalculator()
+        for value in values:
+            total.add(value)
+        values.sort()
+        return total.total / len(values), [values[int(q * len(values))] for q in (0.5, 0.95, 0.99)]
+    return second_pass
+
+@benchmark("ValueStats.merge", params={"64 shards": 64})
+def bench_merge(shards):
+    """Merging per-shard statistics, as done when combining worker results."""
+    data = pages()[:shards]
+    parts = [ValueStats().update(page) for page in data]
+    for part in parts:
+        part.digest.quantile(0.5) # Compress buffers up front, as saved statistics are
+
+    def run():
+        total = ValueStats()
+        for part in parts:
+            total.merge(part)
+        return total.quantile(0.99)
+    return run
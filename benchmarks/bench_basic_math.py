@@ -0,0 +1,28 @@
+"""Benchmarks for basic_math."""
+from array import array
+
+from src.my_package import basic_math
+from benchmarks.harness import benchmark
+
+@benchmark("basic_math.add")
+def bench_add():
+    return lambda: basic_math.add(2, 3.5)
+
+@benchmark("basic_math.subtract")
+def bench_subtract():
+    return lambda: basic_math.subtract(10, 4)
+
+@benchmark("basic_math.multiply")
+def bench_multiply():
+    return lambda: basic_math.multiply(2.5, 4)
+
+@benchmark("basic_math.add_batch", params={"10k": 10_000})
+def bench_add_batch(n):
+    values = array("d", range(n))
+    return lambda: basic_math.add_batch(values, 1.5, out=values)
+
+@benchmark("basic_math.add loop", params={"10k": 10_000})
+def bench_add_loop(n):
+    """Scalar add called once per element, for comparison with add_batch."""
+    values = list(range(n))
+    return lambda: [basic_math.add(v, 1.5) for v in values]
@@ -0,0 +1,80 @@
+"""Benchmarks for Calculator chains, numeric backends, recorded programs, CalculatorBank and shared use."""
+import random
+import threading
+from fractions import Fraction
+
+from src.my_package.calculator import BACKENDS, Calculator, CalculatorBank, ConcurrentCalculator
+from benchmarks.harness import benchmark
+
+@benchmark("Calculator chain")
+def bench_chain():
+    return lambda: Calculator(10).add(10).subtract(2).multiply(3).divide(4).total
+
+@benchmark("Calculator chain loop", params={"100k": 100_000})
+def bench_chain_loop(n):
+    """The same chain applied eagerly to n starting values."""
+    values = range(n)
+    return lambda: [Calculator(v).add(10).subtract(2).multiply(3).divide(4).total for v in values]
+
+@benchmark("CalculatorProgram.run_batch", params={"100k": 100_000})
+def bench_program(n):
+    program = Calculator.record().add(10).subtract(2).multiply(3).divide(4).compile()
+    values = list(range(n))
+    return lambda: program.run_batch(values)
+
+@benchmark("CalculatorBank.add", params={"100k": 100_000})
+def bench_bank(n):
+    bank = CalculatorBank(n)
+    return lambda: bank.add(1.5)
+
+def ledger(n: int) -> list:
+    """n amounts with cents, in random order and magnitude."""
+    rng = random.Random(42)
+    return [round(rng.uniform(-1e6, 1e6), 2) for _ in range(n)]
+
+@benchmark("Calculator backend sum", params={backend: backend for backend in BACKENDS})
+def bench_backend_sum(backend):
+    """Sums a 10k-amount ledger; the error against the exact sum is printed once during setup."""
+    values = ledger(10_000)
+
+    def total():
+        calculator = Calculator.using(backend)
+        for v in values:
+            calculator.add(v)
+        return calculator.total
+
+    exact = sum(map(Fraction, map(repr, values)), Fraction(0))
+    print(f"  {backend}: error {float(abs(Fraction(total()) - exact)):.3g}")
+    return total
+
+@benchmark("shared calculator stress", params={f"{kind} x{threads}": (kind, threads)
+                                               for kind in ("ConcurrentCalculator", "locked Calculator")
+                                               for threads in (1, 2, 4, 8)})
+def bench_shared(case):
+    """Threads adding 1.0 to one shared calculator 20k times each; fails if any update is lost."""
+    kind, threads = case
+    per_thread = 20_000
+
+    def run():
+        if kind == "ConcurrentCalculator":
+            calculator = ConcurrentCalculator()
+            add = calculator.add
+        else:
+            calculator, lock = Calculator(), threading.Lock()
+
+            def add(value):
+                with lock:
+                    calculator.add(value)
+
+        def work():
+            for _ in range(per_thread):
+                add(1.0)
+
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if calculator.total != threads * per_thread:
+            raise AssertionError(f"Lost updates: {calculator.total} != {threads * per_thread}")
+    return run
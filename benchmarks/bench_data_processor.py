@@ -0,0 +1,41 @@
+"""Benchmarks for data_processor, using a local stub server for fetches."""
+import os
+import shutil
+import tempfile
+
+from src.my_package import data_processor
+from benchmarks.harness import benchmark
+from tests.stub_server import start_stub_server
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+def make_payload(n: int) -> dict:
+    return {"count": n, "next": None, "previous": None,
+            "results": [{"name": f"Item {i}", "value": i} for i in range(n)]}
+
+@benchmark("fetch_data_from_api", params={"new connection": False, "pooled session": True})
+def bench_fetch(pooled):
+    server = start_stub_server()
+    server.routes["/data"] = (200, make_payload(10))
+    url = f"{server.url}/data"
+    session = data_processor.create_session() if pooled else None
+    yield lambda: data_processor.fetch_data_from_api(url, session)
+    if session is not None:
+        session.close()
+    server.stop()
+
+@benchmark("process_and_save_data", params=SIZES)
+def bench_process_and_save(n):
+    directory = tempfile.mkdtemp()
+    data = make_payload(n)
+    path = os.path.join(directory, "out.json")
+    yield lambda: data_processor.process_and_save_data(data, path)
+    shutil.rmtree(directory)
+
+@benchmark("stream_process_and_save", params=SIZES)
+def bench_stream_process_and_save(n):
+    directory = tempfile.mkdtemp()
+    items = make_payload(n)["results"]
+    path = os.path.join(directory, "out.json")
+    yield lambda: data_processor.stream_process_and_save(iter(items), path)
+    shutil.rmtree(directory)
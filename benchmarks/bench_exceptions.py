@@ -0,0 +1,42 @@
+"""Benchmarks for the exceptions module."""
+import math
+
+from src.my_package import exceptions
+from benchmarks.harness import benchmark
+
+@benchmark("exceptions.divide_by_zero ok")
+def bench_divide():
+    return lambda: exceptions.divide_by_zero(10, 4)
+
+@benchmark("exceptions.divide_by_zero raise")
+def bench_divide_raise():
+    def divide():
+        try:
+            exceptions.divide_by_zero(10, 0)
+        except ZeroDivisionError:
+            pass
+    return divide
+
+def _pairs(n):
+    """n pairs, half of them with a zero divisor."""
+    return [(i, i % 7 + 1 if i % 2 else 0) for i in range(n)]
+
+@benchmark("exceptions.divide_pairs substitute", params={"100k": 100_000})
+def bench_divide_pairs(n):
+    pairs = _pairs(n)
+    return lambda: exceptions.divide_pairs(pairs, on_zero_division="substitute")
+
+@benchmark("exceptions.divide_by_zero loop", params={"100k": 100_000})
+def bench_divide_loop(n):
+    """The per-pair try/except loop that divide_pairs replaces."""
+    pairs = _pairs(n)
+
+    def divide_all():
+        values = []
+        for a, b in pairs:
+            try:
+                values.append(exceptions.divide_by_zero(a, b))
+            except ZeroDivisionError:
+                values.append(math.nan)
+        return values
+    return divide_all
@@ -0,0 +1,34 @@
+"""Benchmarks for compiled formulas against evaluating them as chains of calls."""
+import random
+
+from src.my_package.basic_math import add, multiply, subtract
+from src.my_package.calculator import Calculator
+from src.my_package.expressions import compile_expression
+from benchmarks.harness import benchmark
+
+FORMULA = "(x + 3) * y - z"
+
+def columns(n: int) -> dict:
+    rng = random.Random(42)
+    return {name: [rng.uniform(-100, 100) for _ in range(n)] for name in ("x", "y", "z")}
+
+@benchmark("formula rows", params={"basic_math chain": "basic_math", "Calculator chain": "calculator",
+                                   "compiled evaluate": "evaluate", "compiled batch": "batch"})
+def bench_formula_rows(how):
+    """(x + 3) * y - z over 100k rows."""
+    data = columns(100_000)
+    xs, ys, zs = data["x"], data["y"], data["z"]
+    if how == "basic_math":
+        return lambda: [subtract(multiply(add(x, 3), y), z) for x, y, z in zip(xs, ys, zs)]
+    if how == "calculator":
+        return lambda: [Calculator(x).add(3).multiply(y).subtract(z).total for x, y, z in zip(xs, ys, zs)]
+    if how == "evaluate":
+        rows = [{"x": x, "y": y, "z": z} for x, y, z in zip(xs, ys, zs)]
+        return lambda: [compile_expression(FORMULA).evaluate(row) for row in rows]
+    return lambda: compile_expression(FORMULA).evaluate_batch(data)
+
+@benchmark("compile_expression", params={"cached": True, "uncached": False})
+def bench_compile(cached):
+    if cached:
+        return lambda: compile_expression(FORMULA)
+    return lambda: compile_expression.__wrapped__(FORMULA)
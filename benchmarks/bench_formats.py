@@ -0,0 +1,32 @@
+"""Round-trip benchmarks for the output formats."""
+import io
+import os
+import tempfile
+
+from src.my_package import formats
+from benchmarks.harness import benchmark
+
+ITEMS = 100_000
+
+@benchmark("formats round trip", params={format: format for format in formats.FORMATS})
+def bench_round_trip(format):
+    processed = {"count": ITEMS, "items": [f"Item {i}" for i in range(ITEMS)], "timestamp": 1234567890.0}
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+
+    def round_trip():
+        with open(path, 'wb') as f:
+            formats.dump(processed, f, format)
+        formats.load(path, format)
+
+    yield round_trip
+    os.remove(path)
+
+@benchmark("formats size", params={format: format for format in formats.FORMATS})
+def bench_size(format):
+    """Times an in-memory dump; the file size is printed once during setup."""
+    processed = {"count": ITEMS, "items": [f"Item {i}" for i in range(ITEMS)], "timestamp": 1234567890.0}
+    buffer = io.BytesIO()
+    formats.dump(processed, buffer, format)
+    print(f"  {format}: {len(buffer.getvalue()) / 1e6:.2f} MB for {ITEMS} items")
+    return lambda: formats.dump(processed, io.BytesIO(), format)
@@ -0,0 +1,30 @@
+"""Benchmarks for how long importing the package takes, measured with ``-X importtime``.
+
+Each round imports the module in a fresh interpreter and reports the
+cumulative import time Python records for it, so interpreter startup is
+not counted.
+"""
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import benchmark, self_timed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_time(module: str) -> float:
+    """Imports module in a new interpreter and returns its cumulative import time in seconds."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"No import time reported for {module}")
+
+@benchmark("import", params={"package": "src.my_package", "data_processor": "src.my_package.data_processor",
+                             "async_data_processor": "src.my_package.async_data_processor"})
+def bench_import(module):
+    """Cold import of the package and of the pipeline modules."""
+    return self_timed(lambda: import_time(module))
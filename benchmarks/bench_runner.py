@@ -0,0 +1,23 @@
+"""Benchmarks for the multi-process job runner, by worker count."""
+import os
+import shutil
+import tempfile
+
+from src.my_package.runner import JobRunner
+from benchmarks.harness import benchmark
+from benchmarks.bench_data_processor import make_payload
+from tests.stub_server import start_stub_server
+
+JOBS = 200
+
+@benchmark("JobRunner.run", params={f"{n} workers": n for n in (1, 2, 4)})
+def bench_runner(workers):
+    """Each job fetches a 10k-item page, so processing dominates."""
+    server = start_stub_server()
+    server.routes["/data"] = (200, make_payload(10_000))
+    directory = tempfile.mkdtemp()
+    jobs = [(f"{server.url}/data", os.path.join(directory, f"out_{i}.json")) for i in range(JOBS)]
+    runner = JobRunner(max_workers=workers, chunk_size=8)
+    yield lambda: runner.run(jobs)
+    shutil.rmtree(directory)
+    server.stop()
@@ -0,0 +1,34 @@
+"""Benchmarks for compiled payload schemas against per-item dict lookups."""
+from src.my_package.schema import Field, PayloadSchema
+from benchmarks.harness import benchmark
+from benchmarks.bench_data_processor import make_payload
+
+SIZES = {"1M": 1_000_000}
+
+@benchmark("names list comprehension", params=SIZES)
+def bench_comprehension(n):
+    """The extraction process_and_save_data used before schemas."""
+    results = make_payload(n)["results"]
+    return lambda: [item.get('name', 'Unknown') for item in results]
+
+@benchmark("PayloadSchema.extract names", params=SIZES)
+def bench_names(n):
+    payload = make_payload(n)
+    schema = PayloadSchema(Field("name", default="Unknown"))
+    return lambda: schema.extract(payload)
+
+@benchmark("PayloadSchema.extract typed", params=SIZES)
+def bench_typed(n):
+    """Validated str and int columns."""
+    payload = make_payload(n)
+    schema = PayloadSchema(Field("name", str, default="Unknown"), Field("value", int))
+    return lambda: schema.extract(payload)
+
+@benchmark("PayloadSchema.extract with invalid rows", params=SIZES)
+def bench_invalid_rows(n):
+    """Every 1000th item lacks 'value', so the per-row path is taken."""
+    payload = make_payload(n)
+    for item in payload["results"][::1000]:
+        del item["value"]
+    schema = PayloadSchema(Field("name", str, default="Unknown"), Field("value", int))
+    return lambda: schema.extract(payload)
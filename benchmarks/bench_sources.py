@@ -0,0 +1,56 @@
+"""Benchmarks for reading archived API dumps from disk."""
+import json
+import os
+import shutil
+import tempfile
+
+from src.my_package import sources
+from benchmarks.harness import benchmark
+from benchmarks.bench_data_processor import make_payload
+
+ITEMS = 1_000_000
+
+def write_dump(directory: str, format: str) -> str:
+    payload = make_payload(ITEMS)
+    path = os.path.join(directory, f"dump.{format}")
+    with open(path, 'w', encoding='utf-8') as f:
+        if format == "json":
+            json.dump(payload, f)
+        else:
+            f.writelines(json.dumps(item) + "\n" for item in payload["results"])
+    return path
+
+@benchmark("names from dump", params={"ndjson readline": ("ndjson", False), "ndjson mmap": ("ndjson", True),
+                                      "json stream": ("json", False), "json mmap": ("json", True)})
+def bench_names(case):
+    """Extracts every name of a 1M-item dump."""
+    format, mapped = case
+    directory = tempfile.mkdtemp()
+    path = write_dump(directory, format)
+
+    def names():
+        if mapped:
+            with sources.MappedDump(path) as dump:
+                return list(dump.iter_names())
+        if format == "json":
+            return [item.get('name', 'Unknown') for item in sources.iter_json_results(path)]
+        return [item.get('name', 'Unknown') for item in sources.iter_ndjson_results(path)]
+
+    yield names
+    shutil.rmtree(directory)
+
+@benchmark("first item from dump", params={"json load": "load", "json mmap": "mmap"})
+def bench_first_item(how):
+    """Time until the first item of a 1M-item JSON dump is available."""
+    directory = tempfile.mkdtemp()
+    path = write_dump(directory, "json")
+
+    def first_item():
+        if how == "load":
+            with open(path, 'rb') as f:
+                return json.load(f)["results"][0]
+        with sources.MappedDump(path) as dump:
+            return next(dump.iter_results())
+
+    yield first_item
+    shutil.rmtree(directory)
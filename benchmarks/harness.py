@@ -0,0 +1,158 @@
+"""Minimal benchmark harness: registration, timed runs, JSON results and baseline comparison.
+
+A benchmark is a factory registered with ``@benchmark``. It is called once
+to set things up and returns the callable to time. It may instead be a
+generator that yields the callable and cleans up after the ``yield``.
+With ``params``, one benchmark is registered per parameter value and the
+factory receives the value::
+
+    @benchmark("process_and_save_data", params={"1k": 1_000, "1M": 1_000_000})
+    def bench_process(n):
+        data = make_payload(n)
+        return lambda: process_and_save_data(data, path)
+
+A callable wrapped with ``self_timed`` measures itself and returns the
+seconds it took; it is called once per round and its result is used in
+place of the harness's own clock, e.g. when the work happens in a
+subprocess whose startup should not be counted.
+"""
+import argparse
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import NamedTuple
+
+class Benchmark(NamedTuple):
+    name: str
+    factory: object
+    param: object
+
+REGISTRY = []
+
+def benchmark(name: str, params: dict | None = None):
+    """Registers the decorated factory under name (one entry per param)."""
+    def register(factory):
+        if params is None:
+            REGISTRY.append(Benchmark(name, factory, None))
+        else:
+            for label, value in params.items():
+                REGISTRY.append(Benchmark(f"{name}[{label}]", factory, value))
+        return factory
+    return register
+
+def self_timed(func):
+    """Marks func as returning its own duration in seconds."""
+    func.self_timed = True
+    return func
+
+def _calibrate(func, min_time: float, clock) -> int:
+    """Returns how many calls make one round last at least min_time."""
+    number = 1
+    while True:
+        start = clock()
+        for _ in range(number):
+            func()
+        if clock() - start >= min_time or number >= 1 << 30:
+            return number
+        number *= 10
+
+def time_callable(func, rounds: int = 5, warmup: int = 1, min_time: float = 0.05,
+                  clock=time.perf_counter) -> dict:
+    """Times func over several rounds and returns per-call statistics in seconds."""
+    for _ in range(warmup):
+        func()
+    if getattr(func, "self_timed", False):
+        number = 1
+        times = [func() for _ in range(rounds)]
+    else:
+        number = _calibrate(func, min_time, clock)
+        times = []
+        for _ in range(rounds):
+            start = clock()
+            for _ in range(number):
+                func()
+            times.append((clock() - start) / number)
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "rounds": rounds, "number": number}
+
+def run(benchmarks, rounds: int = 5, warmup: int = 1, min_time: float = 0.05, report=None) -> dict:
+    """Runs benchmarks and returns machine-readable results."""
+    results = {}
+    for bench in benchmarks:
+        made = bench.factory() if bench.param is None else bench.factory(bench.param)
+        if not inspect.isgenerator(made):
+            results[bench.name] = time_callable(made, rounds, warmup, min_time)
+        else:
+            func = next(made)
+            try:
+                results[bench.name] = time_callable(func, rounds, warmup, min_time)
+            except BaseException:
+                made.close()
+                raise
+            next(made, None) # Runs the cleanup after the yield
+        if report is not None:
+            report(bench.name, results[bench.name])
+    return {"machine": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                        "platform": platform.platform()},
+            "benchmarks": results}
+
+def compare(results: dict, baseline: dict, threshold: float = 0.10, stat: str = "median") -> list:
+    """Returns (name, baseline, current, change) for every benchmark slower than threshold allows.
+
+    ``change`` is the relative slowdown, e.g. 0.25 for 25 % slower.
+    Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        change = current[stat] / previous[stat] - 1
+        if change > threshold:
+            regressions.append((name, previous[stat], current[stat], change))
+    return regressions
+
+def _print_result(name: str, result: dict) -> None:
+    print(f"{name:<50} {result['median'] * 1e6:>14.3f} us  (min {result['min'] * 1e6:.3f}, "
+          f"stdev {result['stdev'] * 1e6:.3f}, {result['rounds']}x{result['number']})")
+
+def main(argv=None) -> int:
+    """Command-line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(description="Run the my_package benchmark suite.")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per round")
+    parser.add_argument("--json", metavar="PATH", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if slower than this results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed relative slowdown before failing (default 0.10)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    selected = [bench for bench in REGISTRY
+                if not args.filter or any(text in bench.name for text in args.filter)]
+    if args.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+
+    results = run(selected, args.rounds, args.warmup, args.min_time, report=_print_result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before * 1e6:.3f} us -> {after * 1e6:.3f} us (+{change:.1%})",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
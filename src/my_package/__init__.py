@@ -1 +1,64 @@
-# This file makes src/my_package a Python package
\ No newline at end of file
+# This file makes src/my_package a Python package
+"""my_package: arithmetic helpers and a fetch-process-save data pipeline
+
+The names below are importable from the package itself, e.g.
+``from my_package import complex_data_pipeline``. Submodules are only
+imported when one of their names is first used, so ``import my_package``
+does not pay for requests, the pipeline or the numeric backends until
+they are needed.
+"""
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "add": "basic_math",
+    "subtract": "basic_math",
+    "multiply": "basic_math",
+    "Calculator": "calculator",
+    "CalculationError": "calculator",
+    "CalculatorBank": "calculator",
+    "ConcurrentCalculator": "calculator",
+    "ExternalServiceError": "data_processor",
+    "create_session": "data_processor",
+    "fetch_data_from_api": "data_processor",
+    "process_and_save_data": "data_processor",
+    "complex_data_pipeline": "data_processor",
+    "concurrent_data_pipeline": "data_processor",
+    "streaming_data_pipeline": "data_processor",
+    "resumable_data_pipeline": "data_processor",
+    "file_data_pipeline": "data_processor",
+    "gather_pipelines": "async_data_processor",
+    "JobRunner": "runner",
+    "run_jobs": "runner",
+    "ResponseCache": "cache",
+    "RetryPolicy": "retry",
+    "RateLimiter": "ratelimit",
+    "AtomicWriter": "writers",
+    "CheckpointStore": "checkpoint",
+    "PayloadSchema": "schema",
+    "Field": "schema",
+    "MappedDump": "sources",
+    "ValueStats": "aggregation",
+    "compile_expression": "expressions",
+    "DivisionByZeroError": "expressions",
+}
+
+_SUBMODULES = frozenset({
+    "aggregation", "async_data_processor", "basic_math", "cache", "calculator", "checkpoint", "cli", "data_processor",
+    "exceptions", "expressions", "formats", "instrumentation", "ratelimit", "retry", "runner", "schema", "sources", "writers",
+})
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value # Later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBMODULES)
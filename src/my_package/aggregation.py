@@ -0,0 +1,259 @@
+"""Single-pass, mergeable statistics over a numeric field of the result items
+
+ValueStats summarizes values as they stream past: count, a compensated
+sum, min and max, mean and variance (Welford's method) and approximate
+quantiles from a t-digest. Every part merges exactly (the quantiles
+approximately), so statistics computed per page, per thread, per process
+or per shard combine into the statistics of the whole::
+
+    stats = ValueStats()
+    for page in pages:
+        stats.update(page_values)
+    total = merge_saved(stats_path(path) for path in shard_outputs)
+    total.summary()["p99"]
+
+The pipeline functions take an ``aggregate`` field name and save the
+statistics of that field next to their output (see ``stats_path``).
+"""
+import json
+import math
+import operator
+from bisect import bisect_right
+from itertools import accumulate, repeat
+
+from .calculator import CompensatedCalculator
+from .writers import AtomicWriter, default_writer
+
+class TDigest:
+    """Mergeable sketch of a distribution for estimating quantiles.
+
+    Values are buffered and periodically merged into at most about
+    ``compression`` centroids, which are small near the tails and larger
+    in the middle (the k1 scale function), so extreme quantiles stay
+    accurate. Two digests merge by combining their centroids.
+    """
+    def __init__(self, compression: float = 100.0):
+        if compression < 10:
+            raise ValueError("compression must be at least 10")
+        self.compression = compression
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = [] # Centroid means, sorted
+        self._weights = []
+        self._buffer = []
+        self._buffer_limit = max(1000, int(50 * compression))
+
+    def update(self, values) -> None:
+        """Adds every value of a sequence."""
+        if not len(values):
+            return
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        self._buffer.extend(values)
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """Adds everything other has seen."""
+        other._compress()
+        if not other._means:
+            return
+        self._compress()
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._means, self._weights = self._cluster(*_merge_sorted(self._means, self._weights,
+                                                                  other._means, other._weights))
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        self._buffer.sort()
+        self._means, self._weights = self._cluster(*_merge_sorted(self._means, self._weights,
+                                                                  self._buffer, [1.0] * len(self._buffer)))
+        self._buffer = []
+
+    def _cluster(self, means: list, weights: list) -> tuple[list, list]:
+        """Groups sorted weighted points into centroids no wider than the scale function allows."""
+        cumulative = list(accumulate(weights))
+        total = cumulative[-1]
+        k_max = self.compression / 4
+        new_means, new_weights = [], []
+        start, below = 0, 0.0
+        while start < len(means):
+            k = self.compression / (2 * math.pi) * math.asin(2 * below / total - 1) + 1
+            limit = total if k >= k_max else (math.sin(2 * math.pi * k / self.compression) + 1) / 2 * total
+            end = max(bisect_right(cumulative, limit, start), start + 1)
+            weight = cumulative[end - 1] - below
+            new_means.append(sum(map(operator.mul, means[start:end], weights[start:end])) / weight)
+            new_weights.append(weight)
+            start, below = end, cumulative[end - 1]
+        return new_means, new_weights
+
+    def quantile(self, q: float) -> float:
+        """Returns the estimated q-quantile (0 <= q <= 1); NaN if no values were added."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        self._compress()
+        means, weights = self._means, self._weights
+        if not means:
+            return math.nan
+        if len(means) == 1:
+            return means[0]
+        total = sum(weights)
+        index = q * total
+        # Each centroid is taken to sit at the middle of its weight; interpolate between neighbours
+        if index < weights[0] / 2:
+            return self.min + (means[0] - self.min) * index / (weights[0] / 2)
+        if index > total - weights[-1] / 2:
+            return self.max - (self.max - means[-1]) * (total - index) / (weights[-1] / 2)
+        position = weights[0] / 2
+        for i in range(len(means) - 1):
+            step = (weights[i] + weights[i + 1]) / 2
+            if position + step >= index:
+                return means[i] + (means[i + 1] - means[i]) * (index - position) / step
+            position += step
+        return means[-1]
+
+    def to_dict(self) -> dict:
+        self._compress()
+        return {"compression": self.compression, "min": self.min if self._means else None,
+                "max": self.max if self._means else None, "means": self._means, "weights": self._weights}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "TDigest":
+        digest = cls(state["compression"])
+        if state["means"]:
+            digest.min, digest.max = state["min"], state["max"]
+            digest._means, digest._weights = list(state["means"]), list(state["weights"])
+        return digest
+
+def _merge_sorted(means_a: list, weights_a: list, means_b: list, weights_b: list) -> tuple[list, list]:
+    """Merges two sorted weighted point lists, copying runs of the longer one between points of the shorter."""
+    if len(means_a) > len(means_b):
+        means_a, weights_a, means_b, weights_b = means_b, weights_b, means_a, weights_a
+    means, weights = [], []
+    start = 0
+    for mean, weight in zip(means_a, weights_a):
+        end = bisect_right(means_b, mean, start)
+        means += means_b[start:end]
+        weights += weights_b[start:end]
+        means.append(mean)
+        weights.append(weight)
+        start = end
+    means += means_b[start:]
+    weights += weights_b[start:]
+    return means, weights
+
+class ValueStats:
+    """Count, sum, min, max, mean, variance and quantiles of a stream of numbers.
+
+    ``missing`` counts items that had no usable value, as reported by the
+    caller. ``variance`` is the sample variance.
+    """
+    def __init__(self, compression: float = 100.0):
+        self.count = 0
+        self.missing = 0
+        self._sum = CompensatedCalculator()
+        self._mean = 0.0
+        self._m2 = 0.0 # Sum of squared deviations from the mean
+        self.digest = TDigest(compression)
+
+    def update(self, values, missing: int = 0) -> "ValueStats":
+        """Adds a batch of values, e.g. the values of one page."""
+        self.missing += missing
+        n = len(values)
+        if not n:
+            return self
+        batch_sum = math.fsum(values)
+        batch_mean = batch_sum / n
+        deviations = list(map(operator.sub, values, repeat(batch_mean, n)))
+        self._combine(n, batch_mean, sum(map(operator.mul, deviations, deviations)))
+        self._sum.add(batch_sum)
+        self.digest.update(values)
+        return self
+
+    def _combine(self, n: int, mean: float, m2: float) -> None:
+        """Chan et al.'s update of the running mean and squared deviations with another group's."""
+        total = self.count + n
+        delta = mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def merge(self, other: "ValueStats") -> "ValueStats":
+        """Adds the statistics of values seen by another ValueStats (another page, worker or shard)."""
+        self.missing += other.missing
+        if not other.count:
+            return self
+        self._combine(other.count, other._mean, other._m2)
+        self._sum.add(other._sum._current_value).add(other._sum._compensation)
+        self.digest.merge(other.digest)
+        return self
+
+    @property
+    def sum(self) -> float:
+        return self._sum.total
+
+    @property
+    def min(self) -> float | None:
+        return self.digest.min if self.count else None
+
+    @property
+    def max(self) -> float | None:
+        return self.digest.max if self.count else None
+
+    @property
+    def mean(self) -> float | None:
+        return self._mean if self.count else None
+
+    @property
+    def variance(self) -> float | None:
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    def quantile(self, q: float) -> float | None:
+        """Returns the estimated q-quantile (0 <= q <= 1), or None without values."""
+        return self.digest.quantile(q) if self.count else None
+
+    def summary(self) -> dict:
+        """Returns the statistics as a flat dict (None where undefined)."""
+        variance = self.variance
+        return {"count": self.count, "missing": self.missing, "sum": self.sum, "min": self.min, "max": self.max,
+                "mean": self.mean, "variance": variance, "stdev": None if variance is None else math.sqrt(variance),
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99)}
+
+    def to_dict(self) -> dict:
+        """Returns the summary plus the state needed to merge these statistics later."""
+        return {**self.summary(), "state": {"sum": self._sum._current_value, "compensation": self._sum._compensation,
+                                            "mean": self._mean, "m2": self._m2, "digest": self.digest.to_dict()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ValueStats":
+        state = data["state"]
+        stats = cls(state["digest"]["compression"])
+        stats.count, stats.missing = data["count"], data["missing"]
+        stats._sum._current_value, stats._sum._compensation = state["sum"], state["compensation"]
+        stats._mean, stats._m2 = state["mean"], state["m2"]
+        stats.digest = TDigest.from_dict(state["digest"])
+        return stats
+
+    def save(self, path: str, writer: AtomicWriter | None = None) -> None:
+        """Writes the statistics to path as JSON, atomically."""
+        with (writer or default_writer).open(path) as f:
+            f.write(json.dumps(self.to_dict()).encode('utf-8'))
+
+    @classmethod
+    def load(cls, path: str) -> "ValueStats":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+def stats_path(output_filepath: str) -> str:
+    """Returns where the statistics of an output file are saved."""
+    return output_filepath + ".stats.json"
+
+def merge_saved(paths) -> ValueStats:
+    """Loads and merges saved statistics, e.g. of every shard of a run."""
+    total = None
+    for path in paths:
+        stats = ValueStats.load(path)
+        total = stats if total is None else total.merge(stats)
+    return ValueStats() if total is None else total
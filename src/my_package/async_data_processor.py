@@ -0,0 +1,149 @@
+"""Asyncio counterparts of the data_processor pipeline
+
+Requests are made with aiohttp when it is installed (``pip install
+".[async]"``), imported on first use as it is slow to import; otherwise
+the blocking requests-based fetch runs in a worker thread. File writes and
+large JSON decodes are always moved off the event loop. Errors follow the
+same contracts as the blocking functions: ExternalServiceError for fetch
+failures, TypeError and ValueError for bad input data, IOError for failed
+writes.
+"""
+import asyncio
+import json
+import logging
+
+from . import data_processor, formats
+from .data_processor import ExternalServiceError
+from .instrumentation import stage
+from .writers import AtomicWriter
+
+logger = logging.getLogger(__name__)
+
+# Responses larger than this are decoded in a worker thread
+_OFFLOAD_DECODE_BYTES = 1 << 20
+
+_NOT_LOADED = object()
+aiohttp = _NOT_LOADED # The aiohttp module once loaded, or None if it is not installed
+
+def _aiohttp():
+    global aiohttp
+    if aiohttp is _NOT_LOADED:
+        try:
+            import aiohttp
+        except ImportError: # Optional dependency
+            aiohttp = None
+    return aiohttp
+
+def create_async_session(limit: int = 100, limit_per_host: int = 10):
+    """Creates a session for the async functions, to be closed by the caller.
+
+    Returns an aiohttp.ClientSession with the given connection limits, or a
+    requests Session (see data_processor.create_session) without aiohttp.
+    Call it from a running event loop.
+    """
+    aiohttp = _aiohttp()
+    if aiohttp is None:
+        return data_processor.create_session(pool_maxsize=limit_per_host)
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host))
+
+async def _close(session) -> None:
+    if _aiohttp() is None:
+        session.close()
+    else:
+        await session.close()
+
+async def _fetch_with_aiohttp(api_url: str, session, simulated_latency: float):
+    aiohttp = _aiohttp()
+    if simulated_latency:
+        await asyncio.sleep(simulated_latency) # Simulate network delay
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession()
+    try:
+        with stage("fetch"):
+            async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                response.raise_for_status() # Raises ClientResponseError for 4xx or 5xx
+                body = await response.read()
+    finally:
+        if own_session:
+            await session.close()
+    with stage("decode") as span:
+        span.bytes = len(body)
+        if len(body) > _OFFLOAD_DECODE_BYTES:
+            return await asyncio.to_thread(json.loads, body)
+        return json.loads(body)
+
+async def fetch_data_from_api_async(api_url: str, session=None, simulated_latency: float = 0.0) -> dict:
+    """Fetches JSON data from an external API without blocking the event loop.
+
+    ``session`` comes from create_async_session and is reused between calls
+    when given. ``simulated_latency`` adds an artificial delay (in seconds)
+    before the request.
+    """
+    aiohttp = _aiohttp()
+    if aiohttp is None:
+        return await asyncio.to_thread(data_processor.fetch_data_from_api, api_url, session,
+                                       simulated_latency=simulated_latency)
+    logger.debug("Attempting to fetch data from %s", api_url)
+    try:
+        data = await _fetch_with_aiohttp(api_url, session, simulated_latency)
+        logger.debug("Data fetched successfully from %s", api_url)
+        return data
+    except asyncio.TimeoutError:
+        logger.warning("API request to %s timed out.", api_url)
+        raise ExternalServiceError(f"Timeout accessing {api_url}")
+    except (aiohttp.ClientError, ValueError) as e:
+        logger.warning("API request to %s failed: %s", api_url, e)
+        raise ExternalServiceError(f"Failed to fetch data from {api_url}: {e}")
+
+async def process_and_save_data_async(input_data: dict, output_filepath: str, format: str = "json",
+                                      writer: AtomicWriter | None = None) -> None:
+    """Processes fetched data and saves it to a file from a worker thread.
+
+    Input is validated before any thread is used, so TypeError and
+    ValueError are raised straight away.
+    """
+    formats.check_format(format)
+    if not isinstance(input_data, dict):
+        raise TypeError("Input data must be a dictionary.")
+    if 'results' not in input_data or not isinstance(input_data['results'], list):
+        raise ValueError("Input data must contain a 'results' list.")
+    await asyncio.to_thread(data_processor.process_and_save_data, input_data, output_filepath, format, writer)
+
+async def complex_data_pipeline_async(api_url: str, output_file: str, session=None, format: str = "json",
+                                      writer: AtomicWriter | None = None) -> bool:
+    """Full pipeline: fetch, process, save."""
+    try:
+        with stage("pipeline"):
+            data = await fetch_data_from_api_async(api_url, session)
+            await process_and_save_data_async(data, output_file, format=format, writer=writer)
+        return True
+    except (ExternalServiceError, TypeError, ValueError, IOError) as e:
+        logger.warning("Data pipeline failed: %s", e)
+        return False
+    except Exception:
+        logger.exception("Unexpected error in data pipeline")
+        return False
+
+async def gather_pipelines(jobs, limit: int = 8, session=None, format: str = "json",
+                           writer: AtomicWriter | None = None) -> list[bool]:
+    """Runs complex_data_pipeline_async for many (api_url, output_file) jobs.
+
+    At most ``limit`` pipelines run at once. Returns the result for each
+    job, in input order. A shared session is created (and closed) when none
+    is given.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    own_session = session is None
+    if own_session:
+        session = create_async_session(limit_per_host=limit)
+
+    async def run_job(api_url, output_file):
+        async with semaphore:
+            return await complex_data_pipeline_async(api_url, output_file, session, format, writer)
+
+    try:
+        return await asyncio.gather(*(run_job(api_url, output_file) for api_url, output_file in jobs))
+    finally:
+        if own_session:
+            await _close(session)
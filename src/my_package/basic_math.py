@@ -1,4 +1,10 @@
 """Basic math operations"""
+import numbers
+import operator
+import sys
+from array import array
+from functools import partial
+from itertools import islice, repeat
 
 def add(a: int | float, b: int | float) -> int | float:
     """Adds two numbers."""
@@ -10,4 +16,92 @@ def subtract(a: int | float, b: int | float) -> int | float:
 
 def multiply(a: int | float, b: int | float) -> int | float:
     """Multiplies two numbers."""
-    return a * b
\ No newline at end of file
+    return a * b
+
+# --- Batch (elementwise) variants ---
+
+# Elements written into a list or array out buffer per slice assignment
+_STORE_CHUNK = 1 << 12
+
+def _numpy_for(*operands):
+    """Returns NumPy if any operand is an ndarray, otherwise None.
+
+    NumPy is never imported here: if the caller has not imported it, no
+    operand can be an ndarray and the pure-Python path is used.
+    """
+    np = sys.modules.get("numpy")
+    if np is not None and any(isinstance(x, np.ndarray) for x in operands):
+        return np
+    return None
+
+def _broadcast(a, b):
+    """Returns two equal-length iterables and their length."""
+    a_scalar = isinstance(a, numbers.Number)
+    b_scalar = isinstance(b, numbers.Number)
+    if a_scalar and b_scalar:
+        raise TypeError("At least one operand must be a sequence.")
+    if a_scalar:
+        return repeat(a), b, len(b)
+    if b_scalar:
+        return a, repeat(b), len(a)
+    len_a, len_b = len(a), len(b)
+    if len_a == len_b:
+        return a, b, len_a
+    if len_a == 1:
+        return repeat(a[0]), b, len_b
+    if len_b == 1:
+        return a, repeat(b[0]), len_a
+    raise ValueError(f"Operands could not be broadcast together: {len_a} vs {len_b}")
+
+def _store(out, values, n: int):
+    """Writes values into the preallocated buffer out.
+
+    Lists and arrays are filled a slice of _STORE_CHUNK elements at a time,
+    so the only temporary is one chunk however long out is; a value that
+    cannot be stored leaves the chunks before it already written.
+    """
+    if len(out) != n:
+        raise ValueError(f"Output buffer has length {len(out)}, expected {n}")
+    if isinstance(out, (list, array)):
+        chunk = list if isinstance(out, list) else partial(array, out.typecode)
+        for start in range(0, n, _STORE_CHUNK):
+            out[start:start + _STORE_CHUNK] = chunk(islice(values, _STORE_CHUNK))
+    else:
+        # memoryview or any other writable sequence
+        for i, value in enumerate(values):
+            out[i] = value
+    return out
+
+def _batch(op, ufunc_name: str, a, b, out):
+    np = _numpy_for(a, b, out)
+    if np is not None:
+        return getattr(np, ufunc_name)(a, b, out=out)
+    left, right, n = _broadcast(a, b)
+    values = map(op, left, right)
+    if out is None:
+        return list(values)
+    return _store(out, values, n)
+
+def add_batch(a, b, out=None):
+    """Adds two operands elementwise.
+
+    Operands may be sequences, ``array.array`` objects, memoryviews or NumPy
+    arrays; a scalar or length-1 operand is broadcast against the other one.
+    Returns a list (or an ndarray on the NumPy path) unless ``out`` is given,
+    in which case results are written into ``out`` and it is returned.
+    """
+    return _batch(operator.add, "add", a, b, out)
+
+def subtract_batch(a, b, out=None):
+    """Subtracts the second operand from the first elementwise.
+
+    See ``add_batch`` for accepted operand types and broadcasting rules.
+    """
+    return _batch(operator.sub, "subtract", a, b, out)
+
+def multiply_batch(a, b, out=None):
+    """Multiplies two operands elementwise.
+
+    See ``add_batch`` for accepted operand types and broadcasting rules.
+    """
+    return _batch(operator.mul, "multiply", a, b, out)
@@ -0,0 +1,163 @@
+"""Response cache for API fetches
+
+An in-process LRU with per-entry TTL, an optional on-disk copy, conditional
+revalidation of expired entries (ETag / Last-Modified and 304 responses) and
+coalescing of concurrent requests for the same URL.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .writers import AtomicWriter
+
+class _Entry:
+    __slots__ = ("data", "etag", "last_modified", "expires_at")
+
+    def __init__(self, data, etag, last_modified, expires_at):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def validators(self) -> dict:
+        """Returns the headers for a conditional request."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """Caches decoded API responses by URL.
+
+    Up to ``max_entries`` responses are kept in memory, least recently used
+    first out. Each entry is fresh for ``ttl`` seconds; an expired entry
+    that has an ETag or Last-Modified value is revalidated with a
+    conditional request instead of being fetched again. When
+    ``directory`` is given, responses are also kept there (one JSON file
+    per URL) and survive restarts.
+
+    Cached data is shared between callers and must not be modified.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, directory: str | None = None,
+                 clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._writer = AtomicWriter()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self) -> dict:
+        """Returns a snapshot of the cache counters."""
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations,
+                "evictions": self.evictions, "coalesced": self.coalesced, "size": len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drops all in-memory entries (on-disk entries are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def fetch(self, url: str, send) -> dict:
+        """Returns the data for url, calling send(headers) only when needed.
+
+        ``send`` performs the request with the given extra headers and
+        returns the response; errors it raises are passed to every caller
+        waiting for the same URL.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                if entry.expires_at > now:
+                    self.hits += 1
+                    return entry.data
+        if entry is None and self.directory is not None:
+            entry = self._load(url)
+            if entry is not None and entry.expires_at > now:
+                with self._lock:
+                    self.hits += 1
+                return entry.data
+
+        from concurrent.futures import Future
+        with self._lock:
+            latest = self._entries.get(url)
+            if latest is not None and latest.expires_at > self._clock():
+                # Another caller refreshed the entry in the meantime
+                self.hits += 1
+                return latest.data
+            future = self._in_flight.get(url)
+            owner = future is None
+            if owner:
+                future = self._in_flight[url] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            response = send(entry.validators() if entry is not None else {})
+            if entry is not None and response.status_code == 304:
+                data = entry.data
+                self._store(url, data, entry.etag, entry.last_modified, "revalidations")
+            else:
+                data = response.json()
+                self._store(url, data, response.headers.get("ETag"), response.headers.get("Last-Modified"), "misses")
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[url]
+
+    def _store(self, url: str, data, etag, last_modified, counter: str) -> None:
+        entry = _Entry(data, etag, last_modified, self._clock() + self.ttl)
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if self.directory is not None:
+            record = {"url": url, "data": data, "etag": etag, "last_modified": last_modified,
+                      "expires_at": entry.expires_at}
+            with self._writer.open(self._path(url)) as f:
+                f.write(json.dumps(record).encode('utf-8'))
+
+    def _load(self, url: str):
+        try:
+            with open(self._path(url), 'rb') as f:
+                record = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if record.get("url") != url:
+            return None
+        entry = _Entry(record["data"], record["etag"], record["last_modified"], record["expires_at"])
+        with self._lock:
+            self._entries[url] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + ".json")
@@ -1,4 +1,18 @@
 """A simple Calculator class"""
+import contextlib
+import decimal
+import itertools
+import math
+import numbers
+import operator
+import os
+import threading
+from array import array
+from fractions import Fraction
+from itertools import repeat
+
+from .basic_math import _batch, _numpy_for, _store, add_batch, multiply_batch, subtract_batch
+from .exceptions import DivisionResults, _divide_pairs
 
 class CalculationError(Exception):
     """Custom exception for calculator errors."""
@@ -39,4 +53,555 @@ class Calculator:
     def clear(self):
         """Resets the calculator to zero."""
         self._current_value = 0.0
-        return self
\ No newline at end of file
+        return self
+
+    @staticmethod
+    def divide_pairs(pairs, on_zero_division: str = "raise", fill=math.nan) -> DivisionResults:
+        """Divides every (a, b) pair of an iterable; see exceptions.divide_pairs for the policies.
+
+        With ``"raise"`` a zero divisor raises CalculationError("Cannot divide
+        by zero"), as ``divide`` does; the result's ``message`` is the same.
+        """
+        return _divide_pairs(pairs, on_zero_division, fill, CalculationError, "Cannot divide by zero")
+
+    @staticmethod
+    def record():
+        """Returns a RecordingCalculator that captures a chain for later replay."""
+        return RecordingCalculator()
+
+    @staticmethod
+    def using(backend: str, initial_value=0, **options):
+        """Returns a calculator with the given numeric backend (one of ``BACKENDS``).
+
+        ``options`` are passed to the backend, e.g. ``context`` for "decimal".
+        """
+        try:
+            cls = BACKENDS[backend]
+        except KeyError:
+            raise ValueError(f"Unknown backend: {backend!r} (expected one of {', '.join(BACKENDS)})") from None
+        return cls(initial_value, **options)
+
+# --- Numeric backends ---
+# Each backend overrides every operation, so no mode checks run per call.
+
+class CompensatedCalculator(Calculator):
+    """Calculator that sums with Kahan-Neumaier compensation.
+
+    The rounding error of every addition is kept in a separate term and
+    added back in ``total``, so long sums of floats stay accurate to about
+    the last bit regardless of their length. Multiplying or dividing scales
+    the error term along with the sum.
+    """
+    def __init__(self, initial_value: float = 0):
+        self._current_value = float(initial_value)
+        self._compensation = 0.0
+
+    @property
+    def total(self) -> float:
+        """Returns the current calculated value."""
+        return self._current_value + self._compensation
+
+    def add(self, value: float):
+        """Adds a value to the current total."""
+        value = float(value)
+        s = self._current_value
+        t = s + value
+        if math.isfinite(t): # Past overflow the error term would be inf - inf, i.e. NaN
+            if abs(s) >= abs(value):
+                self._compensation += (s - t) + value
+            else:
+                self._compensation += (value - t) + s
+        self._current_value = t
+        return self
+
+    def subtract(self, value: float):
+        """Subtracts a value from the current total."""
+        return self.add(-float(value))
+
+    def multiply(self, value: float):
+        """Multiplies the current total by a value."""
+        value = float(value)
+        self._current_value *= value
+        self._compensation *= value
+        return self
+
+    def divide(self, value: float):
+        """Divides the current total by a value."""
+        value = float(value)
+        if value == 0:
+            raise CalculationError("Cannot divide by zero")
+        self._current_value /= value
+        self._compensation /= value
+        return self
+
+    def clear(self):
+        """Resets the calculator to zero."""
+        self._current_value = 0.0
+        self._compensation = 0.0
+        return self
+
+class DecimalCalculator(Calculator):
+    """Calculator working in decimal.Decimal under a fixed context.
+
+    ``context`` sets precision and rounding (default: a copy of the current
+    context when the calculator is created). Floats are converted through
+    their shortest repr, so ``0.1`` counts as ``Decimal("0.1")``; pass
+    strings, ints or Decimals to avoid float input altogether.
+    """
+    def __init__(self, initial_value=0, context: decimal.Context | None = None):
+        self._context = context or decimal.getcontext().copy()
+        self._current_value = self._context.create_decimal(_decimal(initial_value))
+
+    @property
+    def total(self) -> decimal.Decimal:
+        """Returns the current calculated value."""
+        return self._current_value
+
+    def add(self, value):
+        """Adds a value to the current total."""
+        self._current_value = self._context.add(self._current_value, _decimal(value))
+        return self
+
+    def subtract(self, value):
+        """Subtracts a value from the current total."""
+        self._current_value = self._context.subtract(self._current_value, _decimal(value))
+        return self
+
+    def multiply(self, value):
+        """Multiplies the current total by a value."""
+        self._current_value = self._context.multiply(self._current_value, _decimal(value))
+        return self
+
+    def divide(self, value):
+        """Divides the current total by a value."""
+        value = _decimal(value)
+        if value == 0:
+            raise CalculationError("Cannot divide by zero")
+        self._current_value = self._context.divide(self._current_value, value)
+        return self
+
+    def clear(self):
+        """Resets the calculator to zero."""
+        self._current_value = decimal.Decimal(0)
+        return self
+
+def _decimal(value) -> decimal.Decimal:
+    if isinstance(value, float):
+        return decimal.Decimal(repr(value))
+    if isinstance(value, Fraction):
+        return decimal.Decimal(value.numerator) / value.denominator
+    return value if isinstance(value, decimal.Decimal) else decimal.Decimal(value)
+
+class FractionCalculator(Calculator):
+    """Calculator working in exact rationals (fractions.Fraction).
+
+    Results are exact, at the cost of numerators and denominators growing
+    with every step. Floats are converted through their shortest repr, so
+    ``0.1`` counts as ``Fraction(1, 10)``.
+    """
+    def __init__(self, initial_value=0):
+        self._current_value = _fraction(initial_value)
+
+    @property
+    def total(self) -> Fraction:
+        """Returns the current calculated value."""
+        return self._current_value
+
+    def add(self, value):
+        """Adds a value to the current total."""
+        self._current_value += _fraction(value)
+        return self
+
+    def subtract(self, value):
+        """Subtracts a value from the current total."""
+        self._current_value -= _fraction(value)
+        return self
+
+    def multiply(self, value):
+        """Multiplies the current total by a value."""
+        self._current_value *= _fraction(value)
+        return self
+
+    def divide(self, value):
+        """Divides the current total by a value."""
+        value = _fraction(value)
+        if value == 0:
+            raise CalculationError("Cannot divide by zero")
+        self._current_value /= value
+        return self
+
+    def clear(self):
+        """Resets the calculator to zero."""
+        self._current_value = Fraction(0)
+        return self
+
+def _fraction(value) -> Fraction:
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+BACKENDS = {"float": Calculator, "compensated": CompensatedCalculator,
+            "decimal": DecimalCalculator, "fraction": FractionCalculator}
+
+class CalculatorBank:
+    """Holds many independent running totals in one contiguous buffer.
+
+    Totals are stored as C doubles (8 bytes each). Every operation applies to
+    all slots at once, or only to the slots listed in ``indices``, which may
+    also be a mask of one bool or byte per slot (such as
+    ``zero_division_mask``). ``value`` may be a scalar or one value per
+    targeted slot.
+
+    ``on_zero_division`` selects how ``divide`` handles zero divisors:
+    ``"raise"`` raises CalculationError before any slot is changed, while
+    ``"mask"`` leaves the affected slots unchanged and records them in
+    ``zero_division_mask`` (one byte per slot, 1 where the divisor was zero).
+    """
+    def __init__(self, size: int, initial_value: float = 0, on_zero_division: str = "raise"):
+        if on_zero_division not in ("raise", "mask"):
+            raise ValueError("on_zero_division must be 'raise' or 'mask'")
+        self._values = array("d", [float(initial_value)]) * size
+        self._on_zero_division = on_zero_division
+        self.zero_division_mask = bytearray(size)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: int) -> float:
+        return self._values[index]
+
+    @property
+    def totals(self) -> memoryview:
+        """Returns a read-only, zero-copy view of all totals."""
+        return memoryview(self._values).toreadonly()
+
+    def _slots(self, indices):
+        """Returns the targeted slot numbers, turning a bool or byte mask into the slots it selects."""
+        if indices is None:
+            return None
+        np = _numpy_for(indices)
+        if np is not None:
+            is_mask = indices.dtype == bool
+        else:
+            is_mask = (isinstance(indices, (bytes, bytearray))
+                       or (len(indices) > 0 and all(type(i) is bool for i in indices)))
+        if not is_mask:
+            return indices
+        if len(indices) != len(self._values):
+            raise ValueError(f"Mask has length {len(indices)}, expected {len(self._values)}")
+        if np is not None:
+            return np.flatnonzero(indices)
+        return [i for i, selected in enumerate(indices) if selected]
+
+    def _apply(self, op, batch_op, value, indices):
+        indices = self._slots(indices)
+        values = self._values
+        np = _numpy_for(value, indices)
+        if np is not None:
+            view = np.frombuffer(values, dtype=np.float64)
+            if indices is None:
+                batch_op(view, value, out=view)
+            else:
+                view[indices] = op(view[indices], value)
+        elif indices is None:
+            batch_op(values, value, out=values)
+        elif isinstance(value, numbers.Number):
+            for i in indices:
+                values[i] = op(values[i], value)
+        else:
+            if len(value) != len(indices):
+                raise ValueError(f"Expected {len(indices)} values, got {len(value)}")
+            for i, v in zip(indices, value):
+                values[i] = op(values[i], v)
+        return self
+
+    def add(self, value, indices=None):
+        """Adds value to the targeted totals."""
+        return self._apply(operator.add, add_batch, value, indices)
+
+    def subtract(self, value, indices=None):
+        """Subtracts value from the targeted totals."""
+        return self._apply(operator.sub, subtract_batch, value, indices)
+
+    def multiply(self, value, indices=None):
+        """Multiplies the targeted totals by value."""
+        return self._apply(operator.mul, multiply_batch, value, indices)
+
+    def divide(self, value, indices=None):
+        """Divides the targeted totals by value."""
+        size = len(self._values)
+        indices = self._slots(indices)
+        targets = range(size) if indices is None else indices
+        if isinstance(value, numbers.Number):
+            zero_slots = list(targets) if value == 0 else []
+        else:
+            if len(value) != len(targets):
+                raise ValueError(f"Expected {len(targets)} divisors, got {len(value)}")
+            zero_slots = [i for i, d in zip(targets, value) if d == 0]
+        if zero_slots and self._on_zero_division == "raise":
+            if isinstance(value, numbers.Number):
+                raise CalculationError("Cannot divide by zero")
+            raise CalculationError(f"Cannot divide by zero (slot {zero_slots[0]})")
+
+        mask = bytearray(size)
+        for i in zero_slots:
+            mask[i] = 1
+        self.zero_division_mask = mask
+        if not zero_slots:
+            return self._apply(operator.truediv, _divide_batch, value, indices)
+        if not isinstance(value, numbers.Number):
+            values = self._values
+            for i, d in zip(targets, value):
+                if d != 0:
+                    values[i] /= d
+        return self
+
+    def apply(self, program):
+        """Runs a compiled CalculatorProgram on every total in place."""
+        program.run_batch(self._values, out=self._values)
+        return self
+
+    def clear(self, indices=None):
+        """Resets the targeted totals to zero."""
+        indices = self._slots(indices)
+        if indices is None:
+            self._values[:] = array("d", bytes(8 * len(self._values)))
+        else:
+            for i in indices:
+                self._values[i] = 0.0
+        return self
+
+class _Cell:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+class ConcurrentCalculator:
+    """Calculator that many threads can update at once without losing updates.
+
+    Additions go to one of ``stripes`` cells (default: twice the CPU count),
+    each with its own lock; a thread always uses the same cell, and threads
+    are spread over the cells round-robin, so adding from different threads
+    rarely contends. ``total`` sums the cells.
+
+    Addition commutes, but multiplying, dividing and clearing do not, so
+    these lock every cell, fold the cells into the total and apply the
+    operation to it. Each one therefore applies to exactly the additions
+    that completed before it, and every concurrent addition lands either
+    wholly before or wholly after it. Operations made by one thread keep
+    their order. Additions from different threads may be summed in any
+    order, so float totals can differ in the last bits from run to run.
+    """
+    def __init__(self, initial_value: float = 0, stripes: int | None = None):
+        self._base = float(initial_value)
+        self._cells = tuple(_Cell() for _ in range(stripes or 2 * (os.cpu_count() or 1)))
+        self._next_cell = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock() # Serializes operations that lock every cell
+
+    def _cell(self) -> _Cell:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._cells[next(self._next_cell) % len(self._cells)]
+            return cell
+
+    @contextlib.contextmanager
+    def _all_cells(self):
+        """Locks every cell (in a fixed order) and folds their values into the base."""
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(self._lock)
+            for cell in self._cells:
+                stack.enter_context(cell.lock)
+            for cell in self._cells:
+                self._base += cell.value
+                cell.value = 0.0
+            yield
+
+    @property
+    def total(self) -> float:
+        """Returns the current calculated value, including every completed addition."""
+        with self._all_cells():
+            return self._base
+
+    def add(self, value: float):
+        """Adds a value to the current total."""
+        value = float(value)
+        cell = self._cell()
+        with cell.lock:
+            cell.value += value
+        return self
+
+    def subtract(self, value: float):
+        """Subtracts a value from the current total."""
+        return self.add(-float(value))
+
+    def multiply(self, value: float):
+        """Multiplies the current total by a value."""
+        value = float(value)
+        with self._all_cells():
+            self._base *= value
+        return self
+
+    def divide(self, value: float):
+        """Divides the current total by a value."""
+        if value == 0:
+            raise CalculationError("Cannot divide by zero")
+        value = float(value)
+        with self._all_cells():
+            self._base /= value
+        return self
+
+    def clear(self):
+        """Resets the calculator to zero."""
+        with self._all_cells():
+            self._base = 0.0
+        return self
+
+class RecordingCalculator:
+    """Records a Calculator chain instead of evaluating it.
+
+    Offers the same fluent methods as Calculator. ``compile()`` turns the
+    recorded chain into a CalculatorProgram that can be replayed against
+    one or many initial values.
+    """
+    def __init__(self):
+        self._ops = []
+
+    def add(self, value: float):
+        """Records adding a value."""
+        self._ops.append(("add", float(value)))
+        return self
+
+    def subtract(self, value: float):
+        """Records subtracting a value."""
+        self._ops.append(("add", -float(value)))
+        return self
+
+    def multiply(self, value: float):
+        """Records multiplying by a value."""
+        self._ops.append(("multiply", float(value)))
+        return self
+
+    def divide(self, value: float):
+        """Records dividing by a value; a zero divisor fails at replay time."""
+        if value == 0:
+            self._ops.append(("fail", None))
+        else:
+            self._ops.append(("divide", float(value)))
+        return self
+
+    def clear(self):
+        """Records resetting the total to zero."""
+        self._ops.append(("set", 0.0))
+        return self
+
+    def compile(self):
+        """Returns the recorded chain as a constant-folded CalculatorProgram."""
+        return CalculatorProgram(self._ops)
+
+def _fold(ops):
+    """Merges adjacent operations whose constants can be combined.
+
+    Consecutive adds become one add, consecutive multiplies (or divides)
+    become one multiply (or divide) as long as the combined constant stays
+    finite and non-zero, everything before a clear is dropped, and nothing
+    after a zero divisor is kept since the chain stops there.
+    """
+    folded = []
+    for op, value in ops:
+        if op == "fail":
+            folded.append((op, value))
+            break
+        if op == "set":
+            folded = [(op, value)]
+            continue
+        if op in ("multiply", "divide") and value == 1.0:
+            continue
+        if folded:
+            last_op, last_value = folded[-1]
+            if last_op == "set":
+                folded[-1] = ("set", _APPLY[op](last_value, value))
+                continue
+            if op == last_op == "add":
+                folded[-1] = ("add", last_value + value)
+                continue
+            if op == last_op:
+                combined = last_value * value
+                if combined != 0 and math.isfinite(combined):
+                    folded[-1] = (op, combined)
+                    continue
+        folded.append((op, value))
+    return tuple(folded)
+
+_APPLY = {"add": operator.add, "multiply": operator.mul, "divide": operator.truediv}
+
+class CalculatorProgram:
+    """A compiled Calculator chain that can be replayed in bulk.
+
+    Merging constants may change results in the last bits compared with
+    evaluating every step on its own. A zero divisor still raises
+    CalculationError: ``run`` raises when replay reaches it, and
+    ``run_batch`` raises before writing anything to ``out``.
+    """
+    def __init__(self, ops):
+        self.ops = _fold(ops)
+        self._fails = bool(self.ops) and self.ops[-1][0] == "fail" # _fold ends the chain at a zero divisor
+
+    def run(self, initial_value: float = 0) -> float:
+        """Replays the program starting from a single value."""
+        value = float(initial_value)
+        for op, operand in self.ops:
+            if op == "add":
+                value += operand
+            elif op == "multiply":
+                value *= operand
+            elif op == "divide":
+                value /= operand
+            elif op == "set":
+                value = operand
+            else:
+                raise CalculationError("Cannot divide by zero")
+        return value
+
+    def run_batch(self, initial_values, out=None):
+        """Replays the program against many initial values at once.
+
+        Returns an ``array('d')`` (an ndarray on the NumPy path) unless a
+        preallocated ``out`` buffer is given; ``out`` may be
+        ``initial_values`` itself to update them in place.
+        """
+        if self._fails and len(initial_values):
+            raise CalculationError("Cannot divide by zero")
+        np = _numpy_for(initial_values, out)
+        if out is None:
+            if np is not None:
+                out = np.array(initial_values, dtype=np.float64)
+            else:
+                out = array("d", initial_values)
+        elif out is not initial_values:
+            if np is not None:
+                out[...] = initial_values
+            else:
+                _store(out, initial_values, len(initial_values))
+        for op, operand in self.ops:
+            if op == "add":
+                add_batch(out, operand, out=out)
+            elif op == "multiply":
+                multiply_batch(out, operand, out=out)
+            elif op == "divide":
+                _divide_batch(out, operand, out=out)
+            elif op == "set":
+                if np is not None:
+                    out.fill(operand)
+                else:
+                    _store(out, repeat(operand, len(out)), len(out))
+        return out
+
+def _divide_batch(a, b, out=None):
+    """Elementwise true division, used by CalculatorBank once zeros are excluded."""
+    return _batch(operator.truediv, "true_divide", a, b, out)
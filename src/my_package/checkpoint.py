@@ -0,0 +1,211 @@
+"""Persisted checkpoints for resumable and incremental pipeline runs
+
+A CheckpointStore remembers, for each output file (a "target"):
+
+- the pages committed so far by an unfinished run over a paginated
+  source, with the items extracted from each page spooled to disk, so a
+  rerun continues after the last committed page instead of starting over;
+- for finished runs, a hash of the items the output was written from and
+  the output's size and modification time, so a rerun whose inputs hash
+  the same leaves the output alone.
+
+The state lives in an append-only journal (one JSON record per line) in
+the store's directory, so a commit costs one small write however many
+pages a run has. A record cut short by a crash is ignored on load.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import NamedTuple
+
+from .writers import AtomicWriter
+
+class PageRecord(NamedTuple):
+    """A committed page: its URL, the next page's URL (None for the last), items hash and count."""
+    url: str
+    next_url: str | None
+    hash: str
+    count: int
+
+class _Target:
+    __slots__ = ("start_url", "pages", "output")
+
+    def __init__(self):
+        self.start_url = None
+        self.pages = []
+        self.output = None # {"hash", "size", "mtime_ns"} of the last finished run
+
+class CheckpointStore:
+    """Journal-backed checkpoints for pipeline outputs, kept in ``directory``.
+
+    With ``fsync=True`` every journal record is flushed to disk before the
+    call returns, so committed pages survive a power loss too.
+    """
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._journal_path = os.path.join(directory, "journal.ndjson")
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._writer = AtomicWriter(fsync="always" if fsync else "never")
+        self._load()
+        self._journal = open(self._journal_path, 'a', encoding='utf-8')
+
+    # --- Journal ---
+
+    def _load(self) -> None:
+        try:
+            with open(self._journal_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                record = None
+            if record is None:
+                break # Torn write at the end of the journal
+            self._apply(record)
+            valid += len(line)
+        if valid < len(data):
+            with open(self._journal_path, 'r+b') as f:
+                f.truncate(valid)
+
+    def _apply(self, record: dict) -> None:
+        target = self._targets.setdefault(record["target"], _Target())
+        op = record["op"]
+        if op == "begin":
+            target.start_url = record["url"]
+            target.pages = []
+        elif op == "page":
+            target.pages.append(PageRecord(record["url"], record["next"], record["hash"], record["count"]))
+        elif op == "done":
+            target.start_url = None
+            target.pages = []
+            target.output = {"hash": record["hash"], "size": record["size"], "mtime_ns": record["mtime_ns"]}
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._apply(record)
+
+    def compact(self) -> None:
+        """Rewrites the journal with only the records still needed."""
+        with self._lock:
+            records = []
+            for name, target in self._targets.items():
+                if target.output is not None:
+                    records.append({"op": "done", "target": name, **target.output})
+                if target.start_url is not None:
+                    records.append({"op": "begin", "target": name, "url": target.start_url})
+                    records.extend({"op": "page", "target": name, "url": page.url, "next": page.next_url,
+                                    "hash": page.hash, "count": page.count} for page in target.pages)
+            with self._writer.open(self._journal_path) as f:
+                f.write("".join(json.dumps(record) + "\n" for record in records).encode('utf-8'))
+            self._journal.close()
+            self._journal = open(self._journal_path, 'a', encoding='utf-8')
+
+    def close(self) -> None:
+        self._journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # --- Hashes ---
+
+    @staticmethod
+    def items_hash(items) -> str:
+        """Returns the content hash of a list of extracted items."""
+        return hashlib.sha256(json.dumps(items, separators=(",", ":")).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def input_hash(format: str, page_hashes) -> str:
+        """Returns the hash identifying everything an output in format is written from."""
+        digest = hashlib.sha256(format.encode('utf-8'))
+        for page_hash in page_hashes:
+            digest.update(bytes.fromhex(page_hash))
+        return digest.hexdigest()
+
+    # --- Incremental outputs ---
+
+    def is_current(self, target: str, input_hash: str) -> bool:
+        """Tells whether target was last written from input_hash and has not changed since."""
+        state = self._targets.get(target)
+        if state is None or state.output is None or state.output["hash"] != input_hash:
+            return False
+        try:
+            stat = os.stat(target)
+        except OSError:
+            return False
+        return stat.st_size == state.output["size"] and stat.st_mtime_ns == state.output["mtime_ns"]
+
+    def record_output(self, target: str, input_hash: str, writer: AtomicWriter | None = None) -> None:
+        """Marks target as written from input_hash and drops its committed pages.
+
+        Pass the ``writer`` target was written with: if it holds target back
+        for a group commit, the record is made once the commit has made
+        target visible, so its size and modification time can be checked
+        later. Until then, and if the commit never happens, target counts
+        as out of date.
+        """
+        if writer is not None:
+            writer.when_visible(target, lambda: self.record_output(target, input_hash))
+            return
+        try:
+            stat = os.stat(target)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size = mtime_ns = None # Not visible (e.g. staged by a writer not passed in): never current
+        self._append({"op": "done", "target": target, "hash": input_hash, "size": size, "mtime_ns": mtime_ns})
+        with contextlib.suppress(FileNotFoundError):
+            shutil.rmtree(self._spool_dir(target))
+
+    # --- Resumable runs ---
+
+    def pages(self, target: str, start_url: str) -> list[PageRecord]:
+        """Returns the pages committed by an unfinished run of target that started at start_url."""
+        state = self._targets.get(target)
+        if state is None or state.start_url != start_url:
+            return []
+        return list(state.pages)
+
+    def begin(self, target: str, start_url: str) -> None:
+        """Starts a new run of target, forgetting pages committed by an earlier one."""
+        with contextlib.suppress(FileNotFoundError):
+            shutil.rmtree(self._spool_dir(target))
+        self._append({"op": "begin", "target": target, "url": start_url})
+
+    def commit_page(self, target: str, url: str, next_url: str | None, items: list) -> PageRecord:
+        """Spools a processed page's items and records the page as done."""
+        seq = len(self._targets[target].pages)
+        data = json.dumps(items, separators=(",", ":")).encode('utf-8')
+        with self._writer.open(self._spool_path(target, seq)) as f:
+            f.write(data)
+        record = {"op": "page", "target": target, "url": url, "next": next_url,
+                  "hash": hashlib.sha256(data).hexdigest(), "count": len(items)}
+        self._append(record)
+        return PageRecord(url, next_url, record["hash"], len(items))
+
+    def page_items(self, target: str, seq: int) -> list:
+        """Returns the items spooled for the seq-th committed page of target."""
+        with open(self._spool_path(target, seq), 'rb') as f:
+            return json.loads(f.read())
+
+    def _spool_dir(self, target: str) -> str:
+        return os.path.join(self.directory, "pages", hashlib.sha256(target.encode('utf-8')).hexdigest()[:32])
+
+    def _spool_path(self, target: str, seq: int) -> str:
+        return os.path.join(self._spool_dir(target), f"{seq:08d}.json")
@@ -0,0 +1,280 @@
+"""Command-line batch runner for the data pipeline: ``my-package-pipeline``
+
+Reads a manifest of (url, output) jobs and runs fetch, process and save
+for each on a thread pool::
+
+    my-package-pipeline jobs.csv --workers 16 --retries 3 --format ndjson
+
+A CSV manifest has a url and an output column per row (an optional
+``url,output`` header row is skipped); an NDJSON manifest has one
+``{"url": ..., "output": ...}`` object per line. ``-`` reads the manifest
+from standard input. The manifest is read as jobs are dispatched, so it
+may be arbitrarily long.
+
+At the end the throughput and job latency are printed, and every failed
+job is listed on standard error. ``--rate`` and ``--max-concurrency``
+limit the requests sent to each host (see ratelimit.RateLimiter); their
+final state per host is printed as well. With ``--aggregate FIELD`` each output
+gets a statistics file (see aggregation.stats_path) and the statistics
+of all jobs together are printed too. The exit status is 0 if all jobs
+succeeded, 1 if any failed, 2 for an unreadable manifest or bad options
+and 130 when interrupted.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import NamedTuple
+
+from . import data_processor, formats
+from .instrumentation import HistogramSink, Tracer, enabled, stage
+from .retry import RetryPolicy
+from .writers import FSYNC_MODES, AtomicWriter
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMATS = ("csv", "ndjson")
+
+class Job(NamedTuple):
+    """One manifest entry and the manifest line it came from."""
+    line: int
+    url: str
+    output: str
+
+class ManifestError(ValueError):
+    """Raised for a malformed manifest entry."""
+    pass
+
+class JobFailure(NamedTuple):
+    """A job that failed: the job, the exception's class name and its message."""
+    job: Job
+    error_type: str
+    error: str
+
+# --- Manifest ---
+
+def manifest_format(path: str) -> str:
+    """Guesses the manifest format from the file extension (CSV unless .ndjson/.jsonl)."""
+    return "ndjson" if os.path.splitext(path)[1].lower() in (".ndjson", ".jsonl") else "csv"
+
+def iter_manifest(f, format: str = "csv"):
+    """Yields a Job per entry of a text manifest, reading it line by line.
+
+    Blank lines are skipped. A malformed entry raises ManifestError (a
+    ValueError) naming its line.
+    """
+    if format not in MANIFEST_FORMATS:
+        raise ValueError(f"Unknown manifest format: {format!r} (expected one of {', '.join(MANIFEST_FORMATS)})")
+    if format == "ndjson":
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise ManifestError(f"Manifest line {line_number}: invalid JSON ({e})") from None
+            if not (isinstance(entry, dict) and isinstance(entry.get("url"), str)
+                    and isinstance(entry.get("output"), str)):
+                raise ManifestError(f"Manifest line {line_number}: expected an object with 'url' and 'output' strings")
+            yield Job(line_number, entry["url"], entry["output"])
+        return
+    reader = csv.reader(f)
+    for row in reader:
+        if not row or not any(field.strip() for field in row):
+            continue
+        if reader.line_num == 1 and [field.strip().lower() for field in row] == ["url", "output"]:
+            continue # Header
+        if len(row) != 2 or not row[0].strip() or not row[1].strip():
+            raise ManifestError(f"Manifest line {reader.line_num}: expected 'url,output', got {len(row)} fields")
+        yield Job(reader.line_num, row[0].strip(), row[1].strip())
+
+# --- Running ---
+
+def _run_job(job: Job, session, limiter, options: dict):
+    """Runs data_processor.run_job for one job; returns what it returned, or a JobFailure."""
+    try:
+        with limiter(job.url), stage("job"):
+            return data_processor.run_job(job.url, job.output, session, **options)
+    except Exception as e:
+        if not isinstance(e, data_processor.JOB_ERRORS):
+            logger.exception("Unexpected error in job on manifest line %d (%s)", job.line, job.url)
+        return JobFailure(job, type(e).__name__, str(e))
+
+def run_manifest(jobs, workers: int = 8, per_host_limit: int | None = None, **options):
+    """Runs jobs on a thread pool and yields a (job, outcome) pair per finished job.
+
+    The outcome is a JobFailure if the job failed, otherwise what
+    process_and_save_data returned: the job's ValueStats with the
+    ``aggregate`` option, else None. At most twice ``workers`` jobs are
+    taken from ``jobs`` ahead of the finished ones. ``options`` are
+    format, writer, cache, retry, aggregate and rate_limiter, passed on to
+    data_processor.run_job. If the generator is closed early, or reading
+    ``jobs`` raises, queued jobs are dropped and those already running are
+    waited for.
+    """
+    limiter = data_processor._HostLimiter(per_host_limit)
+    session = data_processor.create_session(pool_maxsize=per_host_limit or workers)
+    run = partial(_run_job, session=session, limiter=limiter, options=options)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for job, future in data_processor._iter_bounded(executor, run, jobs, 2 * workers):
+            yield job, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        session.close()
+
+# --- Reporting ---
+
+def _format_report(summary: dict, elapsed: float, succeeded: int, failed: int) -> str:
+    jobs = summary.get("job")
+    items = summary.get("transform", {}).get("items", 0)
+    nbytes = summary.get("write", {}).get("bytes", 0)
+    elapsed = max(elapsed, 1e-9)
+    lines = [f"Jobs: {succeeded} succeeded, {failed} failed in {elapsed:.2f} s",
+             f"Throughput: {(succeeded + failed) / elapsed:.1f} jobs/s, {items / elapsed:.1f} items/s, "
+             f"{nbytes / elapsed / 1e6:.2f} MB/s written"]
+    if jobs is not None:
+        lines.append(f"Job latency: p50 {jobs['p50'] * 1e3:.1f} ms, p95 {jobs['p95'] * 1e3:.1f} ms, "
+                     f"p99 {jobs['p99'] * 1e3:.1f} ms, mean {jobs['total'] / jobs['count'] * 1e3:.1f} ms")
+    return "\n".join(lines)
+
+def _format_stats(field: str, stats) -> str:
+    if not stats.count:
+        return f"{field}: no values ({stats.missing} missing)"
+    summary = stats.summary()
+    return (f"{field}: count {summary['count']}, missing {summary['missing']}, sum {summary['sum']:.6g}, "
+            f"mean {summary['mean']:.6g}, min {summary['min']:.6g}, max {summary['max']:.6g}, "
+            f"p50 {summary['p50']:.6g}, p95 {summary['p95']:.6g}, p99 {summary['p99']:.6g}")
+
+def _format_limits(stats: dict) -> str:
+    lines = []
+    for host, host_stats in sorted(stats.items()):
+        line = f"{host}: {host_stats.requests} requests, {host_stats.overloads} overloaded"
+        if host_stats.limit is not None:
+            line += f", concurrency limit {host_stats.limit}"
+            if host_stats.latency is not None:
+                line += (f", latency {host_stats.latency * 1e3:.1f} ms "
+                         f"(baseline {host_stats.baseline_latency * 1e3:.1f} ms)")
+        lines.append(line)
+    return "\n".join(lines)
+
+def _format_failure(failure: JobFailure) -> str:
+    job = failure.job
+    return f"FAILED line {job.line}: {job.url} -> {job.output}: {failure.error_type}: {failure.error}"
+
+# --- Entry point ---
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="my-package-pipeline",
+                                     description="Fetch, process and save every (url, output) job of a manifest.")
+    parser.add_argument("manifest", help="CSV or NDJSON manifest of url and output pairs ('-' for stdin)")
+    parser.add_argument("--manifest-format", choices=MANIFEST_FORMATS,
+                        help="manifest format (default: from the file extension, else csv)")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="jobs run at once (default 8)")
+    parser.add_argument("--per-host-limit", type=int, help="concurrent requests per host (default: no limit)")
+    parser.add_argument("-f", "--format", choices=formats.FORMATS, default="json", help="output format")
+    parser.add_argument("--fsync", choices=FSYNC_MODES, default="never", help="output durability (default never)")
+    parser.add_argument("--aggregate", metavar="FIELD",
+                        help="save statistics of this numeric item field next to each output and print the totals")
+    cache = parser.add_argument_group("response cache")
+    cache.add_argument("--cache", action="store_true", help="reuse responses for repeated URLs")
+    cache.add_argument("--cache-dir", help="also keep responses in this directory across runs (implies --cache)")
+    cache.add_argument("--cache-ttl", type=float, default=60.0, help="seconds a response stays fresh")
+    cache.add_argument("--cache-size", type=int, default=1024, help="responses kept in memory")
+    retry = parser.add_argument_group("retries")
+    retry.add_argument("--retries", type=int, default=0,
+                       help="extra attempts for transient failures and 429/5xx responses (default 0)")
+    retry.add_argument("--retry-delay", type=float, default=0.1, help="base backoff delay in seconds")
+    retry.add_argument("--timeout", type=float, default=5.0, help="seconds allowed per attempt")
+    limits = parser.add_argument_group("rate limiting")
+    limits.add_argument("--rate", type=float, help="requests per second per host (default: no limit)")
+    limits.add_argument("--burst", type=float, help="requests allowed at once above --rate (default: one second's)")
+    limits.add_argument("--max-concurrency", type=int,
+                        help="adapt concurrent requests per host up to this, backing off on 429/503 responses "
+                             "and rising latency (default: no adaptation)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only report failures")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="log more (repeatable)")
+    return parser
+
+def main(argv=None) -> int:
+    """Command-line entry point; returns the process exit code."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.retries < 0:
+        parser.error("--retries must not be negative")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    if args.max_concurrency is not None and args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    logging.basicConfig(level=logging.ERROR - 10 * min(args.verbose, 3),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    cache = None
+    if args.cache or args.cache_dir:
+        from .cache import ResponseCache
+        cache = ResponseCache(args.cache_size, args.cache_ttl, args.cache_dir)
+    retry = RetryPolicy(max_attempts=args.retries + 1, base_delay=args.retry_delay, attempt_timeout=args.timeout)
+    rate_limiter = None
+    if args.rate is not None or args.max_concurrency is not None:
+        from .ratelimit import RateLimiter
+        rate_limiter = RateLimiter(args.rate, args.burst, args.max_concurrency)
+
+    try:
+        if args.manifest == "-":
+            manifest = contextlib.nullcontext(sys.stdin)
+        else:
+            manifest = open(args.manifest, 'r', encoding='utf-8', newline='')
+    except OSError as e:
+        print(f"my-package-pipeline: cannot read manifest: {e}", file=sys.stderr)
+        return 2
+    kind = args.manifest_format or ("csv" if args.manifest == "-" else manifest_format(args.manifest))
+
+    histogram = HistogramSink()
+    totals = None
+    if args.aggregate:
+        from .aggregation import ValueStats
+        totals = ValueStats()
+    failures = []
+    succeeded = 0
+    status = 0
+    start = time.perf_counter()
+    try:
+        with manifest as lines, enabled(Tracer(histogram)), AtomicWriter(fsync=args.fsync) as writer:
+            results = run_manifest(iter_manifest(lines, kind), args.workers, args.per_host_limit,
+                                   format=args.format, writer=writer, cache=cache, retry=retry,
+                                   aggregate=args.aggregate, rate_limiter=rate_limiter)
+            for job, outcome in results:
+                if isinstance(outcome, JobFailure):
+                    failures.append(outcome)
+                else:
+                    succeeded += 1
+                    if outcome is not None:
+                        totals.merge(outcome)
+    except (ManifestError, UnicodeDecodeError) as e: # Unreadable manifest; jobs already started have finished
+        print(f"my-package-pipeline: {e}", file=sys.stderr)
+        status = 2
+    except KeyboardInterrupt:
+        print("my-package-pipeline: interrupted", file=sys.stderr)
+        status = 130
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        print(_format_report(histogram.summary(), elapsed, succeeded, len(failures)))
+        if totals is not None:
+            print(_format_stats(args.aggregate, totals))
+        if rate_limiter is not None:
+            print(_format_limits(rate_limiter.stats()))
+    for failure in sorted(failures, key=lambda failure: failure.job.line):
+        print(_format_failure(failure), file=sys.stderr)
+    return status or (1 if failures else 0)
+
+if __name__ == "__main__":
+    sys.exit(main())
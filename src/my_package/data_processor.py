@@ -1,66 +1,543 @@
-"""Module simulating data processing with external interactions"""
+"""Module simulating data processing with external interactions
+
+requests (the external dependency) is slow to import, so it is imported
+on first network use; processing local data never loads it.
+"""
+from __future__ import annotations
+
+import contextlib
 import json
-import requests # External dependency (example)
-import time
+import logging
 import os
+import threading
+import time
+from itertools import islice
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin, urlsplit
+
+from . import formats
+from .instrumentation import stage
+from .retry import CircuitOpenError, RetryPolicy
+from .schema import Field, PayloadSchema
+from .writers import AtomicWriter, default_writer
+
+if TYPE_CHECKING:
+    import requests
+
+    from .cache import ResponseCache
+    from .checkpoint import CheckpointStore
+    from .ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+def _requests():
+    """Returns the requests module, importing it on first use."""
+    global requests
+    import requests # External dependency (example)
+    return requests
+
+def __getattr__(name: str):
+    if name == "requests": # Not imported yet; keeps data_processor.requests reachable, e.g. for patching
+        return _requests()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class ExternalServiceError(Exception):
     """Raised when the external service fails."""
     pass
 
-def fetch_data_from_api(api_url: str) -> dict:
-    """Simulates fetching data from a slow external API."""
-    print(f"\nAttempting to fetch data from {api_url}...")
-    try:
-        # Simulate network delay
-        time.sleep(0.5)
-        response = requests.get(api_url, timeout=5)
+# Item names as written by process_and_save_data
+_ITEM_NAMES = PayloadSchema(Field("name", default="Unknown"))
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 10) -> requests.Session:
+    """Creates a keep-alive Session backed by a connection pool.
+
+    ``pool_connections`` is the number of hosts to keep pools for and
+    ``pool_maxsize`` the number of connections kept open per host.
+    """
+    requests = _requests()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _retryable_errors() -> tuple:
+    """Errors worth retrying when a RetryPolicy is used; HTTP errors are judged by status."""
+    exceptions = _requests().exceptions
+    return (exceptions.Timeout, exceptions.ConnectionError)
+
+def _send(api_url: str, session: requests.Session | None = None, headers: dict | None = None,
+          retry: RetryPolicy | None = None, simulated_latency: float = 0.0,
+          rate_limiter: RateLimiter | None = None) -> requests.Response:
+    """Sends a GET request, retrying per ``retry``, and raises HTTPError for 4xx/5xx responses.
+
+    Every attempt waits for a permit from ``rate_limiter`` when given.
+    """
+    get = _requests().get if session is None else session.get
+
+    def request(timeout):
+        if simulated_latency:
+            time.sleep(simulated_latency) # Simulate network delay
+        return get(api_url, timeout=timeout, headers=headers) if headers else get(api_url, timeout=timeout)
+
+    def attempt(timeout):
+        if rate_limiter is None:
+            response = request(timeout)
+        else:
+            with rate_limiter.request(api_url) as permit:
+                response = request(timeout)
+                permit.status = response.status_code
         response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-        print("Data fetched successfully.")
-        return response.json()
-    except requests.exceptions.Timeout:
-        print("API request timed out.")
+        return response
+
+    if retry is None:
+        return attempt(5)
+    return retry.call(attempt, urlsplit(api_url).netloc, _retryable_errors())
+
+def fetch_data_from_api(api_url: str, session: requests.Session | None = None,
+                        cache: ResponseCache | None = None, retry: RetryPolicy | None = None,
+                        simulated_latency: float = 0.0, rate_limiter: RateLimiter | None = None) -> dict:
+    """Fetches JSON data from an external API.
+
+    Uses ``session`` when given so connections are reused between calls,
+    serves repeated requests from ``cache`` when given, and retries
+    transient failures according to ``retry``. ``simulated_latency``
+    adds an artificial delay (in seconds) before each attempt. With a
+    ``rate_limiter`` (see ratelimit.RateLimiter), every request sent waits
+    for the host's rate and concurrency limits and reports back to them.
+    """
+    logger.debug("Attempting to fetch data from %s", api_url)
+    try:
+        if cache is None:
+            with stage("fetch"):
+                response = _send(api_url, session, None, retry, simulated_latency, rate_limiter)
+            with stage("decode") as span:
+                data = response.json()
+                if span:
+                    span.bytes = len(response.content)
+        else:
+            with stage("fetch"):
+                data = cache.fetch(api_url, lambda headers: _send(api_url, session, headers, retry,
+                                                                  simulated_latency, rate_limiter))
+        logger.debug("Data fetched successfully from %s", api_url)
+        return data
+    except _requests().exceptions.Timeout:
+        logger.warning("API request to %s timed out.", api_url)
         raise ExternalServiceError(f"Timeout accessing {api_url}")
-    except requests.exceptions.RequestException as e:
-        print(f"API request failed: {e}")
+    except (_requests().exceptions.RequestException, CircuitOpenError) as e:
+        logger.warning("API request to %s failed: %s", api_url, e)
         raise ExternalServiceError(f"Failed to fetch data from {api_url}: {e}")
 
-def process_and_save_data(input_data: dict, output_filepath: str) -> None:
-    """Processes fetched data and saves it to a file."""
+def process_and_save_data(input_data: dict, output_filepath: str, format: str = "json",
+                          writer: AtomicWriter | None = None, aggregate: str | None = None):
+    """Processes fetched data and saves it to a file.
+
+    ``format`` is one of ``formats.FORMATS``; the default keeps the
+    pretty-printed JSON layout. The file is written atomically through
+    ``writer`` (``writers.default_writer`` if not given). Items that are
+    not objects are logged and skipped. With ``aggregate``, statistics of
+    that numeric field of the items (see aggregation.ValueStats) are saved
+    next to the output, at ``aggregation.stats_path(output_filepath)``,
+    and returned.
+    """
+    formats.check_format(format)
     if not isinstance(input_data, dict):
         raise TypeError("Input data must be a dictionary.")
     if 'results' not in input_data or not isinstance(input_data['results'], list):
         raise ValueError("Input data must contain a 'results' list.")
 
-    processed = {
-        "count": len(input_data['results']),
-        "items": [item.get('name', 'Unknown') for item in input_data['results']],
-        "timestamp": time.time()
-    }
+    processed = _process(input_data, encode=format == "dictionary")
+    stats = None if aggregate is None else _aggregate(input_data['results'], aggregate)
+    _save_processed(processed, output_filepath, format, writer)
+    if stats is not None:
+        _save_stats(stats, output_filepath, writer)
+    return stats
+
+def _extract_names(input_data: dict) -> list:
+    """Returns the item names, logging and skipping invalid items."""
+    extraction = _ITEM_NAMES.extract(input_data)
+    if extraction.invalid:
+        index, reason = extraction.invalid[0]
+        logger.warning("Skipping %d invalid items (first at index %d: %s)",
+                       len(extraction.invalid), index, reason)
+    return extraction.columns["name"]
+
+def _process(input_data: dict, encode: bool = False) -> dict:
+    """With encode, items become EncodedItems unless there are more than formats.MAX_SYMBOLS distinct names."""
+    with stage("transform") as span:
+        names = _extract_names(input_data)
+        if encode:
+            names = formats.encode_items(names, formats.MAX_SYMBOLS) or names
+        processed = {
+            "count": len(names),
+            "items": names,
+            "timestamp": time.time()
+        }
+        span.items = processed["count"]
+    return processed
+
+def _aggregate(items: list, field: str, stats=None):
+    """Adds the numeric values of field in items to stats (a new ValueStats if None) and returns it.
 
-    print(f"Processing complete. Saving {processed['count']} items to {output_filepath}")
+    Items without a numeric value are counted as missing.
+    """
+    from .aggregation import ValueStats
+    with stage("aggregate") as span:
+        extraction = PayloadSchema(Field(field, float)).extract({"results": items})
+        stats = (stats or ValueStats()).update(extraction.columns[field], missing=len(extraction.invalid))
+        span.items = extraction.count
+    return stats
+
+def _save_stats(stats, output_filepath: str, writer: AtomicWriter | None) -> None:
+    from .aggregation import stats_path
+    path = stats_path(output_filepath)
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            json.dump(processed, f, indent=4)
-        print("Data saved successfully.")
+        stats.save(path, writer)
     except IOError as e:
-        print(f"Error saving data to {output_filepath}: {e}")
+        logger.error("Error saving statistics to %s: %s", path, e)
+        raise IOError(f"Could not write to file {path}: {e}")
+
+def _save_processed(processed: dict, output_filepath: str, format: str, writer: AtomicWriter | None) -> None:
+    logger.debug("Processing complete. Saving %d items to %s", processed['count'], output_filepath)
+    try:
+        with stage("write") as span, (writer or default_writer).open(output_filepath) as f:
+            formats.dump(processed, f, format)
+            span.items = processed["count"]
+            if span:
+                span.bytes = f.tell()
+        logger.debug("Data saved successfully to %s", output_filepath)
+    except IOError as e:
+        logger.error("Error saving data to %s: %s", output_filepath, e)
         raise IOError(f"Could not write to file {output_filepath}: {e}")
     except Exception as e:
-        print(f"An unexpected error occurred during saving: {e}")
+        logger.error("An unexpected error occurred during saving: %s", e)
         raise # Re-raise unexpected errors
 
-def complex_data_pipeline(api_url: str, output_file: str) -> bool:
-    """Full pipeline: fetch, process, save."""
+# Errors a job fails with on bad input, a failing API or a failed write; anything else is a bug
+JOB_ERRORS = (ExternalServiceError, TypeError, ValueError, IOError)
+
+def run_job(api_url: str, output_file: str, session: requests.Session | None = None,
+            format: str = "json", writer: AtomicWriter | None = None,
+            cache: ResponseCache | None = None, retry: RetryPolicy | None = None,
+            aggregate: str | None = None, rate_limiter: RateLimiter | None = None):
+    """Fetches api_url and saves the processed data to output_file, raising on failure.
+
+    This is complex_data_pipeline without a checkpoint, for callers that
+    report failures themselves. Returns the ValueStats saved with
+    ``aggregate``, else None, as process_and_save_data does.
+    """
+    data = fetch_data_from_api(api_url, session, cache, retry, rate_limiter=rate_limiter)
+    process_and_save_data(data, output_file, format=format, writer=writer)
+    if aggregate is None:
+        return None
+    stats = _aggregate(data['results'], aggregate)
+    _save_stats(stats, output_file, writer)
+    return stats
+
+def complex_data_pipeline(api_url: str, output_file: str, session: requests.Session | None = None,
+                          format: str = "json", writer: AtomicWriter | None = None,
+                          cache: ResponseCache | None = None, retry: RetryPolicy | None = None,
+                          checkpoint: CheckpointStore | None = None, aggregate: str | None = None,
+                          rate_limiter: RateLimiter | None = None) -> bool:
+    """Full pipeline: fetch, process, save.
+
+    With a ``checkpoint``, the output is only rewritten when the fetched
+    items differ from those it was last written from. ``aggregate`` works
+    as for process_and_save_data, ``rate_limiter`` as for fetch_data_from_api.
+    """
     try:
-        data = fetch_data_from_api(api_url)
-        process_and_save_data(data, output_file)
+        with stage("pipeline"):
+            if checkpoint is None:
+                run_job(api_url, output_file, session, format, writer, cache, retry, aggregate, rate_limiter)
+            else:
+                from .aggregation import stats_path
+                data = fetch_data_from_api(api_url, session, cache, retry, rate_limiter=rate_limiter)
+                formats.check_format(format)
+                processed = _process(data)
+                item_hashes = [checkpoint.items_hash(processed["items"])]
+                stats = None
+                if aggregate is not None: # The statistics are part of what the output is written from
+                    stats = _aggregate(data['results'], aggregate)
+                    item_hashes.append(checkpoint.items_hash([aggregate, stats.to_dict()]))
+                input_hash = checkpoint.input_hash(format, item_hashes)
+                if checkpoint.is_current(output_file, input_hash) and (
+                        stats is None or os.path.exists(stats_path(output_file))):
+                    logger.info("Output %s is up to date", output_file)
+                else:
+                    _save_processed(processed, output_file, format, writer)
+                    if stats is not None:
+                        _save_stats(stats, output_file, writer)
+                    checkpoint.record_output(output_file, input_hash, writer)
         return True
-    except (ExternalServiceError, TypeError, ValueError, IOError) as e:
-        print(f"Data pipeline failed: {e}")
+    except JOB_ERRORS as e:
+        logger.warning("Data pipeline failed: %s", e)
+        return False
+    except Exception:
+        logger.exception("Unexpected error in data pipeline")
+        return False
+
+# --- Concurrent fetching ---
+
+class _HostLimiter:
+    """Caps the number of concurrent requests per host."""
+    def __init__(self, limit: int | None):
+        self._limit = limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, api_url: str):
+        if self._limit is None:
+            return contextlib.nullcontext()
+        host = urlsplit(api_url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self._limit)
+        return semaphore
+
+def _run_concurrently(func, items, max_workers: int, per_host_limit: int | None,
+                      pool_maxsize: int | None, session: requests.Session | None) -> list:
+    """Calls func(item, session) for every (url-first) item on a bounded thread pool."""
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_maxsize=pool_maxsize or max_workers)
+    limiter = _HostLimiter(per_host_limit)
+
+    def run(item):
+        url = item[0] if isinstance(item, tuple) else item
+        with limiter(url):
+            return func(item, session)
+
+    from concurrent.futures import ThreadPoolExecutor
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, items))
+    finally:
+        if own_session:
+            session.close()
+
+def _iter_bounded(executor, func, items, max_in_flight: int, stop=None):
+    """Submits func(item) for each item and yields (item, future) pairs as they complete.
+
+    At most ``max_in_flight`` calls are queued or running at once, and
+    items are only taken from the iterable as calls complete. Once
+    ``stop()`` is true no more items are submitted and queued calls are
+    cancelled; cancelled calls are not yielded. Calls still queued when
+    the generator is closed, or when reading items raises, are cancelled.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+    items = iter(items)
+    end = object()
+    pending = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight and not (stop and stop()):
+                item = next(items, end)
+                if item is end:
+                    exhausted = True
+                else:
+                    pending[executor.submit(func, item)] = item
+            if stop and stop():
+                for future in pending:
+                    future.cancel()
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                if not future.cancelled():
+                    yield item, future
+    finally:
+        for future in pending:
+            future.cancel()
+
+def fetch_many(api_urls, max_workers: int = 8, per_host_limit: int | None = None,
+               pool_maxsize: int | None = None, session: requests.Session | None = None,
+               cache: ResponseCache | None = None, retry: RetryPolicy | None = None,
+               rate_limiter: RateLimiter | None = None) -> list:
+    """Fetches many URLs concurrently over a shared keep-alive Session.
+
+    Returns one entry per URL, in input order: the decoded JSON on success,
+    or the ExternalServiceError raised for that URL on failure. A shared
+    ``rate_limiter`` adapts each host's concurrency below ``max_workers``.
+    """
+    def fetch(api_url, session):
+        try:
+            return fetch_data_from_api(api_url, session, cache, retry, rate_limiter=rate_limiter)
+        except ExternalServiceError as e:
+            return e
+
+    return _run_concurrently(fetch, api_urls, max_workers, per_host_limit, pool_maxsize, session)
+
+def concurrent_data_pipeline(jobs, max_workers: int = 8, per_host_limit: int | None = None,
+                             pool_maxsize: int | None = None, session: requests.Session | None = None,
+                             format: str = "json", writer: AtomicWriter | None = None,
+                             cache: ResponseCache | None = None, retry: RetryPolicy | None = None,
+                             aggregate: str | None = None, rate_limiter: RateLimiter | None = None) -> list[bool]:
+    """Runs complex_data_pipeline for many (api_url, output_file) jobs concurrently.
+
+    Returns the pipeline result for each job, in input order. A group-commit
+    ``writer`` is shared by all jobs, so fsyncs are batched across outputs.
+    """
+    def run_job(job, session):
+        api_url, output_file = job
+        return complex_data_pipeline(api_url, output_file, session, format, writer, cache, retry,
+                                     aggregate=aggregate, rate_limiter=rate_limiter)
+
+    return _run_concurrently(run_job, [tuple(job) for job in jobs], max_workers,
+                             per_host_limit, pool_maxsize, session)
+
+
+# --- Streaming (constant-memory) processing ---
+
+def iter_api_results(api_url: str, session: requests.Session | None = None, retry: RetryPolicy | None = None):
+    """Yields result items page by page, following each page's 'next' link.
+
+    Only one page is held in memory at a time.
+    """
+    while api_url:
+        page = fetch_data_from_api(api_url, session, retry=retry)
+        if not isinstance(page, dict):
+            raise TypeError("Input data must be a dictionary.")
+        if not isinstance(page.get('results'), list):
+            raise ValueError("Input data must contain a 'results' list.")
+        yield from page['results']
+        next_url = page.get('next')
+        api_url = urljoin(api_url, next_url) if next_url else None
+
+def stream_process_and_save(items, output_filepath: str, batch_size: int = 1000,
+                            writer: AtomicWriter | None = None, aggregate: str | None = None) -> int:
+    """Processes an iterable of result items and saves them incrementally.
+
+    Writes the same fields as process_and_save_data, with 'count' and
+    'timestamp' written after the items once the stream is exhausted.
+    If the stream fails midway, the target file is left untouched.
+    Items that are not objects are logged and skipped, as by
+    process_and_save_data. ``aggregate`` works as for process_and_save_data,
+    with the statistics accumulated batch by batch. Returns the number of
+    items written.
+    """
+    items = iter(items)
+    stats = None
+    count = 0
+    logger.debug("Streaming items to %s", output_filepath)
+    try:
+        with stage("write") as span, (writer or default_writer).open(output_filepath) as f:
+            f.write(b'{"items": [')
+            while True:
+                batch = list(islice(items, batch_size))
+                if not batch:
+                    break
+                names = _extract_names({"results": batch})
+                if count and names:
+                    f.write(b", ")
+                f.write(", ".join([json.dumps(name) for name in names]).encode('utf-8'))
+                if aggregate is not None:
+                    stats = _aggregate(batch, aggregate, stats)
+                count += len(names)
+            f.write(f'], "count": {count}, "timestamp": {json.dumps(time.time())}}}'.encode('utf-8'))
+            span.items = count
+            if span:
+                span.bytes = f.tell()
+        logger.debug("Data saved successfully to %s (%d items)", output_filepath, count)
+    except IOError as e:
+        logger.error("Error saving data to %s: %s", output_filepath, e)
+        raise IOError(f"Could not write to file {output_filepath}: {e}")
+    if aggregate is not None:
+        from .aggregation import ValueStats
+        _save_stats(stats or ValueStats(), output_filepath, writer)
+    return count
+
+def streaming_data_pipeline(api_url: str, output_file: str, session: requests.Session | None = None,
+                            retry: RetryPolicy | None = None, aggregate: str | None = None) -> bool:
+    """Full pipeline over every page of a paginated API, in constant memory."""
+    try:
+        with stage("pipeline"):
+            stream_process_and_save(iter_api_results(api_url, session, retry), output_file, aggregate=aggregate)
+        return True
+    except JOB_ERRORS as e:
+        logger.warning("Data pipeline failed: %s", e)
+        return False
+    except Exception:
+        logger.exception("Unexpected error in data pipeline")
+        return False
+
+
+def resumable_data_pipeline(api_url: str, output_file: str, checkpoint: CheckpointStore,
+                            session: requests.Session | None = None, retry: RetryPolicy | None = None,
+                            format: str = "json", writer: AtomicWriter | None = None) -> bool:
+    """Full pipeline over every page of a paginated API that survives failures.
+
+    Each page's items are committed to ``checkpoint`` once processed, so
+    after a failure a rerun continues after the last committed page instead
+    of fetching everything again. Once all pages are in, the output is
+    written, unless it was already written from identical items.
+    """
+    try:
+        with stage("pipeline"):
+            formats.check_format(format)
+            pages = checkpoint.pages(output_file, api_url)
+            if pages:
+                url = pages[-1].next_url
+                logger.info("Resuming %s after %d committed pages", output_file, len(pages))
+            else:
+                checkpoint.begin(output_file, api_url)
+                url = api_url
+            while url:
+                page = fetch_data_from_api(url, session, retry=retry)
+                with stage("transform") as span:
+                    names = _extract_names(page)
+                    span.items = len(names)
+                next_url = page.get('next')
+                next_url = urljoin(url, next_url) if next_url else None
+                checkpoint.commit_page(output_file, url, next_url, names)
+                url = next_url
+
+            pages = checkpoint.pages(output_file, api_url)
+            input_hash = checkpoint.input_hash(format, [page.hash for page in pages])
+            if checkpoint.is_current(output_file, input_hash):
+                logger.info("Output %s is up to date", output_file)
+            else:
+                names = []
+                for seq in range(len(pages)):
+                    names.extend(checkpoint.page_items(output_file, seq))
+                _save_processed({"count": len(names), "items": names, "timestamp": time.time()},
+                                output_file, format, writer)
+            checkpoint.record_output(output_file, input_hash, writer)
+        return True
+    except JOB_ERRORS as e:
+        logger.warning("Data pipeline failed: %s", e)
+        return False
+    except Exception:
+        logger.exception("Unexpected error in data pipeline")
+        return False
+
+# --- Replaying archived responses ---
+
+def file_data_pipeline(dump_path: str, output_file: str, format: str = "json",
+                       writer: AtomicWriter | None = None, dump_format: str | None = None) -> bool:
+    """Full pipeline over an API response archived on disk: read, process, save.
+
+    The dump is memory-mapped (see sources.MappedDump); ``dump_format`` is
+    "json" or "ndjson" and defaults to what the file extension says. The
+    output is the same as process_and_save_data writes for the same data.
+    """
+    from . import sources
+    try:
+        with stage("pipeline"):
+            formats.check_format(format)
+            with sources.MappedDump(dump_path, dump_format) as dump, stage("transform") as span:
+                names = list(dump.iter_names())
+                if dump.skipped:
+                    logger.warning("Skipping %d invalid items (not objects)", dump.skipped)
+                processed = {"count": len(names), "items": names, "timestamp": time.time()}
+                span.items = processed["count"]
+            _save_processed(processed, output_file, format, writer)
+        return True
+    except (TypeError, ValueError, IOError) as e:
+        logger.warning("Data pipeline failed: %s", e)
+        return False
+    except Exception:
+        logger.exception("Unexpected error in data pipeline")
         return False
-    except Exception as e:
-        print(f"Unexpected error in data pipeline: {e}")
-        return False
\ No newline at end of file
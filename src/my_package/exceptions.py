@@ -1,4 +1,16 @@
-"""Functions designed to raise exceptions"""
+"""Functions designed to raise exceptions
+
+divide_pairs is the bulk variant of divide_by_zero for batches where zero
+divisors are routine: instead of raising per pair it can report them in a
+per-pair error code array (see DivisionResults).
+"""
+import math
+from typing import NamedTuple
+
+ZERO_DIVISION_POLICIES = ("raise", "collect", "substitute")
+
+ERROR_NONE = 0
+ERROR_ZERO_DIVISION = 1
 
 def divide_by_zero(a, b):
     """Performs division, raises ZeroDivisionError for b=0."""
@@ -6,10 +18,69 @@ def divide_by_zero(a, b):
         raise ZeroDivisionError("Division by zero!")
     return a / b
 
+class DivisionResults(NamedTuple):
+    """Quotients of a bulk division and what went wrong, per pair.
+
+    ``errors`` holds one error code per pair (ERROR_NONE or
+    ERROR_ZERO_DIVISION). ``message`` is the message of the exception the
+    single-pair operation would have raised for a failed pair.
+    """
+    values: list
+    errors: bytes
+    message: str
+
+    @property
+    def failed(self) -> list[int]:
+        """Returns the indices of the pairs that failed."""
+        return [i for i, code in enumerate(self.errors) if code]
+
+    def error_messages(self) -> dict[int, str]:
+        """Returns the error message of every failed pair, by index."""
+        return dict.fromkeys(self.failed, self.message)
+
+def _ieee_quotient(a, b) -> float:
+    """What IEEE 754 division gives for a zero divisor: a signed infinity, or NaN for 0/0."""
+    if a == 0 or a != a:
+        return math.nan
+    return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+def _divide_pairs(pairs, on_zero_division: str, fill, error: type[Exception], message: str) -> DivisionResults:
+    if on_zero_division not in ZERO_DIVISION_POLICIES:
+        raise ValueError(f"on_zero_division must be one of {', '.join(ZERO_DIVISION_POLICIES)}")
+    if not isinstance(pairs, (list, tuple)):
+        pairs = list(pairs) # Read more than once below
+    errors = bytes([not b for _, b in pairs]) # 1 where the divisor is zero
+    if 1 not in errors:
+        return DivisionResults([a / b for a, b in pairs], errors, message)
+    if on_zero_division == "raise":
+        raise error(message)
+    if on_zero_division == "collect":
+        values = [a / b if b else None for a, b in pairs]
+    elif fill is None:
+        values = [a / b if b else _ieee_quotient(a, b) for a, b in pairs]
+    else:
+        values = [a / b if b else fill for a, b in pairs]
+    return DivisionResults(values, errors, message)
+
+def divide_pairs(pairs, on_zero_division: str = "raise", fill=math.nan) -> DivisionResults:
+    """Divides every (a, b) pair of an iterable without raising per pair.
+
+    ``on_zero_division`` selects what a zero divisor does:
+
+    - ``"raise"``: raises ZeroDivisionError, as divide_by_zero would, before
+      anything is returned;
+    - ``"collect"``: the pair's value is None;
+    - ``"substitute"``: the pair's value is ``fill`` (NaN by default);
+      ``fill=None`` gives what IEEE 754 division would, ±inf or NaN for 0/0.
+
+    Failed pairs are flagged in the result's ``errors`` either way.
+    """
+    return _divide_pairs(pairs, on_zero_division, fill, ZeroDivisionError, "Division by zero!")
+
 def raise_custom_error(message: str):
     """Raises a custom ValueError."""
     if not isinstance(message, str):
         raise TypeError("Message must be a string")
     if not message:
         raise ValueError("Cannot raise error with empty message")
-    raise ValueError(message)
\ No newline at end of file
+    raise ValueError(message)
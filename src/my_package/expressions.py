@@ -0,0 +1,173 @@
+"""Compiled arithmetic formulas over named variables
+
+Formulas such as ``"(x + 3) * y - z"`` are parsed once into a Python
+function and cached by their text, so evaluating a stored formula costs
+one call instead of a chain of basic_math or Calculator calls::
+
+    formula = compile_expression("(x + 3) * y - z")
+    formula.evaluate({"x": 1, "y": 2, "z": 0.5})          # 7.5
+    formula.evaluate_batch({"x": xs, "y": ys, "z": 0.5})   # one value per row
+
+A formula may use numbers, variable names, ``+``, ``-``, ``*``, ``/``,
+unary minus and parentheses. The operators mean what basic_math.add,
+subtract and multiply do; division by zero raises DivisionByZeroError,
+which is both a CalculationError and a ZeroDivisionError.
+"""
+import ast
+import functools
+import math
+import numbers
+from itertools import repeat
+
+from .basic_math import _numpy_for, _store
+from .calculator import CalculationError
+
+class DivisionByZeroError(CalculationError, ZeroDivisionError):
+    """Raised when a formula divides by zero."""
+    pass
+
+_OPERATORS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+_UNARY_OPERATORS = {ast.USub: "-", ast.UAdd: "+"}
+
+class _Emitter:
+    """Turns a validated formula AST into Python source over v0, v1, ... (one per variable)."""
+    def __init__(self, text: str, checked_division: bool):
+        self.text = text
+        self.checked_division = checked_division
+        self.variables = {} # Name -> parameter index, in order of first use
+
+    def emit(self, node) -> str:
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right = self.emit(node.left), self.emit(node.right)
+            if self.checked_division and isinstance(node.op, ast.Div):
+                return f"_divide({left}, {right})"
+            return f"({left} {_OPERATORS[type(node.op)]} {right})"
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return f"({_UNARY_OPERATORS[type(node.op)]}{self.emit(node.operand)})"
+        if isinstance(node, ast.Name):
+            return f"v{self.variables.setdefault(node.id, len(self.variables))}"
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            if not math.isfinite(node.value):
+                return "_INF" # repr() would give "inf"; literals such as 1e999 overflow to it
+            return repr(node.value)
+        raise ValueError(f"Unsupported element in formula {self.text!r}: {ast.unparse(node)!r}")
+
+def _divide_arrays(a, b):
+    """Division for the NumPy path, which would otherwise return inf or nan for a zero divisor."""
+    zero = (b == 0).any() if _numpy_for(b) is not None else b == 0
+    if zero:
+        raise DivisionByZeroError("Division by zero!")
+    return a / b
+
+class Expression:
+    """A compiled formula; use compile_expression to get one from the cache.
+
+    ``variables`` lists the variable names in order of first use, which is
+    also the order positional arguments of ``__call__`` are taken in.
+    """
+    def __init__(self, text: str):
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid formula {text!r}: {e.msg}") from None
+        self.text = text
+        emitter = _Emitter(text, checked_division=False)
+        body = emitter.emit(tree.body)
+        self.variables = tuple(emitter.variables)
+        params = ", ".join(f"v{i}" for i in range(len(self.variables)))
+        columns = ", ".join(f"c{i}" for i in range(len(self.variables)))
+        array_body = _Emitter(text, checked_division=True).emit(tree.body)
+        row = f"({params},)" if self.variables else "_"
+        lookups = "".join(f"    v{i} = values[{name!r}]\n" for i, name in enumerate(self.variables))
+        source = (f"def scalar({params}):\n    return {body}\n"
+                  f"def mapping(values):\n{lookups}    return {body}\n"
+                  f"def rows({columns}):\n    return [{body} for {row} in zip({columns})]\n"
+                  f"def arrays({params}):\n    return {array_body}\n")
+        namespace = {"_divide": _divide_arrays, "_INF": math.inf}
+        exec(compile(source, f"<formula {text!r}>", "exec"), namespace)
+        self._scalar = namespace["scalar"]
+        self._mapping = namespace["mapping"]
+        self._rows = namespace["rows"]
+        self._arrays = namespace["arrays"]
+
+    def __repr__(self):
+        return f"Expression({self.text!r})"
+
+    def __call__(self, *args):
+        """Evaluates the formula with one positional value per variable."""
+        try:
+            return self._scalar(*args)
+        except ZeroDivisionError:
+            raise DivisionByZeroError("Division by zero!") from None
+
+    def _arguments(self, values: dict) -> list:
+        try:
+            return [values[name] for name in self.variables]
+        except KeyError as e:
+            raise ValueError(f"No value for variable {e.args[0]!r} in formula {self.text!r}") from None
+
+    def evaluate(self, values: dict):
+        """Evaluates the formula for one set of variable values (extra keys are ignored)."""
+        try:
+            return self._mapping(values)
+        except ZeroDivisionError:
+            raise DivisionByZeroError("Division by zero!") from None
+        except KeyError as e:
+            raise ValueError(f"No value for variable {e.args[0]!r} in formula {self.text!r}") from None
+
+    def evaluate_batch(self, columns: dict, out=None):
+        """Evaluates the formula row by row over columns of variable values.
+
+        Columns may be sequences, ``array.array`` objects, memoryviews or
+        NumPy arrays of equal length; a scalar is used for every row.
+        Returns a list (an ndarray on the NumPy path) unless ``out`` is
+        given, in which case results are written into it and it is returned.
+        """
+        arguments = self._arguments(columns)
+        np = _numpy_for(*arguments, out)
+        if np is not None:
+            result = self._arrays(*(column if isinstance(column, numbers.Number) else np.asarray(column)
+                                    for column in arguments))
+            if out is None:
+                return result
+            out[...] = result
+            return out
+        lengths = {len(column) for column in arguments if not isinstance(column, numbers.Number)}
+        if not lengths:
+            raise TypeError("At least one variable must be given a sequence.")
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        n = lengths.pop()
+
+        def expanded():
+            return [repeat(column, n) if isinstance(column, numbers.Number) else column for column in arguments]
+
+        try:
+            values = self._rows(*expanded())
+        except ZeroDivisionError:
+            row = next(index for index, row_values in enumerate(zip(*expanded()))
+                       if _divides_by_zero(self._scalar, row_values))
+            raise DivisionByZeroError(f"Division by zero! (row {row})") from None
+        if out is None:
+            return values
+        return _store(out, values, n)
+
+def _divides_by_zero(func, args) -> bool:
+    try:
+        func(*args)
+    except ZeroDivisionError:
+        return True
+    return False
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(text: str) -> Expression:
+    """Returns the compiled Expression for a formula, from an LRU cache keyed by its text.
+
+    Raises ValueError for formulas that do not parse or use anything
+    besides numbers, variables, + - * /, unary minus and parentheses.
+    """
+    return Expression(text)
+
+def evaluate(text: str, values: dict):
+    """Evaluates a formula for one set of variable values, compiling it on first use."""
+    return compile_expression(text).evaluate(values)
@@ -0,0 +1,265 @@
+"""Output formats for processed data, with matching readers
+
+Processed data is a dict with 'count', 'items' and 'timestamp' keys.
+
+- ``json``: pretty-printed JSON (the original format).
+- ``compact``: JSON without whitespace.
+- ``ndjson``: a header line ``{"count": ..., "timestamp": ...}`` followed by
+  one JSON-encoded item per line.
+- ``columnar``: a binary layout that can be memory-mapped and indexed
+  without parsing the whole file::
+
+      magic       8 bytes   b"MPCOL1\\0\\0"
+      count       uint64    little-endian
+      timestamp   float64   little-endian
+      offsets     (count + 1) x uint64, little-endian, into the string blob
+      blob        UTF-8 encoded item names, back to back
+
+- ``dictionary``: for repetitive names, each distinct name is stored once
+  and every item as a small integer code into that symbol table::
+
+      magic       8 bytes   b"MPDIC1\\0\\0"
+      count       uint64    little-endian
+      timestamp   float64   little-endian
+      symbols     uint32    number of distinct names
+      width       uint8     bytes per code: 1, 2 or 4
+      padding     3 bytes
+      offsets     (symbols + 1) x uint64, little-endian, into the symbol blob
+      codes       count x width-byte unsigned ints, little-endian
+      blob        UTF-8 encoded symbols, back to back
+
+  ``load`` returns the items as EncodedItems, which decodes a name only
+  when it is accessed. Items with more than ``MAX_SYMBOLS`` distinct
+  names are refused with ValueError, since the symbol table is built in
+  memory; the columnar format suits them better anyway.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+
+FORMATS = ("json", "compact", "ndjson", "columnar", "dictionary")
+
+COLUMNAR_MAGIC = b"MPCOL1\0\0"
+_COLUMNAR_HEADER = struct.Struct("<8sQd")
+DICTIONARY_MAGIC = b"MPDIC1\0\0"
+_DICTIONARY_HEADER = struct.Struct("<8sQdIB3x")
+_CODE_TYPECODES = {1: "B", 2: "H", 4: "I"} # Code width in bytes -> array typecode
+MAX_SYMBOLS = 1 << 20 # Most distinct names the dictionary format interns
+_INTERN_CHUNK = 1 << 16 # Names interned at a time by encode_items before checking the bound
+
+def check_format(format: str) -> None:
+    """Raises ValueError for unknown format names."""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown output format: {format!r} (expected one of {', '.join(FORMATS)})")
+
+def dump(processed: dict, f, format: str = "json") -> None:
+    """Writes processed data to the binary file f in the given format."""
+    check_format(format)
+    if format != "dictionary" and isinstance(processed["items"], EncodedItems):
+        processed = {**processed, "items": list(processed["items"])}
+    if format == "json":
+        f.write(json.dumps(processed, indent=4).encode('utf-8'))
+    elif format == "compact":
+        f.write(json.dumps(processed, separators=(",", ":")).encode('utf-8'))
+    elif format == "ndjson":
+        header = {"count": processed["count"], "timestamp": processed["timestamp"]}
+        lines = [json.dumps(header)]
+        lines.extend(map(json.dumps, processed["items"]))
+        lines.append("")
+        f.write("\n".join(lines).encode('utf-8'))
+    elif format == "columnar":
+        _dump_columnar(processed, f)
+    else:
+        _dump_dictionary(processed, f)
+
+def _dump_columnar(processed: dict, f) -> None:
+    items = processed["items"]
+    if not all(isinstance(item, str) for item in items):
+        raise TypeError("Columnar format requires string item names.")
+    encoded = [item.encode('utf-8') for item in items]
+    offsets = array("Q", accumulate(map(len, encoded), initial=0))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    f.write(_COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, len(encoded), processed["timestamp"]))
+    f.write(offsets.tobytes())
+    f.write(b"".join(encoded))
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _dump_dictionary(processed: dict, f) -> None:
+    items = processed["items"]
+    if not isinstance(items, EncodedItems):
+        if not all(isinstance(item, str) for item in items):
+            raise TypeError("Dictionary format requires string item names.")
+        items = encode_items(items, MAX_SYMBOLS)
+        if items is None:
+            raise ValueError(f"Dictionary format holds at most {MAX_SYMBOLS} distinct item names; "
+                             f"use the columnar format for these items.")
+    if not all(isinstance(symbol, str) for symbol in items.symbols):
+        raise TypeError("Dictionary format requires string item names.")
+    encoded = [symbol.encode('utf-8') for symbol in items.symbols]
+    offsets = array("Q", accumulate(map(len, encoded), initial=0))
+    f.write(_DICTIONARY_HEADER.pack(DICTIONARY_MAGIC, len(items), processed["timestamp"],
+                                    len(encoded), items.codes.itemsize))
+    f.write(_little_endian(offsets))
+    f.write(_little_endian(items.codes))
+    f.write(b"".join(encoded))
+
+def _load_dictionary(data: bytes) -> dict:
+    magic, count, timestamp, symbol_count, width = _DICTIONARY_HEADER.unpack_from(data)
+    if magic != DICTIONARY_MAGIC:
+        raise ValueError("Not a dictionary-encoded file.")
+    offsets = array("Q")
+    start = _DICTIONARY_HEADER.size
+    codes_start = start + 8 * (symbol_count + 1)
+    offsets.frombytes(data[start:codes_start])
+    codes = array(_CODE_TYPECODES[width])
+    blob_start = codes_start + width * count
+    codes.frombytes(data[codes_start:blob_start])
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        codes.byteswap()
+    blob = data[blob_start:]
+    symbols = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(symbol_count)]
+    return {"count": count, "items": EncodedItems(codes, symbols), "timestamp": timestamp}
+
+def load(filepath: str, format: str = "json") -> dict:
+    """Reads a file written by ``dump`` back into a processed-data dict."""
+    check_format(format)
+    if format == "columnar":
+        with ColumnarItems(filepath) as items:
+            return {"count": len(items), "items": list(items), "timestamp": items.timestamp}
+    with open(filepath, 'rb') as f:
+        if format == "dictionary":
+            return _load_dictionary(f.read())
+        if format != "ndjson":
+            return json.loads(f.read())
+        header = json.loads(f.readline())
+        # One decoder call for all lines instead of one per item
+        items = json.loads(b"[" + b",".join(line for line in f if line.strip()) + b"]")
+    return {"count": header["count"], "items": items, "timestamp": header["timestamp"]}
+
+class ColumnarItems:
+    """Random access to the items of a columnar file through a memory map.
+
+    Only the requested items are decoded. Use as a context manager, or call
+    ``close()`` when done.
+    """
+    def __init__(self, filepath: str):
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, count, self.timestamp = _COLUMNAR_HEADER.unpack_from(self._mmap)
+            if magic != COLUMNAR_MAGIC:
+                raise ValueError(f"{filepath} is not a columnar file.")
+            start = _COLUMNAR_HEADER.size
+            self._blob_start = start + 8 * (count + 1)
+            offsets = memoryview(self._mmap)[start:self._blob_start]
+            if sys.byteorder == "little":
+                self._offsets = offsets.cast("Q")
+            else:
+                self._offsets = array("Q")
+                self._offsets.frombytes(offsets)
+                self._offsets.byteswap()
+                offsets.release()
+            self._count = count
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("columnar item index out of range")
+        base = self._blob_start
+        return self._mmap[base + self._offsets[index]:base + self._offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self) -> None:
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+# --- Dictionary encoding ---
+
+class EncodedItems(Sequence):
+    """Item names stored as integer codes into a table of distinct names.
+
+    ``codes`` is an ``array`` of unsigned ints (as narrow as the number of
+    symbols allows) and ``symbols`` the list of distinct names; item ``i``
+    is ``symbols[codes[i]]``, looked up only when accessed. Compares equal
+    to any sequence with the same names.
+    """
+    __slots__ = ("codes", "symbols")
+
+    def __init__(self, codes: array, symbols: list):
+        self.codes = codes
+        self.symbols = symbols
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(self.symbols.__getitem__, self.codes[index]))
+        return self.symbols[self.codes[index]]
+
+    def __iter__(self):
+        return map(self.symbols.__getitem__, self.codes)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, EncodedItems) and other.symbols == self.symbols:
+            return other.codes == self.codes
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(other) == len(self) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"EncodedItems({len(self.codes)} items, {len(self.symbols)} symbols)"
+
+def encode_items(items, max_symbols: int | None = None) -> EncodedItems | None:
+    """Dictionary-encodes a sequence of names, giving each distinct name one code.
+
+    Symbols are numbered in order of first appearance. Returns None if
+    there are more than ``max_symbols`` distinct names, or names that
+    cannot be encoded (unhashable ones), so callers can keep the plain list.
+    Names are interned a chunk at a time and interning stops at the chunk
+    that goes over ``max_symbols``, so the table never grows much past it.
+    """
+    index = {}
+    try:
+        for start in range(0, len(items), _INTERN_CHUNK):
+            for symbol in dict.fromkeys(items[start:start + _INTERN_CHUNK]):
+                if symbol not in index:
+                    index[symbol] = len(index)
+            if max_symbols is not None and len(index) > max_symbols:
+                return None
+    except TypeError:
+        return None
+    symbols = list(index)
+    width = 1 if len(symbols) <= 1 << 8 else 2 if len(symbols) <= 1 << 16 else 4
+    return EncodedItems(array(_CODE_TYPECODES[width], map(index.__getitem__, items)), symbols)
@@ -0,0 +1,156 @@
+"""Timing and tracing hooks for the data pipeline stages
+
+Pipeline code wraps each stage in ``stage(name)``. While no tracer is
+enabled this returns a shared no-op context, so the cost is one function
+call. Enable a Tracer to have every stage timed and reported to its sinks::
+
+    histogram = HistogramSink()
+    with enabled(Tracer(histogram)):
+        complex_data_pipeline(url, output_file)
+    print(histogram.summary()["fetch"]["p95"])
+
+A sink is any callable taking a StageEvent.
+"""
+import contextlib
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import NamedTuple
+
+class StageEvent(NamedTuple):
+    """One completed stage: its name, duration in seconds and counters."""
+    stage: str
+    duration: float
+    items: int
+    bytes: int
+    error: bool
+
+class _Span:
+    """Counters of a running stage; code inside the stage may set them."""
+    __slots__ = ("items", "bytes")
+
+    def __init__(self):
+        self.items = 0
+        self.bytes = 0
+
+    def __bool__(self) -> bool:
+        return True
+
+class _NullSpan:
+    """Stand-in span while tracing is disabled; ignores writes and is falsy."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __bool__(self) -> bool:
+        return False
+
+_NULL_STAGE = contextlib.nullcontext(_NullSpan())
+
+class Tracer:
+    """Times stages and sends a StageEvent to every sink."""
+    def __init__(self, *sinks, clock=time.perf_counter):
+        self.sinks = list(sinks)
+        self._clock = clock
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        span = _Span()
+        error = False
+        start = self._clock()
+        try:
+            yield span
+        except BaseException:
+            error = True
+            raise
+        finally:
+            event = StageEvent(name, self._clock() - start, span.items, span.bytes, error)
+            for sink in self.sinks:
+                sink(event)
+
+_tracer = None
+
+def stage(name: str):
+    """Returns a context manager timing the named stage with the enabled tracer.
+
+    The context value is a span whose ``items`` and ``bytes`` may be set;
+    it is falsy while tracing is disabled, so counters that are costly to
+    compute can be skipped with ``if span:``.
+    """
+    if _tracer is None:
+        return _NULL_STAGE
+    return _tracer.stage(name)
+
+def enable(tracer: Tracer | None) -> None:
+    """Makes tracer the process-wide tracer (None disables tracing)."""
+    global _tracer
+    _tracer = tracer
+
+@contextlib.contextmanager
+def enabled(tracer: Tracer):
+    """Enables tracer for the duration of the block."""
+    previous = _tracer
+    enable(tracer)
+    try:
+        yield tracer
+    finally:
+        enable(previous)
+
+# --- Sinks ---
+
+class LoggingSink:
+    """Logs each stage event as a structured record."""
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, event: StageEvent) -> None:
+        self.logger.log(self.level, "stage=%s duration=%.6f items=%d bytes=%d error=%s",
+                        event.stage, event.duration, event.items, event.bytes, event.error,
+                        extra={"stage_event": event._asdict()})
+
+class HistogramSink:
+    """Keeps every stage duration in memory and reports latency percentiles."""
+    def __init__(self):
+        self._durations = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: StageEvent) -> None:
+        with self._lock:
+            durations = self._durations.get(event.stage)
+            if durations is None:
+                durations = self._durations[event.stage] = array("d")
+                self._totals[event.stage] = [0, 0, 0]
+            durations.append(event.duration)
+            totals = self._totals[event.stage]
+            totals[0] += event.items
+            totals[1] += event.bytes
+            totals[2] += event.error
+
+    def percentile(self, stage: str, q: float) -> float:
+        """Returns the q-th percentile (0-100) of a stage's durations."""
+        with self._lock:
+            durations = sorted(self._durations[stage])
+        return _nearest_rank(durations, q)
+
+    def summary(self) -> dict:
+        """Returns count, total, p50/p95/p99 latency and counters per stage."""
+        with self._lock:
+            stages = {name: (sorted(durations), list(self._totals[name]))
+                      for name, durations in self._durations.items()}
+        summary = {}
+        for name, (durations, (items, nbytes, errors)) in stages.items():
+            summary[name] = {"count": len(durations), "total": sum(durations),
+                             "p50": _nearest_rank(durations, 50), "p95": _nearest_rank(durations, 95),
+                             "p99": _nearest_rank(durations, 99),
+                             "items": items, "bytes": nbytes, "errors": errors}
+        return summary
+
+def _nearest_rank(sorted_values, q: float) -> float:
+    """Returns the q-th percentile (0-100) of sorted values by the nearest-rank method."""
+    rank = max(1, math.ceil(len(sorted_values) * q / 100))
+    return sorted_values[rank - 1]
@@ -0,0 +1,256 @@
+"""Per-host rate limiting and adaptive concurrency for the fetch path
+
+A RateLimiter keeps, for every host it sees:
+
+- a token bucket holding requests to ``rate`` per second (bursts of up to
+  ``burst``), when a rate is given;
+- a concurrency limit adjusted by AIMD (additive increase, multiplicative
+  decrease), when ``max_concurrency`` is given. Each successful request
+  that used the whole limit raises it by about one per limit's worth of
+  requests; a 429 or 503 response, a failed request or a latency well
+  above the host's baseline cuts it by ``backoff``. Requests over the limit
+  wait in a queue.
+
+fetch_data_from_api takes a permit for every attempt::
+
+    limiter = RateLimiter(rate=50, max_concurrency=16)
+    fetch_many(urls, max_workers=32, rate_limiter=limiter)
+    limiter.stats()["api.example.com"].limit
+"""
+import contextlib
+import math
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average, and bursts of up to ``burst``.
+
+    The bucket starts full. ``acquire`` reserves a token and sleeps until
+    it is due, so waiting callers are served in the order they arrived.
+    """
+    def __init__(self, rate: float, burst: float | None = None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, rate if burst is None else burst)
+        self._tokens = self.burst
+        self._updated = clock()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Tokens available now; negative while acquisitions are waiting."""
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+    def try_acquire(self) -> bool:
+        """Takes a token if one is available now."""
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        """Takes a token, waiting until it is due; returns the time waited."""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+class AdaptiveConcurrency:
+    """Concurrency limit for one host, adjusted by AIMD from request outcomes.
+
+    ``limit`` stays between ``min_limit`` and ``max_limit``. A smoothed
+    latency above ``latency_tolerance`` times the baseline (a slowly rising
+    minimum of recent latencies) counts as a sign of overload, like a 429
+    or 503. The limit is cut at most once per smoothed latency, so a
+    burst of rejections from requests sent together only halves it once.
+    """
+    def __init__(self, max_limit: int, initial_limit: int | None = None, min_limit: int = 1,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0, clock=time.monotonic):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Concurrency limits must satisfy 1 <= min_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(max_limit if initial_limit is None else min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.queued = 0
+        self.baseline = None # Latency of an unloaded request, in seconds
+        self.latency = None # Smoothed latency
+        self._last_decrease = -math.inf
+        self._clock = clock
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Waits until a request fits under the limit and counts it as in flight."""
+        with self._condition:
+            self.queued += 1
+            try:
+                while self.in_flight >= int(self.limit):
+                    self._condition.wait()
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+
+    def release(self, latency: float | None, overloaded: bool) -> None:
+        """Ends a request, adjusting the limit; latency is None for a request that failed."""
+        with self._condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if latency is None:
+                overloaded = True
+            else:
+                self._observe(latency)
+                overloaded = overloaded or self.latency > self.latency_tolerance * self.baseline
+            if overloaded:
+                now = self._clock()
+                if now - self._last_decrease >= (self.latency or 0.0):
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            elif saturated:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _observe(self, latency: float) -> None:
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += 0.01 * (latency - self.baseline) # Follows a host that got slower for good
+        self.latency = latency if self.latency is None else self.latency + 0.2 * (latency - self.latency)
+
+class HostStats(NamedTuple):
+    """Live state of one host's limits.
+
+    The concurrency fields are None without adaptive concurrency and
+    ``tokens`` is None without a rate. ``overloads`` counts 429/503
+    responses and failed requests.
+    """
+    limit: int | None
+    in_flight: int | None
+    queued: int | None
+    baseline_latency: float | None
+    latency: float | None
+    requests: int
+    overloads: int
+    tokens: float | None
+
+class Permit:
+    """A granted request; set ``status`` to the response status before the permit is released."""
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = None
+
+class _Host:
+    __slots__ = ("bucket", "concurrency", "requests", "overloads")
+
+    def __init__(self, bucket, concurrency):
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.requests = 0
+        self.overloads = 0
+
+class RateLimiter:
+    """Per-host token buckets and adaptive concurrency limits, shared by every fetch made with it.
+
+    ``rate`` and ``burst`` configure the token buckets (no rate limit if
+    rate is None). ``max_concurrency`` enables the adaptive concurrency
+    limit, starting at ``initial_concurrency`` (max_concurrency if not
+    given); the other options are passed to AdaptiveConcurrency. Responses
+    with a status in ``overload_statuses`` count as overload.
+    """
+    def __init__(self, rate: float | None = None, burst: float | None = None,
+                 max_concurrency: int | None = None, initial_concurrency: int | None = None,
+                 min_concurrency: int = 1, backoff: float = 0.5, latency_tolerance: float = 2.0,
+                 overload_statuses=(429, 503), clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.overload_statuses = frozenset(overload_statuses)
+        self._concurrency_options = {"initial_limit": initial_concurrency, "min_limit": min_concurrency,
+                                     "backoff": backoff, "latency_tolerance": latency_tolerance}
+        self._clock = clock
+        self._sleep = sleep
+        self._hosts = {}
+        self._lock = threading.Lock()
+        if max_concurrency is not None: # Fail on bad options now rather than on the first request
+            self._new_host()
+
+    def _new_host(self) -> _Host:
+        bucket = None if self.rate is None else TokenBucket(self.rate, self.burst, self._clock, self._sleep)
+        concurrency = None
+        if self.max_concurrency is not None:
+            concurrency = AdaptiveConcurrency(self.max_concurrency, clock=self._clock, **self._concurrency_options)
+        return _Host(bucket, concurrency)
+
+    def _host(self, key: str) -> _Host:
+        host = self._hosts.get(key)
+        if host is None:
+            with self._lock:
+                host = self._hosts.get(key)
+                if host is None:
+                    host = self._hosts[key] = self._new_host()
+        return host
+
+    @contextlib.contextmanager
+    def request(self, api_url: str):
+        """Waits for the URL's host to allow a request and yields a Permit for it.
+
+        The token bucket is waited on before a concurrency slot is taken,
+        so requests held back by the rate don't occupy the host's limit.
+        Latency is measured from when the permit is granted to when the
+        block exits; an exception leaving the block counts as overload.
+        """
+        host = self._host(urlsplit(api_url).netloc)
+        if host.bucket is not None:
+            host.bucket.acquire()
+        concurrency = host.concurrency
+        if concurrency is not None:
+            concurrency.acquire()
+        permit = Permit()
+        latency = None
+        try:
+            start = self._clock()
+            yield permit
+            latency = self._clock() - start
+        finally:
+            overloaded = latency is None or permit.status in self.overload_statuses
+            with self._lock:
+                host.requests += 1
+                host.overloads += overloaded
+            if concurrency is not None:
+                concurrency.release(latency, overloaded)
+
+    def stats(self) -> dict[str, HostStats]:
+        """Returns the current state of every host seen so far."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        stats = {}
+        for key, host in hosts.items():
+            concurrency = host.concurrency
+            tokens = None if host.bucket is None else host.bucket.tokens
+            if concurrency is None:
+                stats[key] = HostStats(None, None, None, None, None, host.requests, host.overloads, tokens)
+            else:
+                stats[key] = HostStats(int(concurrency.limit), concurrency.in_flight, concurrency.queued,
+                                       concurrency.baseline, concurrency.latency, host.requests, host.overloads,
+                                       tokens)
+        return stats
@@ -0,0 +1,193 @@
+"""Retry policy with backoff, retry budget, deadlines and per-host circuit breaking"""
+import random
+import threading
+import time
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the host's circuit is open."""
+    pass
+
+class RetryBudget:
+    """Limits retries to a fraction of the requests made.
+
+    Each request deposits ``ratio`` tokens and each retry spends one, so
+    under sustained failure at most about ``ratio`` extra requests are sent
+    per request. ``min_tokens`` allows some retries before any deposits.
+    """
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10, max_tokens: float = 100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Takes one token for a retry; returns False if none are left."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+class _Circuit:
+    __slots__ = ("failures", "opened_at", "trial")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+class CircuitBreaker:
+    """Tracks consecutive failures per key (usually a host).
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are refused with CircuitOpenError. Once ``reset_timeout`` seconds
+    have passed a single trial call is let through: success closes the
+    circuit, failure opens it again.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def state(self, key: str) -> str:
+        """Returns 'closed', 'open' or 'half-open' for key."""
+        circuit = self._circuits.get(key)
+        if circuit is None or circuit.opened_at is None:
+            return "closed"
+        if circuit.trial or self._clock() - circuit.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self, key: str) -> None:
+        """Raises CircuitOpenError if calls to key are currently refused."""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return
+            if circuit.trial or self._clock() - circuit.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit open for {key}")
+            circuit.trial = True
+
+    def record_success(self, key: str) -> None:
+        with self._lock:
+            self._circuits.pop(key, None)
+
+    def record_failure(self, key: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.failures += 1
+            if circuit.trial or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = self._clock()
+                circuit.trial = False
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Converts a Retry-After header (seconds or HTTP date) into a delay in seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    import email.utils # Slow to import and rarely needed
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+class RetryPolicy:
+    """Decides whether and when a failed call is attempted again.
+
+    Calls are retried on the exception types given to ``call`` and on
+    errors carrying a response whose status is in ``retry_statuses``, up to
+    ``max_attempts`` attempts in total. Delays use exponential backoff with
+    full jitter (``base_delay * 2 ** n``, capped at ``max_delay``) unless
+    the response has a Retry-After header; a Retry-After longer than
+    ``max_delay`` ends the retries rather than holding the caller that
+    long. Each attempt gets at most ``attempt_timeout`` seconds and all
+    attempts together at most ``total_timeout`` seconds. An optional
+    RetryBudget and CircuitBreaker are shared by every call made through
+    the policy.
+    """
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.1, max_delay: float = 10.0,
+                 attempt_timeout: float = 5.0, total_timeout: float | None = None,
+                 retry_statuses=(429, 500, 502, 503, 504), budget: RetryBudget | None = None,
+                 breaker: CircuitBreaker | None = None, sleep=time.sleep, clock=time.monotonic,
+                 rng=random.random):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.total_timeout = total_timeout
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget = budget
+        self.breaker = breaker
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng
+
+    def backoff(self, attempt: int) -> float:
+        """Returns the delay before retrying after the given failed attempt (1-based)."""
+        return self._rng() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def _classify(self, error: Exception, retryable) -> tuple[bool, float | None]:
+        """Returns whether error is transient, and the server's Retry-After delay if any."""
+        response = getattr(error, "response", None)
+        if response is not None:
+            if response.status_code not in self.retry_statuses:
+                return False, None
+            return True, parse_retry_after(response.headers.get("Retry-After"))
+        return isinstance(error, retryable), None
+
+    def call(self, func, key: str = "", retryable=()):
+        """Calls func(timeout) until it succeeds or retrying is no longer allowed.
+
+        ``key`` identifies the circuit (usually the host). The last error is
+        re-raised when giving up; CircuitOpenError is raised when the
+        circuit refuses the call.
+        """
+        deadline = None if self.total_timeout is None else self._clock() + self.total_timeout
+        if self.budget is not None:
+            self.budget.record_request()
+        attempt = 1
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_call(key)
+            timeout = self.attempt_timeout
+            if deadline is not None:
+                timeout = max(0.0, min(timeout, deadline - self._clock()))
+            try:
+                result = func(timeout)
+            except Exception as e:
+                transient, retry_after = self._classify(e, retryable)
+                if self.breaker is not None:
+                    if transient:
+                        self.breaker.record_failure(key)
+                    else:
+                        self.breaker.record_success(key) # The host answered
+                if not transient or attempt >= self.max_attempts:
+                    raise
+                if retry_after is not None and retry_after > self.max_delay:
+                    raise
+                delay = self.backoff(attempt) if retry_after is None else retry_after
+                if deadline is not None and self._clock() + delay >= deadline:
+                    raise
+                if self.budget is not None and not self.budget.try_spend():
+                    raise
+                self._sleep(delay)
+                if deadline is not None and self._clock() >= deadline:
+                    raise # The sleep overran the deadline; an attempt now would get no time
+                attempt += 1
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success(key)
+            return result
@@ -0,0 +1,141 @@
+"""Multi-process runner for large lists of pipeline jobs
+
+Fetching is I/O-bound but decoding and processing the JSON is CPU-bound,
+so a single process tops out at one core. JobRunner sends jobs to a pool
+of worker processes in chunks, keeps a bounded number of chunks in
+flight so arbitrarily long (or lazily generated) job lists run in
+constant memory, and reports one JobResult per job::
+
+    runner = JobRunner(max_workers=8)
+    for result in runner.iter_results(jobs):
+        if not result.ok:
+            print(result.api_url, result.error_type, result.error)
+
+Each worker process keeps its own keep-alive session for its whole life.
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import NamedTuple
+
+from . import data_processor, formats
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+class JobResult(NamedTuple):
+    """Outcome of one (api_url, output_file) job.
+
+    ``index`` is the job's position in the input. On failure ``error_type``
+    is the exception's class name and ``error`` its message.
+    """
+    index: int
+    api_url: str
+    output_file: str
+    ok: bool
+    error_type: str | None
+    error: str | None
+    duration: float
+
+# --- Worker process side ---
+
+_worker_session = None
+_worker_retry = None
+
+def _init_worker(retry: RetryPolicy | None) -> None:
+    global _worker_session, _worker_retry
+    # Ctrl-C is handled by the parent, which lets running chunks finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_session = data_processor.create_session()
+    _worker_retry = retry
+
+def _run_job(index: int, api_url: str, output_file: str, format: str) -> JobResult:
+    """Runs fetch, process and save for one job and records how it ended."""
+    start = time.perf_counter()
+    try:
+        data_processor.run_job(api_url, output_file, _worker_session, format, retry=_worker_retry)
+    except Exception as e:
+        if not isinstance(e, data_processor.JOB_ERRORS):
+            logger.exception("Unexpected error in job %d (%s)", index, api_url)
+        return JobResult(index, api_url, output_file, False, type(e).__name__, str(e),
+                         time.perf_counter() - start)
+    return JobResult(index, api_url, output_file, True, None, None, time.perf_counter() - start)
+
+def _run_chunk(chunk: list, format: str) -> list[JobResult]:
+    return [_run_job(index, api_url, output_file, format) for index, (api_url, output_file) in chunk]
+
+# --- Parent process side ---
+
+class JobRunner:
+    """Runs complex_data_pipeline-style jobs on a pool of worker processes.
+
+    ``max_workers`` defaults to the number of CPUs. Jobs are sent to the
+    workers ``chunk_size`` at a time, and at most ``max_in_flight`` chunks
+    (default: two per worker) are queued or running at once, which bounds
+    both memory use and how far ahead of the results the job iterable is
+    consumed. ``retry`` is copied into every worker process, so it must be
+    picklable, and any budget or breaker it carries is per worker.
+
+    ``cancel()`` may be called from any thread: no further chunks are sent,
+    queued chunks are dropped and running chunks finish, so no output file
+    is left half-written. A KeyboardInterrupt while waiting for results
+    cancels the same way before it is re-raised. Cancelling only affects
+    the run in progress: the next ``iter_results`` or ``run`` starts anew.
+    """
+    def __init__(self, max_workers: int | None = None, chunk_size: int = 64,
+                 max_in_flight: int | None = None, format: str = "json",
+                 retry: RetryPolicy | None = None, mp_context=None):
+        formats.check_format(format)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.format = format
+        self.retry = retry
+        self.mp_context = mp_context
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Stops dispatching jobs; results of chunks already running are still reported."""
+        self._cancelled.set()
+
+    def iter_results(self, jobs):
+        """Runs (api_url, output_file) jobs and yields a JobResult per job as chunks complete.
+
+        Results come in completion order; use ``JobResult.index`` to match
+        them to the input. Jobs dropped by cancellation yield no result.
+        """
+        self._cancelled.clear()
+        jobs = enumerate(jobs)
+        chunks = iter(lambda: [(index, tuple(job)) for index, job in islice(jobs, self.chunk_size)], [])
+        executor = ProcessPoolExecutor(self.max_workers, mp_context=self.mp_context,
+                                       initializer=_init_worker, initargs=(self.retry,))
+        try:
+            for _, future in data_processor._iter_bounded(executor, partial(_run_chunk, format=self.format), chunks,
+                                                          self.max_in_flight, stop=self._cancelled.is_set):
+                yield from future.result()
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; waiting for running jobs to finish")
+            self.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, jobs) -> list[JobResult]:
+        """Runs all jobs and returns their results in input order."""
+        return sorted(self.iter_results(jobs), key=lambda result: result.index)
+
+def run_jobs(jobs, max_workers: int | None = None, chunk_size: int = 64, format: str = "json",
+             retry: RetryPolicy | None = None) -> list[JobResult]:
+    """Runs (api_url, output_file) jobs on a process pool; returns a JobResult per job in input order."""
+    return JobRunner(max_workers, chunk_size, format=format, retry=retry).run(jobs)
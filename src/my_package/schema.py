@@ -0,0 +1,174 @@
+"""Compiled schemas for validating API payloads and extracting fields
+
+A PayloadSchema is declared once and applied to many payloads. It pulls
+the configured fields out of every item in ``results`` into one column
+per field, validating types in bulk::
+
+    schema = PayloadSchema(Field("name", str, default="Unknown"), Field("value", float))
+    extraction = schema.extract(payload)
+    extraction.columns["value"]   # array('d', [...])
+    extraction.invalid            # [(index, reason), ...]
+
+Well-formed payloads take a fast path that extracts each column with a
+single C-level pass. Only when that pass fails are items examined one by
+one, so malformed rows are reported by index and skipped instead of
+stopping the run.
+"""
+from array import array
+from itertools import compress
+from operator import itemgetter
+from typing import NamedTuple
+
+class _Required:
+    def __repr__(self):
+        return "REQUIRED"
+
+REQUIRED = _Required()
+
+# Column storage per field type: a typecode for compact arrays, or None for lists
+_TYPECODES = {int: "q", float: "d", str: None, bool: None, None: None}
+_FieldType = type | None # Field.type shadows the builtin inside the class body
+
+class Field(NamedTuple):
+    """One field to extract from each item.
+
+    ``type`` is str, int, float, bool or None (any value, no check); int and
+    float columns are stored as ``array('q')`` and ``array('d')``, the
+    others as lists. Items missing ``key`` get ``default``, or are invalid
+    if the field is REQUIRED.
+    """
+    key: str
+    type: _FieldType = None
+    default: object = REQUIRED
+
+class Extraction(NamedTuple):
+    """Columns of the valid rows, their count, and (index, reason) for each invalid row."""
+    columns: dict
+    count: int
+    invalid: list
+
+def _check_payload(payload) -> list:
+    if not isinstance(payload, dict):
+        raise TypeError("Input data must be a dictionary.")
+    if 'results' not in payload or not isinstance(payload['results'], list):
+        raise ValueError("Input data must contain a 'results' list.")
+    return payload['results']
+
+class PayloadSchema:
+    """Extracts the declared fields from a payload's 'results' items."""
+    def __init__(self, *fields: Field):
+        if not fields:
+            raise ValueError("A schema needs at least one field")
+        for field in fields:
+            if field.type not in _TYPECODES:
+                raise ValueError(f"Unsupported field type: {field.type!r}")
+        self.fields = fields
+        self._getters = [itemgetter(field.key) for field in fields]
+
+    def extract(self, payload: dict) -> Extraction:
+        """Validates payload and returns the extracted columns.
+
+        Raises TypeError or ValueError, as process_and_save_data does, when
+        the payload itself is malformed; bad items only end up in
+        ``Extraction.invalid``.
+        """
+        items = _check_payload(payload)
+        columns = self._extract_fast(items)
+        if columns is not None:
+            return Extraction(columns, len(items), [])
+        return self._extract_rows(items)
+
+    def _extract_fast(self, items: list):
+        """Returns the columns, or None if any item needs a closer look."""
+        columns = {}
+        try:
+            for field, getter in zip(self.fields, self._getters):
+                column = list(map(getter, items))
+                if field.type is str or field.type is bool:
+                    if set(map(type, column)) - {field.type}:
+                        return None
+                elif field.type is not None:
+                    if field.type is int and set(map(type, column)) - {int}:
+                        return None # array('q') would accept bools
+                    column = array(_TYPECODES[field.type], column)
+                columns[field.key] = column
+        except (KeyError, TypeError, IndexError, OverflowError):
+            return None
+        return columns
+
+    def _extract_rows(self, items: list) -> Extraction:
+        """Checks the items field by field and drops every row with a problem."""
+        reasons = {} # index -> reason of the first problem found in that row
+        all_objects = set(map(type, items)) <= {dict}
+        raw_columns = []
+        for field in self.fields:
+            key, default = field.key, field.default
+            if all_objects:
+                column = [item.get(key, default) for item in items]
+            else:
+                column = [item.get(key, default) if isinstance(item, dict) else _NOT_AN_OBJECT for item in items]
+            raw_columns.append(column)
+            kinds = set(map(type, column))
+            if field.type is None:
+                bad_kinds = kinds & {_Required, _NotAnObject}
+            else:
+                bad_kinds = kinds - _ALLOWED[field.type]
+            if bad_kinds:
+                for index in compress(range(len(column)), map(bad_kinds.__contains__, map(type, column))):
+                    reasons.setdefault(index, _reason(field, column[index], items[index]))
+
+        while True:
+            dropped = sorted(reasons)
+            try:
+                columns = {}
+                for field, column in zip(self.fields, raw_columns):
+                    values = _drop(column, dropped)
+                    typecode = _TYPECODES[field.type]
+                    columns[field.key] = values if typecode is None else array(typecode, values)
+                break
+            except OverflowError:
+                # Rare: find the ints too large for their array and build again without them
+                for field, column in zip(self.fields, raw_columns):
+                    if _TYPECODES[field.type] is not None:
+                        for index, value in enumerate(column):
+                            if type(value) is int and not _fits(value, field.type):
+                                reasons.setdefault(index, f"'{field.key}' is out of range")
+        return Extraction(columns, len(items) - len(dropped), [(index, reasons[index]) for index in dropped])
+
+def _drop(column: list, dropped: list) -> list:
+    """Returns column without the (sorted) dropped indexes, copying the runs in between."""
+    if not dropped:
+        return column
+    kept = []
+    start = 0
+    for index in dropped:
+        kept += column[start:index]
+        start = index + 1
+    kept += column[start:]
+    return kept
+
+class _NotAnObject:
+    pass
+
+_NOT_AN_OBJECT = _NotAnObject()
+
+# Value types accepted per field type (float columns take ints, like array('d'))
+_ALLOWED = {str: {str}, bool: {bool}, int: {int}, float: {float, int, bool}}
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+def _fits(value: int, field_type) -> bool:
+    if field_type is int:
+        return _INT64_MIN <= value <= _INT64_MAX
+    try:
+        float(value)
+    except OverflowError:
+        return False
+    return True
+
+def _reason(field: Field, value, item) -> str:
+    if value is _NOT_AN_OBJECT:
+        return f"expected an object, got {type(item).__name__}"
+    if value is REQUIRED:
+        return f"missing '{field.key}'"
+    return f"'{field.key}' must be {field.type.__name__}, got {type(value).__name__}"
@@ -0,0 +1,252 @@
+"""Streaming readers for API results stored in local files"""
+import codecs
+import contextlib
+import json
+import mmap
+import os
+import re
+
+_WHITESPACE = re.compile(r"\s*")
+_NUMBER_CHARS = re.compile(r"[0-9eE.+-]*")
+
+def _open_text(source):
+    """Opens a path for reading, or passes an already open text file through."""
+    if hasattr(source, "read"):
+        return contextlib.nullcontext(source)
+    return open(source, 'r', encoding='utf-8')
+
+class _JSONStream:
+    """Reads JSON values one at a time from a text file, chunk by chunk."""
+    def __init__(self, f, chunk_size: int):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON: expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise ValueError(f"Malformed JSON value at offset {self._pos}")
+                continue
+            # A number cut off by the end of the buffer continues in the next chunk
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and _NUMBER_CHARS.match(self._buf, end).end() == len(self._buf) and self._fill()):
+                continue
+            self._pos = end
+            return value
+
+def iter_json_results(source, chunk_size: int = 1 << 16):
+    """Yields the items of the top-level 'results' list of a JSON document.
+
+    ``source`` is a path or an open text file. Only one item is held in
+    memory at a time; other top-level fields are parsed and discarded.
+    """
+    with _open_text(source) as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        found = False
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "results" and stream.peek() == "[":
+                found = True
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ",":
+                            stream.expect(",")
+                        else:
+                            stream.expect("]")
+                            break
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.expect(",")
+            elif stream.peek() != "}":
+                raise ValueError("Malformed JSON: expected ',' or '}'")
+        if not found:
+            raise ValueError("Input data must contain a 'results' list.")
+
+def iter_ndjson_results(source):
+    """Yields one item per non-blank line of a newline-delimited JSON file."""
+    with _open_text(source) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# --- Memory-mapped dumps ---
+
+# One NDJSON line: either a flat JSON object (string, number, true, false,
+# null or NaN/Infinity values only) with exactly one "name" key whose value
+# is a string without escapes, captured with its quotes in group 1, or any
+# other non-blank line, captured in group 2. The flat branch follows the
+# JSON grammar exactly, so a line it accepts is one json.loads would accept
+# with the same name; keys with escapes (which could spell "name") are left
+# to json. Every repetition is followed by something it cannot match, so
+# backtracking stays linear without Python 3.11's possessive quantifiers.
+_WS = rb'[ \t\r]*'
+_PLAIN_STRING = rb'"[^"\\\x00-\x1f]*"'
+_STRING = rb'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+_NUMBER = rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?'
+_SCALAR = rb'(?:' + _STRING + rb'|' + _NUMBER + rb'|true|false|null|NaN|-?Infinity)'
+_MEMBER = rb'(?!"name")' + _PLAIN_STRING + _WS + rb':' + _WS + _SCALAR
+_NDJSON_LINE = re.compile(
+    rb'^' + _WS + rb'\{' + _WS + rb'(?:' + _MEMBER + _WS + rb',' + _WS + rb')*'
+    rb'"name"' + _WS + rb':' + _WS + rb'(' + _PLAIN_STRING + rb')'
+    rb'(?:' + _WS + rb',' + _WS + _MEMBER + rb')*' + _WS + rb'\}' + _WS + rb'$'
+    rb'|^[ \t\r]*$'
+    rb'|^(.+)$', re.MULTILINE)
+
+_BLOCK_SIZE = 1 << 20
+
+class _MappedText:
+    """File-like text reader over a memory map, decoding only the chunks read."""
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._pos = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read(self, size: int) -> str:
+        while True:
+            chunk = self._buffer[self._pos:self._pos + size]
+            self._pos += len(chunk)
+            text = self._decoder.decode(chunk, final=not chunk)
+            if text or not chunk: # A chunk may end inside a multi-byte character
+                return text
+
+class MappedDump:
+    """An archived API response (JSON or NDJSON) opened with mmap.
+
+    The file is mapped read-only rather than read, so opening is
+    immediate whatever its size and pages are loaded as they are reached.
+    ``format`` is "json" (a document with a 'results' list) or "ndjson"
+    (one item per line); by default it follows the file extension
+    (.ndjson and .jsonl are NDJSON).
+
+    For NDJSON, ``iter_names`` scans the map itself a block of lines at a
+    time: a flat record's plain string ``name`` is read straight from the
+    map without decoding the record, and only other records are decoded
+    with json. Flat records are still checked against the JSON grammar,
+    so a malformed line raises as json.loads would; only invalid UTF-8
+    outside the name goes unnoticed.
+    """
+    def __init__(self, path: str, format: str | None = None):
+        if format is None:
+            format = "ndjson" if os.path.splitext(path)[1].lower() in (".ndjson", ".jsonl") else "json"
+        if format not in ("json", "ndjson"):
+            raise ValueError(f"Unknown dump format: {format!r} (expected json or ndjson)")
+        self.path = path
+        self.format = format
+        self.skipped = 0 # Items that were not objects, counted by iter_names
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self._map = None
+                self._buffer = b"" # Empty files cannot be mapped
+            else:
+                self._map = self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(self._map, "madvise"):
+                    self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _blocks(self):
+        """Yields (start, end) of consecutive blocks of whole lines."""
+        buffer = self._buffer
+        size = len(buffer)
+        pos = 0
+        while pos < size:
+            end = buffer.find(b"\n", pos + _BLOCK_SIZE)
+            if end < 0:
+                end = size
+            yield pos, end
+            pos = end + 1
+
+    def iter_results(self):
+        """Yields every result item, decoded."""
+        if self.format == "json":
+            yield from iter_json_results(_MappedText(self._buffer))
+        else:
+            buffer = self._buffer
+            for start, end in self._blocks():
+                for line in buffer[start:end].splitlines():
+                    if line.strip():
+                        yield json.loads(line)
+
+    def iter_names(self, default: str = "Unknown"):
+        """Yields each item's 'name' (``default`` if missing), as process_and_save_data extracts them.
+
+        Items that are not objects are skipped and counted in ``skipped``.
+        """
+        if self.format == "json":
+            items = self.iter_results()
+        else:
+            items = self._iter_ndjson_names()
+        for item in items:
+            if isinstance(item, dict):
+                yield item.get('name', default)
+            elif isinstance(item, _Name):
+                yield item.value
+            else:
+                self.skipped += 1
+
+    def _iter_ndjson_names(self):
+        """Yields a _Name per flat named record (read from the map) and every other record decoded."""
+        buffer = self._buffer
+        for start, end in self._blocks():
+            for name, line in _NDJSON_LINE.findall(buffer, start, end):
+                if name:
+                    yield _Name(name[1:-1].decode('utf-8'))
+                elif line:
+                    yield json.loads(line)
+
+class _Name:
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
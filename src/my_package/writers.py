@@ -0,0 +1,143 @@
+"""Atomic, buffered file writing for the data pipeline"""
+import contextlib
+import itertools
+import os
+import threading
+
+FSYNC_MODES = ("never", "always", "group")
+
+class AtomicWriter:
+    """Writes files atomically through a temporary file and a rename.
+
+    Data goes to a hidden temporary file next to the target, which replaces
+    the target only once it is complete, so readers never see a truncated
+    file. Directories are created once and remembered.
+
+    ``fsync`` controls durability:
+
+    - ``"never"``: no fsync; files survive a process crash but not
+      necessarily a power loss.
+    - ``"always"``: each file and its directory are fsynced before
+      ``open()`` returns.
+    - ``"group"``: completed files are staged and become visible together
+      on ``commit()``, which fsyncs every staged file and each affected
+      directory once. A commit happens automatically every ``group_size``
+      files and when the writer is used as a context manager and exits.
+    """
+    def __init__(self, buffer_size: int = 1 << 20, fsync: str = "never", group_size: int = 64):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_MODES)}")
+        self.buffer_size = buffer_size
+        self.fsync = fsync
+        self.group_size = group_size
+        self._known_dirs = set()
+        self._pending = [] # (temp_path, target_path) staged for the next group commit
+        self._on_visible = {} # Absolute target path -> callbacks to run once it is committed
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def _ensure_dir(self, dirpath: str) -> None:
+        if dirpath not in self._known_dirs:
+            os.makedirs(dirpath, exist_ok=True)
+            self._known_dirs.add(dirpath)
+
+    def _open_temp(self, path: str):
+        dirpath, filename = os.path.split(os.path.abspath(path))
+        temp_path = os.path.join(dirpath, f".{filename}.{os.getpid()}.{threading.get_ident()}.{next(self._counter)}.tmp")
+        self._ensure_dir(dirpath)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        try:
+            fd = os.open(temp_path, flags, 0o666)
+        except FileNotFoundError:
+            # The directory was removed since it was cached
+            self._known_dirs.discard(dirpath)
+            self._ensure_dir(dirpath)
+            fd = os.open(temp_path, flags, 0o666)
+        return temp_path, os.fdopen(fd, 'wb', buffering=self.buffer_size)
+
+    @contextlib.contextmanager
+    def open(self, path: str):
+        """Yields a buffered binary file whose contents replace path on success.
+
+        If the block raises, the temporary file is removed and path is left
+        untouched.
+        """
+        temp_path, f = self._open_temp(path)
+        try:
+            with f:
+                yield f
+                f.flush()
+                if self.fsync == "always":
+                    os.fsync(f.fileno())
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        if self.fsync == "group":
+            with self._lock:
+                self._pending.append((temp_path, path))
+                ready = len(self._pending) >= self.group_size
+            if ready:
+                self.commit()
+        else:
+            os.replace(temp_path, path)
+            if self.fsync == "always":
+                _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+    @property
+    def pending(self) -> int:
+        """Number of files staged for the next group commit."""
+        return len(self._pending)
+
+    def when_visible(self, path: str, callback) -> None:
+        """Calls callback once path holds what was written to it.
+
+        That is right away unless path is staged for a group commit, in
+        which case callback runs after the commit has made it visible.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            if any(os.path.abspath(target) == key for _, target in self._pending):
+                self._on_visible.setdefault(key, []).append(callback)
+                return
+        callback()
+
+    def commit(self) -> None:
+        """Makes all staged files durable and visible (group mode only)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            callbacks = [self._on_visible.pop(os.path.abspath(path), []) for _, path in pending]
+        for temp_path, _ in pending:
+            fd = os.open(temp_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for temp_path, path in pending:
+            os.replace(temp_path, path)
+        for dirpath in {os.path.dirname(os.path.abspath(path)) for _, path in pending}:
+            _fsync_dir(dirpath)
+        for callback in itertools.chain.from_iterable(callbacks):
+            callback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.commit()
+        return False
+
+def _fsync_dir(dirpath: str) -> None:
+    """Flushes a directory entry so renames inside it survive a power loss."""
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return # Directories cannot be opened on some platforms (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+default_writer = AtomicWriter()
@@ -3,6 +3,7 @@
 import pytest
 import time
 from src.my_package.calculator import Calculator
+from tests.stub_server import start_stub_server
 
 print("\n--- Loading conftest.py ---")
 
@@ -66,4 +67,13 @@ def sample_api_data():
             {"name": "Item A", "value": 10},
             {"name": "Item B", "value": 20}
         ]
-    }
\ No newline at end of file
+    }
+
+# --- Local HTTP stand-in for the external API ---
+
+@pytest.fixture
+def local_api_server():
+    """Runs a local HTTP server standing in for the external API."""
+    server = start_stub_server()
+    yield server
+    server.stop()
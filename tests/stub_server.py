@@ -0,0 +1,60 @@
+"""Local HTTP stand-in for the external API, shared by tests and benchmarks"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Serves JSON responses from the server's ``routes`` table.
+
+    A route is either a ``(status, payload)`` tuple or a callable taking the
+    handler and returning ``(status, payload, headers)``.
+    """
+    protocol_version = "HTTP/1.1" # Allow keep-alive connections
+    disable_nagle_algorithm = True # Headers and body are sent separately
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_log.append(self.path)
+            self.server.client_ports.add(self.client_address[1])
+        route = self.server.routes.get(self.path)
+        if route is None:
+            status, payload, headers = 404, {"detail": "Not found"}, {}
+        elif callable(route):
+            status, payload, headers = route(self)
+        else:
+            (status, payload), headers = route, {}
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Keep test output quiet
+
+class StubAPIServer(ThreadingHTTPServer):
+    """Threaded server with a routes table and a log of handled requests."""
+    daemon_threads = True # Don't wait for idle keep-alive connections on shutdown
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubAPIHandler)
+        self.routes = {}
+        self.request_log = []
+        self.client_ports = set() # One entry per TCP connection opened by clients
+        self.lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.server_port}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def start_stub_server() -> StubAPIServer:
+    """Starts a StubAPIServer on a free local port in a background thread."""
+    server = StubAPIServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return server
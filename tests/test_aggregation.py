@@ -0,0 +1,100 @@
+"""Tests for single-pass, mergeable value statistics."""
+
+import bisect
+import json
+import math
+import random
+import statistics
+import pytest
+from src.my_package.aggregation import TDigest, ValueStats, merge_saved, stats_path
+
+@pytest.fixture(scope="module")
+def values():
+    """100k log-normally distributed values (skewed, with a long tail)."""
+    rng = random.Random(7)
+    return [rng.lognormvariate(0, 1) for _ in range(100_000)]
+
+def page_stats(values, size=1000):
+    stats = ValueStats()
+    for start in range(0, len(values), size):
+        stats.update(values[start:start + size])
+    return stats
+
+def test_moments_match_statistics_module(values):
+    """Count, sum, min, max, mean and variance match an exact second pass."""
+    stats = page_stats(values)
+    assert stats.count == len(values)
+    assert stats.sum == math.fsum(values)
+    assert (stats.min, stats.max) == (min(values), max(values))
+    assert stats.mean == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert stats.variance == pytest.approx(statistics.variance(values), rel=1e-9)
+
+def test_compensated_sum_keeps_small_values():
+    """Small values are not lost next to large ones."""
+    stats = ValueStats()
+    for _ in range(10):
+        stats.update([1e16, 1.0, -1e16])
+    assert stats.sum == 10.0
+
+@pytest.mark.parametrize("q", [0.01, 0.5, 0.95, 0.99, 0.999])
+def test_quantiles_are_close_in_rank(values, q):
+    """Estimated quantiles sit within a small rank error of the true ones."""
+    ordered = sorted(values)
+    estimate = page_stats(values).quantile(q)
+    rank = bisect.bisect(ordered, estimate) / len(ordered)
+    assert abs(rank - q) < 0.005
+
+def test_merge_equals_single_stream(values):
+    """Statistics merged from shards match those of the whole stream."""
+    whole = page_stats(values)
+    shards = [page_stats(values[i::4]) for i in range(4)]
+    merged = ValueStats()
+    for shard in shards:
+        merged.merge(shard)
+    assert merged.count == whole.count
+    assert merged.sum == whole.sum
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    assert merged.mean == pytest.approx(whole.mean, rel=1e-12)
+    assert merged.variance == pytest.approx(whole.variance, rel=1e-9)
+    ordered = sorted(values)
+    for q in (0.5, 0.99):
+        assert abs(bisect.bisect(ordered, merged.quantile(q)) / len(ordered) - q) < 0.005
+
+def test_digest_size_is_bounded(values):
+    """The digest keeps about compression centroids however many values it has seen."""
+    digest = TDigest(compression=50)
+    digest.update(values)
+    assert len(digest.to_dict()["means"]) <= 50
+
+def test_empty_stats():
+    """Without values the undefined statistics are None, and merging them changes nothing."""
+    stats = ValueStats().update([], missing=3)
+    summary = stats.summary()
+    assert summary["count"] == 0 and summary["missing"] == 3
+    assert summary["mean"] is None and summary["p50"] is None and summary["min"] is None
+    other = ValueStats().update([1.0, 2.0])
+    assert other.merge(stats).summary()["missing"] == 3
+    assert other.count == 2
+
+def test_save_load_round_trip(tmp_path, values):
+    """Saved statistics are JSON with the summary, and load back to mergeable state."""
+    stats = page_stats(values[:5000])
+    path = stats_path(str(tmp_path / "out.json"))
+    assert path.endswith("out.json.stats.json")
+    stats.save(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved["count"] == 5000 and "p99" in saved and "state" in saved
+    loaded = ValueStats.load(path)
+    assert loaded.summary() == stats.summary()
+
+    other = page_stats(values[5000:10000])
+    other_path = str(tmp_path / "other.stats.json")
+    other.save(other_path)
+    merged = merge_saved([path, other_path])
+    assert merged.count == 10000
+    assert merged.sum == math.fsum(values[:10000])
+
+def test_quantile_range_is_checked():
+    with pytest.raises(ValueError):
+        ValueStats().update([1.0]).quantile(1.5)
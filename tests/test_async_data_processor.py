@@ -0,0 +1,72 @@
+"""Tests for the asyncio pipeline functions, run against the local HTTP server."""
+
+import asyncio
+import json
+import pytest
+from src.my_package import async_data_processor
+from src.my_package.async_data_processor import (complex_data_pipeline_async, fetch_data_from_api_async,
+                                                 gather_pipelines, process_and_save_data_async)
+from src.my_package.data_processor import ExternalServiceError
+
+@pytest.fixture(params=["aiohttp", "thread"])
+def http_client(request, monkeypatch):
+    """Runs each test with aiohttp (when installed) and with the worker-thread fallback."""
+    if request.param == "aiohttp":
+        pytest.importorskip("aiohttp")
+    else:
+        monkeypatch.setattr(async_data_processor, "aiohttp", None)
+    return request.param
+
+def test_fetch_async_success(http_client, local_api_server, sample_api_data):
+    """The async fetch returns the decoded JSON, with aiohttp or through the blocking fallback."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    assert asyncio.run(fetch_data_from_api_async(f"{local_api_server.url}/data")) == sample_api_data
+
+def test_fetch_async_http_error(http_client, local_api_server):
+    """HTTP errors map to ExternalServiceError as in the blocking API."""
+    with pytest.raises(ExternalServiceError, match="Failed to fetch data from"):
+        asyncio.run(fetch_data_from_api_async(f"{local_api_server.url}/missing"))
+
+def test_process_and_save_async(tmp_path, sample_api_data):
+    """Items are written as process_and_save_data writes them."""
+    output_file = tmp_path / "output.json"
+    asyncio.run(process_and_save_data_async(sample_api_data, str(output_file), format="compact"))
+    assert json.loads(output_file.read_text())["items"] == ["Item A", "Item B"]
+
+def test_process_and_save_async_invalid_input(tmp_path):
+    """Bad input raises the same TypeError and ValueError as the blocking API."""
+    with pytest.raises(TypeError, match="Input data must be a dictionary"):
+        asyncio.run(process_and_save_data_async([], str(tmp_path / "out.json")))
+    with pytest.raises(ValueError, match="must contain a 'results' list"):
+        asyncio.run(process_and_save_data_async({"count": 0}, str(tmp_path / "out.json")))
+
+def test_complex_pipeline_async(http_client, tmp_path, local_api_server, sample_api_data):
+    """The async pipeline returns True on success and False when the fetch fails."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    output_file = tmp_path / "output.json"
+    assert asyncio.run(complex_data_pipeline_async(f"{local_api_server.url}/data", str(output_file)))
+    assert json.loads(output_file.read_text())["count"] == 2
+    assert not asyncio.run(complex_data_pipeline_async(f"{local_api_server.url}/missing", str(output_file)))
+
+def test_gather_pipelines_limits_concurrency(http_client, tmp_path, local_api_server, sample_api_data, mocker):
+    """Results come back in input order and no more than `limit` pipelines run at once."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    running = peak = 0
+    original = async_data_processor.fetch_data_from_api_async
+
+    async def tracked_fetch(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(0.01)
+            return await original(*args, **kwargs)
+        finally:
+            running -= 1
+
+    mocker.patch.object(async_data_processor, "fetch_data_from_api_async", tracked_fetch)
+    jobs = [(f"{local_api_server.url}/{'missing' if i == 2 else 'data'}", str(tmp_path / f"out_{i}.json"))
+            for i in range(10)]
+    results = asyncio.run(gather_pipelines(jobs, limit=3))
+    assert results == [i != 2 for i in range(10)]
+    assert peak == 3
@@ -1,6 +1,7 @@
 """Tests for basic_math module."""
 
 import pytest
+from array import array
 from src.my_package import basic_math
 
 # 1. Basic Assertions
@@ -40,4 +41,76 @@ def test_multiply_parametrized(a, b, expected):
 # Example of a simple test function name (pytest discovery)
 def check_subtraction_with_negative():
     """Checks subtraction resulting in a negative number."""
-    assert basic_math.subtract(3, 5) == -2
\ No newline at end of file
+    assert basic_math.subtract(3, 5) == -2
+
+# --- Batch (elementwise) variants ---
+
+@pytest.mark.parametrize(
+    "func, a, b, expected",
+    [
+        (basic_math.add_batch, [1, 2, 3], [10, 20, 30], [11, 22, 33]),
+        (basic_math.subtract_batch, [1, 2, 3], [10, 20, 30], [-9, -18, -27]),
+        (basic_math.multiply_batch, [1, 2, 3], [10, 20, 30], [10, 40, 90]),
+        (basic_math.add_batch, [1, 2, 3], 0.5, [1.5, 2.5, 3.5]),
+        (basic_math.subtract_batch, 10, [1, 2, 3], [9, 8, 7]),
+        (basic_math.multiply_batch, [2], [1, 2, 3], [2, 4, 6]),
+    ],
+    ids=["add", "subtract", "multiply", "scalar-right", "scalar-left", "length-1"]
+)
+def test_batch_elementwise(func, a, b, expected):
+    """Batch functions apply the scalar operation elementwise with broadcasting."""
+    assert func(a, b) == expected
+
+def test_batch_keeps_int_float_semantics():
+    """Integer pairs stay integers, mixed pairs become floats, as in the scalar functions."""
+    result = basic_math.add_batch([1, 2], [3, 4.0])
+    assert result == [basic_math.add(1, 3), basic_math.add(2, 4.0)]
+    assert isinstance(result[0], int)
+    assert isinstance(result[1], float)
+
+def test_batch_accepts_array_and_memoryview():
+    """array.array and memoryview operands are accepted."""
+    values = array("d", [1.0, 2.0, 3.0])
+    assert basic_math.multiply_batch(memoryview(values), values) == [1.0, 4.0, 9.0]
+
+@pytest.mark.parametrize("make_out", [lambda: [0] * 3, lambda: array("d", [0.0] * 3),
+                                      lambda: memoryview(array("d", [0.0] * 3))],
+                         ids=["list", "array", "memoryview"])
+def test_batch_writes_into_out_buffer(make_out):
+    """Results are written into the given out buffer, which is returned."""
+    out = make_out()
+    result = basic_math.add_batch([1, 2, 3], 1, out=out)
+    assert result is out
+    assert list(out) == [2, 3, 4]
+
+def test_batch_in_place_update():
+    """An operand may also be used as the out buffer."""
+    values = array("d", [1.0, 2.0, 3.0])
+    basic_math.multiply_batch(values, 2, out=values)
+    assert list(values) == [2.0, 4.0, 6.0]
+
+@pytest.mark.parametrize("make_values", [list, lambda values: array("d", values)], ids=["list", "array"])
+def test_batch_in_place_update_across_chunks(monkeypatch, make_values):
+    """Buffers longer than one store chunk are filled slice by slice, in place."""
+    monkeypatch.setattr(basic_math, "_STORE_CHUNK", 2)
+    values = make_values([1.0, 2.0, 3.0, 4.0, 5.0])
+    basic_math.add_batch(values, values, out=values)
+    assert list(values) == [2.0, 4.0, 6.0, 8.0, 10.0]
+
+def test_batch_errors():
+    """Mismatched lengths, wrong out sizes and two scalars are rejected."""
+    with pytest.raises(ValueError, match="could not be broadcast"):
+        basic_math.add_batch([1, 2, 3], [1, 2])
+    with pytest.raises(ValueError, match="Output buffer has length 2"):
+        basic_math.add_batch([1, 2, 3], 1, out=[0, 0])
+    with pytest.raises(TypeError, match="At least one operand"):
+        basic_math.add_batch(1, 2)
+
+def test_batch_numpy():
+    """NumPy arrays are dispatched to the matching ufunc."""
+    np = pytest.importorskip("numpy")
+    a = np.array([1, 2, 3])
+    out = np.empty(3, dtype=a.dtype)
+    result = basic_math.subtract_batch(a, 1, out=out)
+    assert result is out
+    assert out.tolist() == [0, 1, 2]
@@ -0,0 +1,69 @@
+"""Tests for the benchmark harness."""
+
+import json
+import pytest
+from benchmarks import harness
+from benchmarks.harness import Benchmark
+
+def test_time_callable_reports_statistics():
+    """Timing runs the function for every round and reports per-call statistics."""
+    calls = []
+    result = harness.time_callable(lambda: calls.append(1), rounds=3, warmup=1, min_time=0.0)
+    assert result["rounds"] == 3
+    assert result["number"] == 1
+    assert len(calls) == 1 + 1 + 3 # warmup, calibration, rounds
+    assert 0 <= result["min"] <= result["median"]
+
+def test_self_timed_callables_report_their_own_duration():
+    """A self-timed callable runs once per round and its return values are the timings."""
+    durations = iter([9.0, 3.0, 1.0, 2.0])
+    result = harness.time_callable(harness.self_timed(lambda: next(durations)), rounds=3, warmup=1)
+    assert result["number"] == 1
+    assert (result["min"], result["median"]) == (1.0, 2.0)
+
+def test_import_time_is_parsed_from_importtime_output():
+    """The import benchmark reads the cumulative time Python reports for the module."""
+    from benchmarks.bench_import import import_time
+    assert 0 < import_time("src.my_package") < 5
+
+def test_benchmark_decorator_registers_params(monkeypatch):
+    """One entry is registered per parameter value."""
+    monkeypatch.setattr(harness, "REGISTRY", [])
+    @harness.benchmark("sum", params={"small": 10, "large": 1000})
+    def bench_sum(n):
+        return lambda: sum(range(n))
+    assert [bench.name for bench in harness.REGISTRY] == ["sum[small]", "sum[large]"]
+    assert [bench.param for bench in harness.REGISTRY] == [10, 1000]
+
+def test_run_cleans_up_generator_factories():
+    """Code after the yield runs once timing is done."""
+    events = []
+    def factory():
+        events.append("setup")
+        yield lambda: None
+        events.append("teardown")
+    results = harness.run([Benchmark("noop", factory, None)], rounds=2, min_time=0.0)
+    assert events == ["setup", "teardown"]
+    assert set(results) == {"machine", "benchmarks"}
+    assert set(results["benchmarks"]["noop"]) == {"min", "median", "mean", "stdev", "rounds", "number"}
+
+def test_compare_reports_regressions_above_threshold():
+    """Only benchmarks slower than the threshold are reported."""
+    baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}, "gone": {"median": 1.0}}}
+    results = {"benchmarks": {"a": {"median": 1.05}, "b": {"median": 1.5}, "new": {"median": 9.0}}}
+    regressions = harness.compare(results, baseline, threshold=0.10)
+    assert [(name, before, after) for name, before, after, _ in regressions] == [("b", 1.0, 1.5)]
+    assert regressions[0][3] == pytest.approx(0.5)
+
+def test_main_writes_json_and_fails_on_regression(tmp_path, monkeypatch, capsys):
+    """main() saves results and exits with 1 when slower than the baseline."""
+    monkeypatch.setattr(harness, "REGISTRY", [Benchmark("noop", lambda: lambda: None, None)])
+    results_path = tmp_path / "results.json"
+    assert harness.main(["--rounds", "2", "--min-time", "0", "--json", str(results_path)]) == 0
+    results = json.loads(results_path.read_text())
+    assert "noop" in results["benchmarks"]
+
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps({"benchmarks": {"noop": {"median": 1e-12}}}))
+    assert harness.main(["--rounds", "2", "--min-time", "0", "--compare", str(baseline_path)]) == 1
+    assert "REGRESSION noop" in capsys.readouterr().err
@@ -0,0 +1,121 @@
+"""Tests for the response cache, standalone and through fetch_data_from_api."""
+
+import threading
+import time
+import pytest
+from src.my_package import data_processor
+from src.my_package.cache import ResponseCache
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+def etag_route(payload, etag='"v1"'):
+    """Route answering 304 when the client already has the current ETag."""
+    def route(handler):
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, None, {"ETag": etag}
+        return 200, payload, {"ETag": etag}
+    return route
+
+def test_cache_hit_skips_request(local_api_server, sample_api_data):
+    """A fresh entry is served without contacting the server."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    cache = ResponseCache()
+    url = f"{local_api_server.url}/data"
+
+    assert data_processor.fetch_data_from_api(url, cache=cache) == sample_api_data
+    assert data_processor.fetch_data_from_api(url, cache=cache) == sample_api_data
+
+    assert local_api_server.request_log == ["/data"]
+    assert cache.stats == {"hits": 1, "misses": 1, "revalidations": 0, "evictions": 0, "coalesced": 0, "size": 1}
+
+def test_expired_entry_is_revalidated(local_api_server, sample_api_data):
+    """After the TTL, a conditional request is sent and a 304 reuses the cached data."""
+    local_api_server.routes["/data"] = etag_route(sample_api_data)
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    url = f"{local_api_server.url}/data"
+
+    data_processor.fetch_data_from_api(url, cache=cache)
+    clock.now += 11
+    assert data_processor.fetch_data_from_api(url, cache=cache) == sample_api_data
+    assert data_processor.fetch_data_from_api(url, cache=cache) == sample_api_data # Fresh again
+
+    assert local_api_server.request_log == ["/data", "/data"]
+    assert (cache.misses, cache.revalidations, cache.hits) == (1, 1, 1)
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first."""
+    cache = ResponseCache(max_entries=2)
+    send = lambda url: lambda headers: FakeResponse({"url": url})
+    for url in ["a", "b", "a", "c"]:
+        cache.fetch(url, send(url))
+
+    assert cache.evictions == 1
+    cache.fetch("a", send("a"))
+    assert cache.hits == 2 # "a" survived, "b" was evicted
+
+def test_concurrent_requests_are_coalesced():
+    """Concurrent callers for the same URL share a single in-flight fetch."""
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def slow_send(headers):
+        calls.append(headers)
+        release.wait(5)
+        return FakeResponse({"value": 42})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch("u", slow_send))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while cache.coalesced < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 5
+
+def test_failures_are_not_cached(local_api_server, sample_api_data):
+    """Errors reach the caller and the next call tries again."""
+    local_api_server.routes["/data"] = (503, {"detail": "busy"})
+    cache = ResponseCache()
+    url = f"{local_api_server.url}/data"
+
+    with pytest.raises(data_processor.ExternalServiceError, match="503"):
+        data_processor.fetch_data_from_api(url, cache=cache)
+    local_api_server.routes["/data"] = (200, sample_api_data)
+
+    assert data_processor.fetch_data_from_api(url, cache=cache) == sample_api_data
+    assert len(cache) == 1
+
+def test_disk_cache_survives_restart(tmp_path, local_api_server, sample_api_data):
+    """Entries written to the cache directory are used by a new cache instance."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    url = f"{local_api_server.url}/data"
+
+    data_processor.fetch_data_from_api(url, cache=ResponseCache(directory=str(tmp_path)))
+    restarted = ResponseCache(directory=str(tmp_path))
+
+    assert data_processor.fetch_data_from_api(url, cache=restarted) == sample_api_data
+    assert local_api_server.request_log == ["/data"]
+    assert restarted.hits == 1
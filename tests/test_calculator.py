@@ -1,7 +1,14 @@
 """Tests for the Calculator class."""
 
+import decimal
+import math
+import threading
 import pytest
-from src.my_package.calculator import Calculator, CalculationError
+from array import array
+from fractions import Fraction
+from src.my_package.calculator import (Calculator, CalculationError, CalculatorBank, CalculatorProgram,
+                                       CompensatedCalculator, ConcurrentCalculator, DecimalCalculator,
+                                       FractionCalculator)
 
 # 3. Test Grouping with Classes
 # Using a class allows sharing class-scoped fixtures and organizing related tests.
@@ -91,4 +98,277 @@ def test_divide_by_zero_alternative_calculator():
     """Alternative way to test exception without fixture."""
     calc = Calculator(10)
     with pytest.raises(CalculationError, match="divide by zero"): # Use match regex
-         calc.divide(0)
\ No newline at end of file
+         calc.divide(0)
+
+@pytest.mark.parametrize("on_zero_division, expected", [
+    ("collect", [5.0, None]),
+    ("substitute", [5.0, 0.0]),
+])
+def test_divide_pairs_reports_zero_divisors(on_zero_division, expected):
+    """Bulk division flags zero divisors with the message divide would have raised."""
+    results = Calculator.divide_pairs([(10, 2), (1, 0)], on_zero_division, fill=0.0)
+    assert results.values == expected
+    assert results.errors == b"\x00\x01"
+    assert results.error_messages() == {1: "Cannot divide by zero"}
+
+def test_divide_pairs_raise_matches_divide():
+    """The raise policy raises the same CalculationError as divide."""
+    with pytest.raises(CalculationError, match="^Cannot divide by zero$"):
+        Calculator.divide_pairs([(10, 2), (1, 0)])
+
+# 5. CalculatorBank: many accumulators updated in one call
+
+def test_bank_applies_to_all_slots():
+    """Each operation updates every total in the bank."""
+    bank = CalculatorBank(4, initial_value=10)
+    bank.add(5).subtract(3).multiply(2).divide(4)
+    # (10 + 5 - 3) * 2 / 4 = 6
+    assert bank.totals.tolist() == [6.0] * 4
+    assert len(bank) == 4
+    assert bank.totals.itemsize == 8
+
+def test_bank_per_slot_values_and_indices():
+    """Values may be given per slot, and operations may target selected slots."""
+    bank = CalculatorBank(4)
+    bank.add([1, 2, 3, 4])
+    bank.multiply(10, indices=[0, 2])
+    bank.subtract([1, 1], indices=[1, 3])
+    assert bank.totals.tolist() == [10.0, 1.0, 30.0, 3.0]
+    assert bank[2] == 30.0
+    bank.clear(indices=[0])
+    assert bank[0] == 0.0
+    bank.clear()
+    assert bank.totals.tolist() == [0.0] * 4
+
+def test_bank_rejects_values_not_matching_indices():
+    """Per-slot values must match the targeted slots one for one; nothing is updated otherwise."""
+    bank = CalculatorBank(3)
+    with pytest.raises(ValueError, match="Expected 3 values, got 2"):
+        bank.add([1, 2], indices=[0, 1, 2])
+    assert bank.totals.tolist() == [0.0] * 3
+
+def test_bank_divide_by_zero_raises_before_updating():
+    """In 'raise' mode no slot is changed when any divisor is zero."""
+    bank = CalculatorBank(3, initial_value=6)
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        bank.divide(0)
+    with pytest.raises(CalculationError, match=r"Cannot divide by zero \(slot 1\)"):
+        bank.divide([2, 0, 3])
+    assert bank.totals.tolist() == [6.0, 6.0, 6.0]
+
+def test_bank_divide_by_zero_mask_mode():
+    """In 'mask' mode zero divisors leave the slot unchanged and are reported."""
+    bank = CalculatorBank(3, initial_value=6, on_zero_division="mask")
+    bank.divide([2, 0, 3])
+    assert bank.totals.tolist() == [3.0, 6.0, 2.0]
+    assert list(bank.zero_division_mask) == [0, 1, 0]
+    bank.divide(0, indices=[2])
+    assert list(bank.zero_division_mask) == [0, 0, 1]
+    bank.divide(3)
+    assert bank.totals.tolist() == [1.0, 2.0, 2.0 / 3]
+    assert not any(bank.zero_division_mask)
+
+def test_bank_boolean_and_byte_masks():
+    """A mask of one bool or byte per slot selects slots; it is not read as slot numbers."""
+    bank = CalculatorBank(3, initial_value=1)
+    bank.add(5, indices=[True, False, True])
+    assert bank.totals.tolist() == [6.0, 1.0, 6.0]
+    bank.multiply([2, 3], indices=bytes([0, 1, 1]))
+    assert bank.totals.tolist() == [6.0, 2.0, 18.0]
+    bank.divide(2, indices=[False, True, True])
+    assert bank.totals.tolist() == [6.0, 1.0, 9.0]
+    bank.clear(indices=[True, False, False])
+    assert bank.totals.tolist() == [0.0, 1.0, 9.0]
+    with pytest.raises(ValueError, match="Mask has length 2, expected 3"):
+        bank.add(1, indices=[True, False])
+
+def test_bank_retries_masked_slots():
+    """The zero_division_mask of one divide can target the slots it skipped."""
+    bank = CalculatorBank(3, initial_value=6, on_zero_division="mask")
+    bank.divide([2, 0, 0])
+    bank.divide(3, indices=bank.zero_division_mask)
+    assert bank.totals.tolist() == [3.0, 2.0, 2.0]
+    bank.divide(0, indices=[True, False, False])
+    assert list(bank.zero_division_mask) == [1, 0, 0]
+    assert bank.totals.tolist() == [3.0, 2.0, 2.0]
+
+def test_bank_invalid_mode():
+    """Unknown zero-division modes are rejected."""
+    with pytest.raises(ValueError, match="on_zero_division"):
+        CalculatorBank(1, on_zero_division="ignore")
+
+def test_bank_numpy_indices():
+    """NumPy index arrays and boolean masks use the vectorized path."""
+    np = pytest.importorskip("numpy")
+    bank = CalculatorBank(4, initial_value=1)
+    bank.add(np.array([1.0, 2.0, 3.0, 4.0]))
+    bank.multiply(2, indices=np.array([True, False, True, False]))
+    assert bank.totals.tolist() == [4.0, 3.0, 8.0, 5.0]
+    mask = np.array([False, True, False, True])
+    bank.divide(np.array([3.0, 5.0]), indices=mask)
+    assert bank.totals.tolist() == [4.0, 1.0, 8.0, 1.0]
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        bank.divide(0.0, indices=mask)
+    bank.clear(indices=mask)
+    assert bank.totals.tolist() == [4.0, 0.0, 8.0, 0.0]
+
+def test_bank_numpy_mask_divide_by_zero_mask_mode():
+    """A NumPy mask with zero divisors marks only the masked slots in mask mode."""
+    np = pytest.importorskip("numpy")
+    bank = CalculatorBank(3, initial_value=6, on_zero_division="mask")
+    bank.divide(np.array([0.0, 2.0]), indices=np.array([True, False, True]))
+    assert list(bank.zero_division_mask) == [1, 0, 0]
+    assert bank.totals.tolist() == [6.0, 6.0, 3.0]
+
+
+# 6. Recorded chains compiled and replayed in bulk
+
+def test_recorded_chain_matches_eager_calculator():
+    """A compiled program gives the same result as the eager Calculator chain."""
+    program = Calculator.record().add(10).subtract(2).multiply(3).divide(4).compile()
+    assert isinstance(program, CalculatorProgram)
+    assert program.run() == Calculator().add(10).subtract(2).multiply(3).divide(4).total
+    assert program.run(4) == 9.0  # (4 + 10 - 2) * 3 / 4
+
+def test_recorded_chain_folds_constants():
+    """Adjacent adds, multiplies and divides are merged, and clear drops earlier steps."""
+    program = Calculator.record().add(1).subtract(3).multiply(2).multiply(5).divide(2).divide(5).compile()
+    assert program.ops == (("add", -2.0), ("multiply", 10.0), ("divide", 10.0))
+    program = Calculator.record().add(7).clear().add(4).multiply(2).compile()
+    assert program.ops == (("set", 8.0),)
+
+def test_recorded_chain_run_batch():
+    """run_batch applies the program to many initial values, optionally in place."""
+    program = Calculator.record().add(1).multiply(2).compile()
+    assert list(program.run_batch([0, 1, 2])) == [2.0, 4.0, 6.0]
+    values = array("d", [3.0, 4.0])
+    assert program.run_batch(values, out=values) is values
+    assert list(values) == [8.0, 10.0]
+    bank = CalculatorBank(2, initial_value=5).apply(program)
+    assert bank.totals.tolist() == [12.0, 12.0]
+
+def test_recorded_divide_by_zero_raises_on_replay():
+    """A zero divisor raises CalculationError when replay reaches that step."""
+    program = Calculator.record().add(1).divide(0).add(5).compile()
+    assert program.ops == (("add", 1.0), ("fail", None))
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        program.run(10)
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        program.run_batch([1, 2, 3])
+
+
+def test_program_with_zero_divisor_changes_nothing():
+    """A recorded zero divisor raises before any value is written, in run_batch and CalculatorBank.apply."""
+    program = Calculator.record().add(5).divide(0).compile()
+    values = array("d", [1.0, 2.0])
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        program.run_batch(values, out=values)
+    assert list(values) == [1.0, 2.0]
+    bank = CalculatorBank(3, initial_value=1)
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        bank.apply(program)
+    assert bank.totals.tolist() == [1.0, 1.0, 1.0]
+    assert list(program.run_batch([])) == []
+
+# 7. Numeric backends
+
+@pytest.mark.parametrize("backend, expected_type", [
+    ("float", Calculator),
+    ("compensated", CompensatedCalculator),
+    ("decimal", DecimalCalculator),
+    ("fraction", FractionCalculator),
+])
+def test_backend_chain(backend, expected_type):
+    """Every backend evaluates the usual chain to the same value."""
+    calculator = Calculator.using(backend, 4)
+    assert type(calculator) is expected_type
+    assert calculator.add(10).subtract(2).multiply(3).divide(4).total == 9
+    assert calculator.clear().total == 0
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        calculator.divide(0)
+
+@pytest.mark.parametrize("backend", ["compensated", "decimal", "fraction"])
+@pytest.mark.parametrize("zero", ["0", "-0.0"])
+def test_backend_string_zero_divisor(backend, zero):
+    """A zero divisor given as a string is recognised once converted."""
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        Calculator.using(backend, 10).divide(zero)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown backend: 'int'"):
+        Calculator.using("int")
+
+def test_compensated_sum_is_accurate():
+    """Compensated summation matches math.fsum where plain floats drift."""
+    values = [0.1] * 1000 + [1e16, 1.0, -1e16]
+    plain, compensated = Calculator(), CompensatedCalculator()
+    for v in values:
+        plain.add(v)
+        compensated.add(v)
+    assert compensated.total == math.fsum(values)
+    assert plain.total != math.fsum(values)
+
+def test_compensated_sum_overflows_to_infinity():
+    """Past overflow the sum is infinite, as with plain floats, rather than NaN."""
+    assert CompensatedCalculator().add(1e308).add(1e308).total == math.inf
+    assert CompensatedCalculator().add(-1e308).add(-1e308).add(1.0).total == -math.inf
+
+def test_decimal_backend_uses_context():
+    """Floats are taken at face value and results are rounded by the given context."""
+    assert DecimalCalculator().add(0.1).add(0.2).total == decimal.Decimal("0.3")
+    calculator = DecimalCalculator(1, context=decimal.Context(prec=5)).divide(3)
+    assert calculator.total == decimal.Decimal("0.33333")
+
+def test_fraction_backend_is_exact():
+    calculator = FractionCalculator().add(0.1).add(Fraction(1, 3)).divide(3)
+    assert calculator.total == Fraction(13, 90)
+
+# 8. Sharing a calculator between threads
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_concurrent_calculator_chain():
+    """On one thread it behaves like Calculator."""
+    calculator = ConcurrentCalculator(4, stripes=3)
+    assert calculator.add(10).subtract(2).multiply(3).divide(4).total == 9
+    assert calculator.clear().total == 0
+    with pytest.raises(CalculationError, match="Cannot divide by zero"):
+        calculator.divide(0)
+
+def test_concurrent_calculator_loses_no_updates():
+    """Additions from many threads sharing few cells are all counted."""
+    calculator = ConcurrentCalculator(stripes=3)
+
+    def work():
+        for _ in range(20_000):
+            calculator.add(1).subtract(0.5)
+
+    run_threads(work, 8)
+    assert calculator.total == 8 * 20_000 * 0.5
+
+def test_concurrent_calculator_barriers_keep_additions():
+    """Folding the cells for multiply and divide while other threads add neither drops nor repeats an addition."""
+    calculator = ConcurrentCalculator()
+
+    def scale():
+        for _ in range(500):
+            calculator.multiply(1).divide(1)
+
+    threads = [threading.Thread(target=scale)]
+    threads += [threading.Thread(target=lambda: [calculator.add(1) for _ in range(10_000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calculator.total == 40_000
+
+def test_concurrent_calculator_orders_operations_per_thread():
+    """A thread's own additions before a multiply are scaled by it; later ones are not."""
+    calculator = ConcurrentCalculator(stripes=2)
+    run_threads(lambda: calculator.add(1), 2)
+    assert calculator.add(1).multiply(10).add(1).total == 31
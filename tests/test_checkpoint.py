@@ -0,0 +1,71 @@
+"""Tests for the persisted checkpoint store."""
+
+import os
+import pytest
+from src.my_package.checkpoint import CheckpointStore, PageRecord
+
+@pytest.fixture
+def store(tmp_path):
+    with CheckpointStore(str(tmp_path / "checkpoints")) as store:
+        yield store
+
+def test_pages_survive_reopening(tmp_path, store):
+    """Committed pages and their spooled items are read back by a new store."""
+    target = str(tmp_path / "out.json")
+    store.begin(target, "http://api/1")
+    page = store.commit_page(target, "http://api/1", "http://api/2", ["A", "B"])
+    assert page == PageRecord("http://api/1", "http://api/2", CheckpointStore.items_hash(["A", "B"]), 2)
+    store.close()
+
+    with CheckpointStore(store.directory) as reopened:
+        assert reopened.pages(target, "http://api/1") == [page]
+        assert reopened.pages(target, "http://other/1") == []
+        assert reopened.page_items(target, 0) == ["A", "B"]
+
+def test_torn_journal_record_is_dropped(tmp_path, store):
+    """A record cut short by a crash is ignored and later records still load."""
+    target = str(tmp_path / "out.json")
+    store.begin(target, "http://api/1")
+    store.commit_page(target, "http://api/1", None, ["A"])
+    store.close()
+    with open(os.path.join(store.directory, "journal.ndjson"), 'a', encoding='utf-8') as f:
+        f.write('{"op": "page", "tar')
+
+    with CheckpointStore(store.directory) as reopened:
+        assert len(reopened.pages(target, "http://api/1")) == 1
+        reopened.commit_page(target, "http://api/2", None, ["B"])
+    with CheckpointStore(store.directory) as reopened:
+        assert [page.url for page in reopened.pages(target, "http://api/1")] == ["http://api/1", "http://api/2"]
+
+def test_record_output_and_is_current(tmp_path, store):
+    """An output is current while its input hash and file are unchanged."""
+    target = tmp_path / "out.json"
+    target.write_text("[1]", encoding="utf-8")
+    input_hash = store.input_hash("json", [store.items_hash(["A"])])
+    assert not store.is_current(str(target), input_hash)
+
+    store.record_output(str(target), input_hash)
+    assert store.is_current(str(target), input_hash)
+    assert not store.is_current(str(target), store.input_hash("ndjson", [store.items_hash(["A"])]))
+    target.write_text("[1, 2]", encoding="utf-8")
+    assert not store.is_current(str(target), input_hash)
+
+def test_compact_keeps_state(tmp_path, store):
+    """Compaction drops superseded records without changing what is known."""
+    done, running = str(tmp_path / "done.json"), str(tmp_path / "running.json")
+    open(done, 'w').close()
+    for _ in range(3):
+        store.begin(done, "http://api/1")
+        store.commit_page(done, "http://api/1", None, ["A"])
+        store.record_output(done, "ab" * 32)
+    store.begin(running, "http://api/1")
+    store.commit_page(running, "http://api/1", "http://api/2", ["B"])
+    store.compact()
+    store.commit_page(running, "http://api/2", None, ["C"])
+    store.close()
+
+    with open(os.path.join(store.directory, "journal.ndjson"), encoding='utf-8') as f:
+        assert len(f.readlines()) == 4
+    with CheckpointStore(store.directory) as reopened:
+        assert reopened.is_current(done, "ab" * 32)
+        assert [page.url for page in reopened.pages(running, "http://api/1")] == ["http://api/1", "http://api/2"]
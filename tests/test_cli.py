@@ -0,0 +1,111 @@
+"""Tests for the my-package-pipeline command."""
+
+import io
+import json
+import re
+import pytest
+from src.my_package import cli
+from src.my_package.cli import Job, iter_manifest
+
+@pytest.fixture
+def manifest(tmp_path, local_api_server, sample_api_data):
+    """A CSV manifest of five jobs against the stub server; the job on line 4 gets a 404."""
+    lines = ["url,output"]
+    for i in range(5):
+        local_api_server.routes[f"/items/{i}"] = (200, sample_api_data)
+        path = "/missing" if i == 2 else f"/items/{i}"
+        lines.append(f"{local_api_server.url}{path},{tmp_path / f'out_{i}.json'}")
+    path = tmp_path / "jobs.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+def test_iter_manifest_reads_csv_and_ndjson():
+    """Both formats yield Jobs with their line numbers; blank lines and the CSV header are skipped."""
+    csv_text = "url,output\nhttp://a/1,one.json\n\nhttp://a/2, two.json\n"
+    ndjson_text = '{"url": "http://a/1", "output": "one.json"}\n\n{"url": "http://a/2", "output": "two.json"}\n'
+    assert list(iter_manifest(io.StringIO(csv_text), "csv")) == [
+        Job(2, "http://a/1", "one.json"), Job(4, "http://a/2", "two.json")]
+    assert list(iter_manifest(io.StringIO(ndjson_text), "ndjson")) == [
+        Job(1, "http://a/1", "one.json"), Job(3, "http://a/2", "two.json")]
+
+@pytest.mark.parametrize("text, format, line", [
+    ("http://a/1,one.json\nhttp://a/2\n", "csv", 2),
+    ('{"url": "http://a/1", "output": "one.json"}\n{"url": "http://a/2"}\n', "ndjson", 2),
+    ("not json\n", "ndjson", 1),
+])
+def test_iter_manifest_rejects_malformed_entries(text, format, line):
+    """A malformed entry raises ValueError naming its line, after the entries before it."""
+    jobs = iter_manifest(io.StringIO(text), format)
+    with pytest.raises(ValueError, match=f"line {line}"):
+        list(jobs)
+
+def test_iter_manifest_is_lazy():
+    """Entries are read only as jobs are requested."""
+    source = io.StringIO("http://a/1,one.json\nhttp://a/2,two.json\n")
+    jobs = iter_manifest(source, "csv")
+    assert next(jobs).url == "http://a/1"
+    assert source.readline() == "http://a/2,two.json\n" # Not consumed yet
+
+def test_main_runs_jobs_and_reports_failures(manifest, tmp_path, capsys):
+    """Successful outputs are written, throughput is printed and failures make the exit status 1."""
+    status = cli.main([str(manifest), "--workers", "2"])
+    out, err = capsys.readouterr()
+    assert status == 1
+    assert "Jobs: 4 succeeded, 1 failed" in out
+    assert "jobs/s" in out and "items/s" in out and "MB/s" in out
+    assert "Job latency: p50" in out
+    assert err.count("FAILED") == 1
+    assert "FAILED line 4:" in err and "ExternalServiceError" in err and "404" in err
+    with open(tmp_path / "out_0.json", 'r', encoding='utf-8') as f:
+        assert json.load(f)["count"] == 2
+    assert not (tmp_path / "out_2.json").exists()
+
+def test_main_succeeds_with_ndjson_manifest_and_options(tmp_path, local_api_server, sample_api_data, capsys):
+    """An NDJSON manifest with a shared cache fetches a repeated URL once and exits 0."""
+    local_api_server.routes["/items"] = (200, sample_api_data)
+    path = tmp_path / "jobs.ndjson"
+    path.write_text("".join(json.dumps({"url": f"{local_api_server.url}/items", "output": str(tmp_path / f"{i}.ndjson")})
+                            + "\n" for i in range(3)), encoding="utf-8")
+    status = cli.main([str(path), "--workers", "1", "--cache", "--retries", "2", "--format", "ndjson",
+                       "--fsync", "group", "--quiet"])
+    out, err = capsys.readouterr()
+    assert status == 0
+    assert out == "" and err == ""
+    assert local_api_server.request_log == ["/items"]
+    assert (tmp_path / "2.ndjson").read_text(encoding="utf-8").count("\n") == 3
+
+def test_main_stops_on_malformed_manifest(tmp_path, local_api_server, sample_api_data, capsys):
+    """Jobs before a malformed line still run; the error is reported with exit status 2."""
+    local_api_server.routes["/items"] = (200, sample_api_data)
+    path = tmp_path / "jobs.csv"
+    path.write_text(f"{local_api_server.url}/items,{tmp_path / 'out.json'}\nbroken\n", encoding="utf-8")
+    assert cli.main([str(path), "--workers", "1"]) == 2
+    assert "Manifest line 2" in capsys.readouterr().err
+
+def test_main_reports_only_manifest_errors_as_such(manifest, mocker):
+    """A ValueError raised outside manifest parsing is not passed off as a malformed manifest."""
+    mocker.patch.object(cli, "run_manifest", side_effect=ValueError("bug"))
+    with pytest.raises(ValueError, match="bug"):
+        cli.main([str(manifest)])
+
+def test_main_rejects_missing_manifest(tmp_path, capsys):
+    """An unreadable manifest exits with status 2."""
+    assert cli.main([str(tmp_path / "missing.csv")]) == 2
+    assert "cannot read manifest" in capsys.readouterr().err
+
+def test_main_aggregates_values_across_jobs(manifest, tmp_path, capsys):
+    """With --aggregate, each output gets statistics and the combined statistics are printed."""
+    cli.main([str(manifest), "--aggregate", "value"])
+    out = capsys.readouterr().out
+    assert "value: count 8, missing 0, sum 120" in out # Four successful jobs of two items each
+    assert (tmp_path / "out_0.json.stats.json").exists()
+
+def test_main_reports_rate_limits(manifest, capsys):
+    """With --rate or --max-concurrency, each host's final limits are printed."""
+    assert cli.main([str(manifest), "--rate", "1000", "--max-concurrency", "4"]) == 1
+    out = capsys.readouterr().out
+    assert re.search(r"127\.0\.0\.1:\d+: 5 requests, 0 overloaded, concurrency limit [1-4], latency", out)
+
+def test_main_rejects_bad_rate_limits(manifest):
+    with pytest.raises(SystemExit):
+        cli.main([str(manifest), "--max-concurrency", "0"])
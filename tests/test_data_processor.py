@@ -3,9 +3,12 @@
 import pytest
 import json
 import os
+import time
 import requests
-from src.my_package import data_processor
+from src.my_package import data_processor, formats
+from src.my_package.checkpoint import CheckpointStore
 from src.my_package.data_processor import ExternalServiceError
+from src.my_package.writers import AtomicWriter
 
 # 5. Mocking with pytest-mock (`mocker` fixture)
 
@@ -23,7 +26,7 @@ def test_fetch_data_success(mocker, sample_api_data):
     # Patch 'requests.get' within the module being tested
     mocker.patch("src.my_package.data_processor.requests.get", return_value=mock_response)
 
-    # Also mock time.sleep to speed up the test
+    # time.sleep is mocked to check that no delay is simulated by default
     mock_sleep = mocker.patch("src.my_package.data_processor.time.sleep")
 
     # Call the function that uses requests.get
@@ -34,7 +37,7 @@ def test_fetch_data_success(mocker, sample_api_data):
     data_processor.requests.get.assert_called_once_with(api_url, timeout=5)
     mock_response.raise_for_status.assert_called_once()
     mock_response.json.assert_called_once()
-    mock_sleep.assert_called_once_with(0.5) # Check sleep was called
+    mock_sleep.assert_not_called() # No simulated latency unless requested
 
 def test_fetch_data_timeout(mocker):
     """Test API timeout by making the mocked requests.get raise an exception."""
@@ -113,6 +116,17 @@ def test_process_and_save_invalid_data(tmp_path):
     # Ensure no file was created in case of error before writing
     assert not output_file.exists()
 
+def test_process_and_save_skips_invalid_items(tmp_path, caplog):
+    """Items that are not objects are logged and left out; missing names become 'Unknown'."""
+    output_file = tmp_path / "partial.json"
+    data = {"results": [{"name": "Item A"}, ["not", "an", "object"], {"value": 3}]}
+    data_processor.process_and_save_data(data, str(output_file))
+
+    saved_data = json.loads(output_file.read_text())
+    assert saved_data["items"] == ["Item A", "Unknown"]
+    assert saved_data["count"] == 2
+    assert "Skipping 1 invalid items (first at index 1: expected an object, got list)" in caplog.text
+
 # 7. Testing the integrated pipeline (mocking multiple steps)
 
 def test_complex_data_pipeline_success(mocker, tmp_path, sample_api_data):
@@ -137,7 +151,7 @@ def test_complex_data_pipeline_success(mocker, tmp_path, sample_api_data):
     # Assertions
     assert success is True
     data_processor.requests.get.assert_called_once_with(api_url, timeout=5)
-    spy_process.assert_called_once_with(sample_api_data, str(output_file))
+    spy_process.assert_called_once_with(sample_api_data, str(output_file), format="json", writer=None)
     assert output_file.exists()
     with open(output_file, 'r') as f:
         content = json.load(f)
@@ -175,7 +189,7 @@ def test_complex_data_pipeline_save_failure(mocker, tmp_path, sample_api_data):
 
     # Mock os.makedirs to fail simulating permission issues or similar
     # (Alternatively, mock open() to raise IOError directly)
-    mocker.patch("src.my_package.data_processor.os.makedirs", side_effect=IOError("Permission denied"))
+    mocker.patch("src.my_package.writers.os.makedirs", side_effect=IOError("Permission denied"))
 
 
     spy_process = mocker.spy(data_processor, "process_and_save_data")
@@ -185,5 +199,311 @@ def test_complex_data_pipeline_save_failure(mocker, tmp_path, sample_api_data):
     assert success is False
     data_processor.requests.get.assert_called_once_with(api_url, timeout=5)
     # process_and_save_data *was* called, but failed internally
-    spy_process.assert_called_once_with(sample_api_data, str(output_file))
-    assert not os.path.exists(output_file) # File shouldn't exist
\ No newline at end of file
+    spy_process.assert_called_once_with(sample_api_data, str(output_file), format="json", writer=None)
+    assert not os.path.exists(output_file) # File shouldn't exist
+
+# 8. Concurrent fetching against a local stand-in server
+
+def test_fetch_many_reuses_pooled_connections(local_api_server, sample_api_data):
+    """Many URLs are fetched concurrently over a small keep-alive pool."""
+    urls = []
+    for i in range(20):
+        local_api_server.routes[f"/items/{i}"] = (200, {**sample_api_data, "page": i})
+        urls.append(f"{local_api_server.url}/items/{i}")
+
+    results = data_processor.fetch_many(urls, max_workers=2)
+
+    assert [result["page"] for result in results] == list(range(20))
+    assert len(local_api_server.request_log) == 20
+    assert len(local_api_server.client_ports) <= 2 # Connections were kept alive
+
+def test_fetch_many_maps_failures_per_url(local_api_server, sample_api_data):
+    """A failing URL yields its ExternalServiceError without affecting the others."""
+    local_api_server.routes["/ok"] = (200, sample_api_data)
+    local_api_server.routes["/broken"] = (500, {"detail": "boom"})
+
+    ok, broken, missing = data_processor.fetch_many(
+        [f"{local_api_server.url}/ok", f"{local_api_server.url}/broken", f"{local_api_server.url}/missing"],
+        max_workers=3, per_host_limit=1)
+
+    assert ok == sample_api_data
+    assert isinstance(broken, ExternalServiceError)
+    assert "500 Server Error" in str(broken)
+    assert isinstance(missing, ExternalServiceError)
+
+def test_concurrent_data_pipeline(tmp_path, local_api_server, sample_api_data):
+    """Each (url, output) job runs the full pipeline and reports its own result."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    jobs = [(f"{local_api_server.url}/data", str(tmp_path / f"out_{i}.json")) for i in range(5)]
+    jobs.append((f"{local_api_server.url}/missing", str(tmp_path / "missing.json")))
+
+    results = data_processor.concurrent_data_pipeline(jobs, max_workers=4)
+
+    assert results == [True] * 5 + [False]
+    for _, output_file in jobs[:5]:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)["items"] == ["Item A", "Item B"]
+    assert not (tmp_path / "missing.json").exists()
+
+
+# 9. Streaming processing of paginated results
+
+def test_streaming_data_pipeline_follows_next_links(tmp_path, local_api_server):
+    """All pages are fetched through their 'next' links and written incrementally."""
+    local_api_server.routes["/page/1"] = (200, {"next": "/page/2", "previous": None,
+                                                "results": [{"name": "Item A"}, {"name": "Item B"}]})
+    local_api_server.routes["/page/2"] = (200, {"next": None, "previous": "/page/1",
+                                                "results": [{"name": "Item C"}, {"value": 3}]})
+    output_file = tmp_path / "stream" / "out.json"
+
+    success = data_processor.streaming_data_pipeline(f"{local_api_server.url}/page/1", str(output_file))
+
+    assert success is True
+    assert local_api_server.request_log == ["/page/1", "/page/2"]
+    with open(output_file, 'r', encoding='utf-8') as f:
+        saved_data = json.load(f)
+    assert saved_data["count"] == 4
+    assert saved_data["items"] == ["Item A", "Item B", "Item C", "Unknown"]
+    assert isinstance(saved_data["timestamp"], float)
+
+def test_stream_process_and_save_matches_process_and_save_data(mocker, tmp_path, sample_api_data):
+    """Streaming output has the same content as the in-memory version."""
+    mocker.patch("src.my_package.data_processor.time.time", return_value=1234567890.0)
+    data = {"results": [{"name": f"Item {i}"} for i in range(2500)]}
+    data["results"][1500:1500] = ["not an object", None] * 1000 # Fills all of one batch and parts of two others
+    data["results"].insert(2100, [1, 2])
+    data_processor.process_and_save_data(data, str(tmp_path / "full.json"))
+
+    count = data_processor.stream_process_and_save(iter(data["results"]), str(tmp_path / "stream.json"), batch_size=1000)
+
+    assert count == 2500
+    with open(tmp_path / "full.json", encoding='utf-8') as full, open(tmp_path / "stream.json", encoding='utf-8') as stream:
+        assert json.load(full) == json.load(stream)
+
+def test_streaming_data_pipeline_page_failure(tmp_path, local_api_server):
+    """A failing page makes the pipeline report failure."""
+    local_api_server.routes["/page/1"] = (200, {"next": "/page/2", "results": [{"name": "Item A"}]})
+
+    success = data_processor.streaming_data_pipeline(f"{local_api_server.url}/page/1", str(tmp_path / "out.json"))
+
+    assert success is False
+
+
+# 10. Output formats
+
+@pytest.mark.parametrize("format", formats.FORMATS)
+def test_process_and_save_data_formats_round_trip(tmp_path, sample_api_data, format):
+    """Every output format reads back to the same processed data."""
+    output_file = tmp_path / f"results.{format}"
+
+    data_processor.process_and_save_data(sample_api_data, str(output_file), format=format)
+
+    loaded = formats.load(str(output_file), format)
+    assert loaded["count"] == 2
+    assert loaded["items"] == ["Item A", "Item B"]
+    assert isinstance(loaded["timestamp"], float)
+
+def test_process_and_save_data_dictionary_encodes_items(mocker, tmp_path):
+    """The dictionary format keeps one copy per distinct name in memory as well as on disk."""
+    data = {"results": [{"name": f"Item {i % 3}"} for i in range(30)]}
+    spy = mocker.spy(data_processor, "_save_processed")
+    output_file = str(tmp_path / "results.dictionary")
+    data_processor.process_and_save_data(data, output_file, format="dictionary")
+    processed = spy.call_args.args[0]
+    assert isinstance(processed["items"], formats.EncodedItems)
+    assert processed["items"].symbols == ["Item 0", "Item 1", "Item 2"]
+    assert formats.load(output_file, "dictionary")["items"] == [f"Item {i % 3}" for i in range(30)]
+
+def test_process_and_save_data_unknown_format(tmp_path, sample_api_data):
+    """Unknown formats are rejected before anything is written."""
+    output_file = tmp_path / "results.xml"
+    with pytest.raises(ValueError, match="Unknown output format: 'xml'"):
+        data_processor.process_and_save_data(sample_api_data, str(output_file), format="xml")
+    assert not output_file.exists()
+
+def test_complex_data_pipeline_format(mocker, tmp_path, sample_api_data):
+    """The pipeline passes the output format through to the writer."""
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = sample_api_data
+    mocker.patch("src.my_package.data_processor.requests.get", return_value=mock_response)
+    output_file = tmp_path / "pipeline_output.ndjson"
+
+    assert data_processor.complex_data_pipeline("http://pipeline-api.com/all", str(output_file), format="ndjson") is True
+
+    lines = output_file.read_text(encoding="utf-8").splitlines()
+    assert lines[1:] == ['"Item A"', '"Item B"']
+
+
+# 11. Atomic writes
+
+def test_process_and_save_data_keeps_old_file_on_failure(mocker, tmp_path, sample_api_data):
+    """A failure while writing leaves the previous output in place."""
+    output_file = tmp_path / "results.json"
+    output_file.write_text("previous", encoding="utf-8")
+    mocker.patch("src.my_package.formats.json.dumps", side_effect=IOError("Disk full"))
+
+    with pytest.raises(IOError, match="Could not write to file"):
+        data_processor.process_and_save_data(sample_api_data, str(output_file))
+
+    assert output_file.read_text(encoding="utf-8") == "previous"
+    assert os.listdir(tmp_path) == ["results.json"]
+
+def test_concurrent_data_pipeline_group_commit(tmp_path, local_api_server, sample_api_data):
+    """Jobs sharing a group-commit writer all produce their outputs once committed."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    jobs = [(f"{local_api_server.url}/data", str(tmp_path / f"out_{i}.json")) for i in range(10)]
+
+    with AtomicWriter(fsync="group", group_size=4) as writer:
+        results = data_processor.concurrent_data_pipeline(jobs, max_workers=4, writer=writer)
+
+    assert results == [True] * 10
+    assert sorted(os.listdir(tmp_path)) == sorted(f"out_{i}.json" for i in range(10))
+
+# 12. Replaying archived responses from disk
+
+@pytest.mark.parametrize("dump_format", ["json", "ndjson"])
+@pytest.mark.parametrize("format", formats.FORMATS)
+def test_file_data_pipeline_matches_process_and_save_data(mocker, tmp_path, sample_api_data, dump_format, format):
+    """A dump on disk produces the same output as process_and_save_data on the same data."""
+    mocker.patch("src.my_package.data_processor.time.time", return_value=1234567890.0)
+    dump = tmp_path / f"dump.{dump_format}"
+    if dump_format == "json":
+        dump.write_text(json.dumps(sample_api_data), encoding="utf-8")
+    else:
+        dump.write_text("\n".join(json.dumps(item) for item in sample_api_data["results"]), encoding="utf-8")
+
+    assert data_processor.file_data_pipeline(str(dump), str(tmp_path / "replayed.out"), format=format) is True
+    data_processor.process_and_save_data(sample_api_data, str(tmp_path / "direct.out"), format=format)
+    assert (tmp_path / "replayed.out").read_bytes() == (tmp_path / "direct.out").read_bytes()
+
+def test_file_data_pipeline_failures(tmp_path):
+    """Missing or malformed dumps make the pipeline return False."""
+    assert data_processor.file_data_pipeline(str(tmp_path / "missing.json"), str(tmp_path / "out.json")) is False
+    dump = tmp_path / "dump.json"
+    dump.write_text('{"results": [{"name": "A"}, oops]}', encoding="utf-8")
+    assert data_processor.file_data_pipeline(str(dump), str(tmp_path / "out.json")) is False
+    assert not (tmp_path / "out.json").exists()
+
+# 13. Resumable and incremental runs
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    with CheckpointStore(str(tmp_path / "checkpoints")) as store:
+        yield store
+
+def test_resumable_data_pipeline_resumes_after_failure(tmp_path, local_api_server, checkpoint):
+    """A rerun after a failed page fetches only the pages not yet committed."""
+    local_api_server.routes["/page/1"] = (200, {"next": "/page/2", "results": [{"name": "Item A"}]})
+    local_api_server.routes["/page/2"] = (503, {"detail": "try later"})
+    output_file = tmp_path / "out.json"
+    url = f"{local_api_server.url}/page/1"
+
+    assert data_processor.resumable_data_pipeline(url, str(output_file), checkpoint) is False
+    assert not output_file.exists()
+
+    local_api_server.routes["/page/2"] = (200, {"next": None, "results": [{"name": "Item B"}]})
+    local_api_server.request_log.clear()
+    assert data_processor.resumable_data_pipeline(url, str(output_file), checkpoint) is True
+    assert local_api_server.request_log == ["/page/2"]
+    saved_data = json.loads(output_file.read_text(encoding="utf-8"))
+    assert saved_data["items"] == ["Item A", "Item B"]
+    assert saved_data["count"] == 2
+
+def test_resumable_data_pipeline_skips_unchanged_output(tmp_path, local_api_server, checkpoint):
+    """A full rerun over identical pages leaves the output alone; changed pages rewrite it."""
+    local_api_server.routes["/page/1"] = (200, {"next": None, "results": [{"name": "Item A"}]})
+    output_file = tmp_path / "out.json"
+    url = f"{local_api_server.url}/page/1"
+    assert data_processor.resumable_data_pipeline(url, str(output_file), checkpoint) is True
+    first_write = output_file.stat().st_mtime_ns
+
+    assert data_processor.resumable_data_pipeline(url, str(output_file), checkpoint) is True
+    assert output_file.stat().st_mtime_ns == first_write
+
+    local_api_server.routes["/page/1"] = (200, {"next": None, "results": [{"name": "Item Z"}]})
+    assert data_processor.resumable_data_pipeline(url, str(output_file), checkpoint) is True
+    assert json.loads(output_file.read_text(encoding="utf-8"))["items"] == ["Item Z"]
+
+def test_complex_data_pipeline_with_checkpoint(mocker, tmp_path, sample_api_data, checkpoint):
+    """With a checkpoint, identical data is not written again, and a new format is."""
+    mocker.patch("src.my_package.data_processor.fetch_data_from_api", return_value=sample_api_data)
+    spy_save = mocker.spy(data_processor, "_save_processed")
+    output_file = str(tmp_path / "out.json")
+
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, checkpoint=checkpoint) is True
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, checkpoint=checkpoint) is True
+    assert spy_save.call_count == 1
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, format="compact",
+                                                checkpoint=checkpoint) is True
+    assert spy_save.call_count == 2
+
+def test_complex_data_pipeline_checkpoint_covers_statistics(mocker, tmp_path, sample_api_data, checkpoint):
+    """Adding aggregate, changing only the aggregated values or losing the stats file writes them again."""
+    fetch = mocker.patch("src.my_package.data_processor.fetch_data_from_api", return_value=sample_api_data)
+    output_file = str(tmp_path / "out.json")
+    stats_file = tmp_path / "out.json.stats.json"
+
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, checkpoint=checkpoint) is True
+    assert not stats_file.exists()
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, checkpoint=checkpoint,
+                                                aggregate="value") is True
+    assert json.loads(stats_file.read_text(encoding="utf-8"))["sum"] == 30
+
+    fetch.return_value = {"results": [{"name": "Item A", "value": 100}, {"name": "Item B", "value": 200}]}
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, checkpoint=checkpoint,
+                                                aggregate="value") is True
+    assert json.loads(stats_file.read_text(encoding="utf-8"))["sum"] == 300
+
+    stats_file.unlink()
+    assert data_processor.complex_data_pipeline("http://api/data", output_file, checkpoint=checkpoint,
+                                                aggregate="value") is True
+    assert json.loads(stats_file.read_text(encoding="utf-8"))["sum"] == 300
+
+def test_checkpoint_skips_outputs_of_group_commit_writer(tmp_path, local_api_server, sample_api_data, checkpoint):
+    """Outputs staged by a group-commit writer are recorded once committed, so reruns still skip them."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    local_api_server.routes["/page/1"] = (200, {"next": None, "results": [{"name": "Item A"}]})
+    outputs = {"complex": tmp_path / "complex.json", "resumable": tmp_path / "resumable.json"}
+
+    def run():
+        with AtomicWriter(fsync="group") as writer:
+            assert data_processor.complex_data_pipeline(f"{local_api_server.url}/data", str(outputs["complex"]),
+                                                        writer=writer, checkpoint=checkpoint) is True
+            assert data_processor.resumable_data_pipeline(f"{local_api_server.url}/page/1",
+                                                          str(outputs["resumable"]), checkpoint,
+                                                          writer=writer) is True
+        return {name: path.stat().st_mtime_ns for name, path in outputs.items()}
+
+    first = run()
+    time.sleep(0.01)
+    assert run() == first
+
+# 14. Aggregating a numeric field alongside the output
+
+def test_process_and_save_data_aggregates_values(tmp_path, sample_api_data):
+    """With aggregate, statistics of the field are returned and saved next to the output."""
+    from src.my_package.aggregation import ValueStats, stats_path
+    output_file = str(tmp_path / "out.json")
+    sample_api_data["results"].append({"name": "Item C"}) # No value: counted as missing
+    stats = data_processor.process_and_save_data(sample_api_data, output_file, aggregate="value")
+    assert (stats.count, stats.missing, stats.sum, stats.mean) == (2, 1, 30, 15)
+    saved = ValueStats.load(stats_path(output_file))
+    assert saved.summary() == stats.summary()
+    assert json.loads(open(output_file, encoding="utf-8").read())["count"] == 3
+
+def test_process_and_save_data_without_aggregate_writes_no_stats(tmp_path, sample_api_data):
+    """Statistics are opt-in."""
+    assert data_processor.process_and_save_data(sample_api_data, str(tmp_path / "out.json")) is None
+    assert os.listdir(tmp_path) == ["out.json"]
+
+def test_streaming_data_pipeline_aggregates_across_pages(tmp_path, local_api_server):
+    """Statistics of a streamed run cover every page."""
+    from src.my_package.aggregation import ValueStats, stats_path
+    local_api_server.routes["/page/1"] = (200, {"next": "/page/2", "results": [{"name": "A", "value": 1.5}]})
+    local_api_server.routes["/page/2"] = (200, {"next": None, "results": [{"name": "B", "value": 2.5},
+                                                                          {"name": "C", "value": "n/a"}]})
+    output_file = str(tmp_path / "out.json")
+    assert data_processor.streaming_data_pipeline(f"{local_api_server.url}/page/1", output_file,
+                                                  aggregate="value") is True
+    stats = ValueStats.load(stats_path(output_file))
+    assert (stats.count, stats.missing, stats.min, stats.max, stats.sum) == (2, 1, 1.5, 2.5, 4.0)
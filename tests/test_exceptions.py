@@ -1,5 +1,6 @@
 """Specific tests demonstrating pytest.raises"""
 
+import math
 import pytest
 from src.my_package import exceptions
 
@@ -17,6 +18,60 @@ def test_divide_by_zero_message():
     with pytest.raises(ZeroDivisionError, match="Division by zero!"):
         exceptions.divide_by_zero(5, 0)
 
+def test_divide_pairs_without_zero_divisors():
+    """Bulk division returns every quotient and no errors."""
+    results = exceptions.divide_pairs([(10, 2), (1, 4), (-3, 1.5)])
+    assert results.values == [5, 0.25, -2]
+    assert results.errors == bytes(3)
+    assert results.failed == [] and results.error_messages() == {}
+
+def test_divide_pairs_raise_on_first_error():
+    """The default policy raises what divide_by_zero raises."""
+    with pytest.raises(ZeroDivisionError, match="^Division by zero!$"):
+        exceptions.divide_pairs([(1, 1), (5, 0)])
+
+def test_divide_pairs_collect():
+    """Collected failures leave None in place of the quotient and are flagged in the error codes."""
+    results = exceptions.divide_pairs([(1, 0), (4, 2), (3, 0.0)], on_zero_division="collect")
+    assert results.values == [None, 2, None]
+    assert list(results.errors) == [exceptions.ERROR_ZERO_DIVISION, exceptions.ERROR_NONE,
+                                    exceptions.ERROR_ZERO_DIVISION]
+    assert results.error_messages() == {0: "Division by zero!", 2: "Division by zero!"}
+
+@pytest.mark.parametrize(
+    "fill, expected",
+    [
+        (-1, [-1, -1, -1, -1]),
+        (math.inf, [math.inf] * 4),
+        (None, [math.inf, -math.inf, -math.inf, math.nan]),  # What IEEE 754 division gives
+    ]
+)
+def test_divide_pairs_substitute(fill, expected):
+    """Substituted failures take the fill value."""
+    results = exceptions.divide_pairs([(2, 0), (-2, 0), (2, -0.0), (0, 0)], on_zero_division="substitute", fill=fill)
+    assert [str(value) for value in results.values] == [str(value) for value in expected]
+    assert results.failed == [0, 1, 2, 3]
+
+def test_divide_pairs_substitute_nan_by_default():
+    """Without a fill value, substituted failures are NaN."""
+    results = exceptions.divide_pairs([(1, 0), (1, 1)], on_zero_division="substitute")
+    assert math.isnan(results.values[0]) and results.values[1] == 1
+
+@pytest.mark.parametrize("on_zero_division", ["raise", "collect", "substitute"])
+def test_divide_pairs_from_generator(on_zero_division):
+    """Pairs may come from a one-shot iterator."""
+    results = exceptions.divide_pairs(((a, 2) for a in range(4)), on_zero_division=on_zero_division)
+    assert results.values == [0, 0.5, 1, 1.5]
+    assert results.errors == bytes(4)
+    results = exceptions.divide_pairs(iter([(1, 0), (4, 2)]), on_zero_division="collect")
+    assert results.values == [None, 2]
+
+def test_divide_pairs_empty_and_bad_policy():
+    """No pairs give empty results; an unknown on_zero_division policy is rejected."""
+    assert exceptions.divide_pairs([]) == ([], b"", "Division by zero!")
+    with pytest.raises(ValueError, match="on_zero_division"):
+        exceptions.divide_pairs([(1, 0)], on_zero_division="ignore")
+
 def test_custom_error_normal():
     """Test raising the custom error with a valid message."""
     message = "Something went wrong"
@@ -0,0 +1,99 @@
+"""Tests for compiled formulas."""
+
+from array import array
+import math
+import pytest
+from src.my_package.basic_math import add, multiply, subtract
+from src.my_package.calculator import CalculationError
+from src.my_package.expressions import DivisionByZeroError, Expression, compile_expression, evaluate
+
+def test_evaluate_matches_basic_math_chain():
+    """A formula gives the same result as the equivalent chain of basic_math calls."""
+    formula = compile_expression("(x + 3) * y - z")
+    assert formula.variables == ("x", "y", "z")
+    for x, y, z in [(1, 2, 0.5), (-4.25, 3, 10), (0, 0, 0)]:
+        expected = subtract(multiply(add(x, 3), y), z)
+        assert formula.evaluate({"x": x, "y": y, "z": z, "unused": 1}) == expected
+        assert formula(x, y, z) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 + 2 * 3", 7),
+    ("(1 + 2) * 3", 9),
+    ("-a - -b", 1),
+    ("a / b / 2", 0.25),
+    ("2.5e1 - +a", 24),
+])
+def test_operator_precedence_and_unary_minus(text, expected):
+    """Precedence, associativity and unary signs follow the usual arithmetic rules."""
+    assert evaluate(text, {"a": 1, "b": 2}) == expected
+
+def test_formulas_are_cached_by_text():
+    """The same text returns the same compiled Expression."""
+    assert compile_expression("x * 2") is compile_expression("x * 2")
+    assert compile_expression("x * 2") is not compile_expression("x*2")
+    assert isinstance(compile_expression("x * 2"), Expression)
+
+@pytest.mark.parametrize("text", ["x ** 2", "f(x)", "x.real", "'a'", "True", "x if y else z", "x +", "", "[x]"])
+def test_unsupported_formulas_are_rejected(text):
+    """Anything besides numbers, names and + - * / is a ValueError at compile time."""
+    with pytest.raises(ValueError):
+        compile_expression(text)
+
+def test_missing_variable():
+    """A missing value names the variable."""
+    with pytest.raises(ValueError, match="'y'"):
+        evaluate("x + y", {"x": 1})
+
+def test_division_by_zero():
+    """Dividing by zero raises an error that is both a CalculationError and a ZeroDivisionError."""
+    formula = compile_expression("x / (y - 1)")
+    with pytest.raises(DivisionByZeroError, match="Division by zero!"):
+        formula.evaluate({"x": 1, "y": 1})
+    with pytest.raises(ZeroDivisionError):
+        formula(1, 1)
+    with pytest.raises(CalculationError):
+        formula.evaluate_batch({"x": [1, 2], "y": [2, 1]})
+    assert issubclass(DivisionByZeroError, CalculationError)
+
+def test_division_by_zero_in_batch_names_the_row():
+    """The first row dividing by zero is reported."""
+    with pytest.raises(DivisionByZeroError, match=r"row 2"):
+        compile_expression("x / y").evaluate_batch({"x": [1, 2, 3, 4], "y": [1, 2, 0, 0]})
+
+def test_evaluate_batch_matches_scalar_evaluation():
+    """Each row of a batch equals evaluating the formula on that row; scalars apply to every row."""
+    formula = compile_expression("(x + 3) * y - z")
+    xs, ys = [1.0, 2.0, -3.5], array("d", [2.0, 0.5, 4.0])
+    result = formula.evaluate_batch({"x": xs, "y": ys, "z": 1})
+    assert result == [formula(x, y, 1) for x, y in zip(xs, ys)]
+
+def test_evaluate_batch_writes_into_out():
+    """A preallocated buffer receives the results."""
+    out = array("d", [0.0] * 3)
+    assert compile_expression("x * 2").evaluate_batch({"x": [1, 2, 3]}, out=out) is out
+    assert list(out) == [2.0, 4.0, 6.0]
+
+def test_evaluate_batch_checks_columns():
+    """Columns must have equal lengths and at least one must be a sequence."""
+    formula = compile_expression("x + y")
+    with pytest.raises(ValueError, match="different lengths"):
+        formula.evaluate_batch({"x": [1, 2], "y": [1, 2, 3]})
+    with pytest.raises(TypeError):
+        formula.evaluate_batch({"x": 1, "y": 2})
+
+def test_evaluate_batch_numpy():
+    """ndarray columns are evaluated in one vectorized pass; zero divisors still raise."""
+    np = pytest.importorskip("numpy")
+    formula = compile_expression("(x + 3) * y / z")
+    x = np.array([1.0, 2.0, 3.0])
+    result = formula.evaluate_batch({"x": x, "y": 2, "z": np.array([1.0, 2.0, 4.0])})
+    assert result.tolist() == [8.0, 5.0, 3.0]
+    with pytest.raises(DivisionByZeroError):
+        formula.evaluate_batch({"x": x, "y": 2, "z": np.array([1.0, 0.0, 4.0])})
+
+def test_overflowing_literals_are_infinite():
+    """A literal too large for a float is infinity, as in Python."""
+    formula = compile_expression("x * 1e999 - -1e999")
+    assert formula(2) == math.inf
+    assert math.isnan(formula.evaluate({"x": -1})) # -inf + inf
+    assert formula.evaluate_batch({"x": [1, 2]}) == [math.inf, math.inf]
@@ -0,0 +1,130 @@
+"""Tests for the output formats module."""
+
+import io
+import pytest
+from src.my_package import formats
+
+@pytest.fixture
+def processed_data():
+    """Processed data as produced by process_and_save_data."""
+    return {"count": 3, "items": ["Item A", "Ítem B", ""], "timestamp": 1234567890.5}
+
+@pytest.mark.parametrize("format", formats.FORMATS)
+def test_dump_load_round_trip(tmp_path, processed_data, format):
+    """dump and load are inverses for every format."""
+    path = tmp_path / "out"
+    with open(path, 'wb') as f:
+        formats.dump(processed_data, f, format)
+    assert formats.load(str(path), format) == processed_data
+
+def test_compact_is_smaller_than_json(processed_data):
+    """Compact JSON has no whitespace."""
+    pretty, compact = io.BytesIO(), io.BytesIO()
+    formats.dump(processed_data, pretty, "json")
+    formats.dump(processed_data, compact, "compact")
+    assert b", " not in compact.getvalue() and b": " not in compact.getvalue()
+    assert len(compact.getvalue()) < len(pretty.getvalue())
+
+def test_columnar_random_access(tmp_path, processed_data):
+    """Columnar items are indexed straight from the memory map."""
+    path = tmp_path / "out.col"
+    with open(path, 'wb') as f:
+        formats.dump(processed_data, f, "columnar")
+
+    with formats.ColumnarItems(str(path)) as items:
+        assert len(items) == 3
+        assert items[1] == "Ítem B"
+        assert items[-1] == ""
+        assert items.timestamp == 1234567890.5
+        with pytest.raises(IndexError):
+            items[3]
+
+def test_columnar_rejects_other_files(tmp_path, processed_data):
+    """Files without the columnar magic are rejected."""
+    path = tmp_path / "out.json"
+    with open(path, 'wb') as f:
+        formats.dump(processed_data, f, "json")
+    with pytest.raises(ValueError, match="is not a columnar file"):
+        formats.ColumnarItems(str(path))
+
+def test_columnar_requires_strings():
+    """Only string items can be stored in the columnar layout."""
+    with pytest.raises(TypeError, match="requires string item names"):
+        formats.dump({"count": 1, "items": [None], "timestamp": 0.0}, io.BytesIO(), "columnar")
+
+def test_encode_items_shares_symbols():
+    """Each distinct name is stored once; codes use the narrowest width that fits."""
+    items = ["b", "a", "b", "b", "c"]
+    encoded = formats.encode_items(items)
+    assert encoded.symbols == ["b", "a", "c"]
+    assert list(encoded.codes) == [0, 1, 0, 0, 2]
+    assert encoded.codes.itemsize == 1
+    assert encoded == items and items == encoded
+    assert encoded[-1] == "c" and encoded[1:3] == ["a", "b"]
+    assert formats.encode_items([str(i) for i in range(300)]).codes.itemsize == 2
+    assert formats.encode_items([str(i) for i in range(70_000)]).codes.itemsize == 4
+
+def test_encode_items_respects_bound():
+    """More distinct names than allowed (or unhashable ones) give None."""
+    assert formats.encode_items(["a", "b", "c"], max_symbols=2) is None
+    assert formats.encode_items(["a", "b", "a"], max_symbols=2) is not None
+    assert formats.encode_items([["a"]]) is None
+
+def test_encode_items_stops_at_bound(monkeypatch):
+    """Interning stops with the chunk that goes over the bound instead of collecting every name."""
+    hashed = []
+
+    class Name(str):
+        def __hash__(self):
+            hashed.append(int(self))
+            return str.__hash__(self)
+
+    monkeypatch.setattr(formats, "_INTERN_CHUNK", 10)
+    assert formats.encode_items([Name(i) for i in range(1000)], max_symbols=5) is None
+    assert set(hashed) == set(range(10)) # Only the first chunk was interned
+
+def test_dictionary_refuses_too_many_symbols(monkeypatch):
+    """Past MAX_SYMBOLS distinct names the writer raises rather than interning them all."""
+    monkeypatch.setattr(formats, "MAX_SYMBOLS", 3)
+    processed = {"count": 4, "items": ["a", "b", "c", "d"], "timestamp": 0.0}
+    with pytest.raises(ValueError, match="at most 3 distinct item names"):
+        formats.dump(processed, io.BytesIO(), "dictionary")
+    processed["items"] = ["a", "b", "c", "a"]
+    formats.dump(processed, io.BytesIO(), "dictionary")
+
+@pytest.mark.parametrize("distinct", [1, 300, 70_000])
+def test_dictionary_round_trip_code_widths(distinct):
+    """Files with 1-, 2- and 4-byte codes read back to the same items."""
+    items = [f"name {i % distinct}" for i in range(distinct + 10)]
+    buffer = io.BytesIO()
+    formats.dump({"count": len(items), "items": items, "timestamp": 1.5}, buffer, "dictionary")
+    loaded = formats._load_dictionary(buffer.getvalue())
+    assert isinstance(loaded["items"], formats.EncodedItems)
+    assert loaded["items"] == items
+    assert (loaded["count"], loaded["timestamp"]) == (len(items), 1.5)
+
+def test_dictionary_is_compact_for_repetitive_names():
+    """Few distinct names across many items take a fraction of the columnar size."""
+    items = [f"Product {i % 50}" for i in range(10_000)]
+    processed = {"count": len(items), "items": items, "timestamp": 0.0}
+    columnar, dictionary = io.BytesIO(), io.BytesIO()
+    formats.dump(processed, columnar, "columnar")
+    formats.dump(processed, dictionary, "dictionary")
+    assert len(dictionary.getvalue()) * 10 < len(columnar.getvalue())
+
+def test_encoded_items_dump_to_other_formats():
+    """EncodedItems are written as plain names by the other formats."""
+    processed = {"count": 2, "items": formats.encode_items(["a", "a"]), "timestamp": 0.0}
+    buffer = io.BytesIO()
+    formats.dump(processed, buffer, "compact")
+    assert buffer.getvalue() == b'{"count":2,"items":["a","a"],"timestamp":0.0}'
+
+def test_dictionary_requires_strings():
+    """Only string items can be stored in the dictionary layout."""
+    with pytest.raises(TypeError, match="requires string item names"):
+        formats.dump({"count": 1, "items": [1], "timestamp": 0.0}, io.BytesIO(), "dictionary")
+
+def test_unknown_format():
+    """Unknown format names raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown output format"):
+        formats.check_format("yaml")
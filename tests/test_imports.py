@@ -0,0 +1,54 @@
+"""Tests for the lazy package namespace and the lightweight import path."""
+
+import subprocess
+import sys
+import pytest
+import src.my_package as my_package
+
+def loaded_modules(statement: str) -> set:
+    """Runs statement in a fresh interpreter and returns the names in sys.modules afterwards."""
+    code = f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(completed.stdout.split())
+
+def test_package_import_loads_no_submodules():
+    """Importing the package itself imports none of its modules or dependencies."""
+    modules = loaded_modules("import src.my_package")
+    assert not {name for name in modules if name.startswith("src.my_package.")}
+    assert "requests" not in modules
+
+@pytest.mark.parametrize("statement", [
+    "from src.my_package.data_processor import process_and_save_data",
+    "from src.my_package import process_and_save_data",
+    "import src.my_package.async_data_processor",
+])
+def test_local_processing_does_not_import_requests(statement):
+    """requests (and aiohttp) are only imported once the network is used."""
+    modules = loaded_modules(statement)
+    assert "requests" not in modules
+    assert "aiohttp" not in modules
+
+def test_requests_is_imported_on_first_network_use():
+    """Creating a session imports requests."""
+    modules = loaded_modules("from src.my_package import create_session\ncreate_session().close()")
+    assert "requests" in modules
+
+def test_exports_resolve_to_their_modules():
+    """Every exported name is the object defined in its submodule, and is cached after first use."""
+    from src.my_package import data_processor
+    assert my_package.complex_data_pipeline is data_processor.complex_data_pipeline
+    assert "complex_data_pipeline" in vars(my_package)
+    for name in my_package.__all__:
+        assert getattr(my_package, name) is not None
+
+def test_submodules_are_attributes():
+    """Submodules are reachable as attributes without importing them first."""
+    assert my_package.formats.FORMATS
+    assert "retry" in dir(my_package)
+    assert "Calculator" in dir(my_package)
+
+def test_unknown_attribute_raises():
+    """Unknown names raise AttributeError, so hasattr and from-imports behave normally."""
+    assert not hasattr(my_package, "no_such_name")
+    with pytest.raises(ImportError):
+        from src.my_package import no_such_name # noqa: F401
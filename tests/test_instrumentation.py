@@ -0,0 +1,82 @@
+"""Tests for the pipeline timing and tracing hooks."""
+
+import logging
+import pytest
+from src.my_package import data_processor, instrumentation
+from src.my_package.instrumentation import HistogramSink, LoggingSink, StageEvent, Tracer
+
+class StepClock:
+    """Clock advancing by one second per reading."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+def test_stage_is_noop_when_disabled():
+    """Without a tracer the shared span is falsy and ignores counters."""
+    with instrumentation.stage("fetch") as span:
+        span.items = 10
+    assert not span
+    assert instrumentation.stage("a") is instrumentation.stage("b")
+
+def test_tracer_sends_events_to_callback():
+    """Every stage produces a StageEvent with its duration and counters."""
+    events = []
+    with instrumentation.enabled(Tracer(events.append, clock=StepClock())):
+        with instrumentation.stage("transform") as span:
+            span.items = 3
+            span.bytes = 42
+        with pytest.raises(KeyError):
+            with instrumentation.stage("write"):
+                raise KeyError("boom")
+
+    assert events == [StageEvent("transform", 1.0, 3, 42, False), StageEvent("write", 1.0, 0, 0, True)]
+    assert instrumentation.stage("after") is instrumentation.stage("fetch") # Disabled again
+
+def test_histogram_percentiles():
+    """Percentiles use the nearest-rank method over all recorded durations."""
+    histogram = HistogramSink()
+    for duration in range(1, 101):
+        histogram(StageEvent("fetch", float(duration), 1, 10, False))
+
+    summary = histogram.summary()["fetch"]
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (50.0, 95.0, 99.0)
+    assert summary["count"] == 100
+    assert summary["items"] == 100
+    assert summary["bytes"] == 1000
+    assert histogram.percentile("fetch", 100) == 100.0
+
+def test_logging_sink(caplog):
+    """The logging sink emits one structured record per stage."""
+    sink = LoggingSink(level=logging.INFO)
+    with caplog.at_level(logging.INFO, logger="src.my_package.instrumentation"):
+        sink(StageEvent("write", 0.5, 2, 64, False))
+    record, = caplog.records
+    assert "stage=write" in record.getMessage()
+    assert record.stage_event["bytes"] == 64
+
+def test_pipeline_stages_are_recorded(tmp_path, local_api_server, sample_api_data):
+    """A traced pipeline run reports fetch, decode, transform and write stages."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    histogram = HistogramSink()
+
+    with instrumentation.enabled(Tracer(histogram)):
+        for i in range(3):
+            assert data_processor.complex_data_pipeline(f"{local_api_server.url}/data", str(tmp_path / f"{i}.json"))
+
+    summary = histogram.summary()
+    assert set(summary) == {"fetch", "decode", "transform", "write", "pipeline"}
+    assert all(stage["count"] == 3 for stage in summary.values())
+    assert summary["transform"]["items"] == 6
+    assert summary["decode"]["bytes"] > 0
+    assert summary["write"]["bytes"] == sum((tmp_path / f"{i}.json").stat().st_size for i in range(3))
+
+def test_pipeline_logs_instead_of_printing(capsys, caplog, tmp_path):
+    """Pipeline failures are logged as warnings and nothing is printed."""
+    with caplog.at_level(logging.WARNING, logger="src.my_package.data_processor"):
+        assert data_processor.complex_data_pipeline("http://127.0.0.1:9/unreachable", str(tmp_path / "out.json")) is False
+
+    assert capsys.readouterr().out == ""
+    assert any("Data pipeline failed" in record.getMessage() for record in caplog.records)
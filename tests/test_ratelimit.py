@@ -0,0 +1,206 @@
+"""Tests for per-host rate limiting and adaptive concurrency."""
+
+import threading
+import time
+import pytest
+from src.my_package import data_processor
+from src.my_package.ratelimit import AdaptiveConcurrency, RateLimiter, TokenBucket
+from src.my_package.retry import RetryPolicy
+
+class FakeClock:
+    """Clock advanced by the fake sleep, so no test really waits."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+# --- Token bucket ---
+
+def test_token_bucket_allows_burst_then_rate(clock):
+    """A full bucket serves a burst at once; later acquisitions wait 1/rate each."""
+    bucket = TokenBucket(rate=10, burst=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert not bucket.try_acquire()
+    assert bucket.acquire() == pytest.approx(0.1)
+    clock.now += 1.0
+    assert bucket.tokens == pytest.approx(3) # Refilled, but never above the burst
+
+def test_token_bucket_queues_waiters_in_order(clock):
+    """Reservations made together are spaced 1/rate apart."""
+    bucket = TokenBucket(rate=4, burst=1, clock=clock, sleep=lambda seconds: None)
+    assert [bucket.acquire() for _ in range(4)] == pytest.approx([0.0, 0.25, 0.5, 0.75])
+    assert bucket.tokens == pytest.approx(-3)
+
+def test_token_bucket_rejects_bad_rate():
+    """A rate of zero is refused."""
+    with pytest.raises(ValueError, match="rate must be positive"):
+        TokenBucket(rate=0)
+
+# --- AIMD concurrency ---
+
+def run_requests(concurrency, clock, count, latency=0.1, overloaded=False):
+    """Runs count requests one after another at the full limit, each taking latency seconds."""
+    for _ in range(count):
+        concurrency.in_flight = int(concurrency.limit) - 1 # The others in flight
+        concurrency.acquire()
+        clock.now += latency
+        concurrency.release(latency, overloaded)
+    concurrency.in_flight = 0
+
+def test_limit_grows_additively_when_used(clock):
+    """Each request that used the whole limit raises it by 1/limit: about one per limit's worth of requests."""
+    concurrency = AdaptiveConcurrency(max_limit=10, initial_limit=2, clock=clock)
+    run_requests(concurrency, clock, 2)
+    assert concurrency.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    run_requests(concurrency, clock, 100)
+    assert concurrency.limit == 10
+
+def test_limit_does_not_grow_when_unused(clock):
+    """Requests that leave the limit unused don't raise it."""
+    concurrency = AdaptiveConcurrency(max_limit=10, initial_limit=4, clock=clock)
+    for _ in range(20):
+        concurrency.acquire()
+        concurrency.release(0.1, False)
+    assert concurrency.limit == 4
+
+def test_limit_halves_once_per_burst_of_overloads(clock):
+    """Overloads within one latency of a decrease don't cut the limit again."""
+    concurrency = AdaptiveConcurrency(max_limit=16, clock=clock)
+    run_requests(concurrency, clock, 1, latency=0.1)
+    for _ in range(5):
+        concurrency.acquire()
+        concurrency.release(0.1, True)
+    assert concurrency.limit == 8
+    clock.now += 0.2
+    concurrency.acquire()
+    concurrency.release(None, False) # A failed request
+    assert concurrency.limit == 4
+
+def test_limit_drops_on_rising_latency_and_stays_in_bounds(clock):
+    """Latency above the tolerance times the baseline counts as overload; the limit stops at min_limit."""
+    concurrency = AdaptiveConcurrency(max_limit=8, min_limit=2, clock=clock)
+    run_requests(concurrency, clock, 1, latency=0.1)
+    run_requests(concurrency, clock, 10, latency=0.5)
+    assert concurrency.limit == 2
+    assert concurrency.baseline < 0.2 # Only creeps towards the slower latencies
+
+def test_requests_over_the_limit_wait(clock):
+    """A request beyond the limit is queued until one in flight ends."""
+    concurrency = AdaptiveConcurrency(max_limit=1, clock=clock)
+    concurrency.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (concurrency.acquire(), acquired.set()))
+    waiter.start()
+    while concurrency.queued != 1:
+        time.sleep(0.001)
+    assert not acquired.is_set()
+    concurrency.release(0.1, False)
+    assert acquired.wait(5)
+    waiter.join()
+    assert (concurrency.in_flight, concurrency.queued) == (1, 0)
+
+@pytest.mark.parametrize("options", [{"max_limit": 0}, {"max_limit": 4, "min_limit": 5}, {"max_limit": 4, "backoff": 1}])
+def test_adaptive_concurrency_rejects_bad_options(options):
+    """Limits out of order, a zero limit and a backoff of 1 are refused."""
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(**options)
+
+# --- RateLimiter ---
+
+def test_rate_limiter_tracks_hosts_separately(clock):
+    """Each host gets its own bucket and limit; overloads and errors show in its stats."""
+    limiter = RateLimiter(rate=100, max_concurrency=8, clock=clock, sleep=clock.sleep)
+    with limiter.request("http://a.example/x") as permit:
+        clock.now += 0.01
+        permit.status = 200
+    with limiter.request("http://b.example/y") as permit:
+        clock.now += 0.01
+        permit.status = 429
+    with pytest.raises(RuntimeError):
+        with limiter.request("http://b.example/z"):
+            clock.now += 0.05
+            raise RuntimeError("connection reset")
+
+    stats = limiter.stats()
+    assert sorted(stats) == ["a.example", "b.example"]
+    assert (stats["a.example"].requests, stats["a.example"].overloads, stats["a.example"].limit) == (1, 0, 8)
+    assert (stats["b.example"].requests, stats["b.example"].overloads, stats["b.example"].limit) == (2, 2, 2)
+    assert stats["b.example"].in_flight == 0 and stats["b.example"].queued == 0
+
+def test_rate_limiter_without_concurrency_only_counts(clock):
+    """Without max_concurrency only the token bucket applies, and stats just count requests."""
+    limiter = RateLimiter(rate=1, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        with limiter.request("http://a.example/x") as permit:
+            permit.status = 200
+    stats = limiter.stats()["a.example"]
+    assert stats.limit is None and stats.requests == 3
+    assert clock.sleeps == [1.0, 1.0]
+
+def test_rate_wait_does_not_hold_a_concurrency_slot(clock):
+    """A request waiting for a token is not counted in flight while it sleeps."""
+    in_flight_while_sleeping = []
+    def sleep(seconds):
+        in_flight_while_sleeping.append(limiter.stats()["a.example"].in_flight)
+        clock.sleep(seconds)
+    limiter = RateLimiter(rate=1, burst=1, max_concurrency=4, clock=clock, sleep=sleep)
+    for _ in range(2):
+        with limiter.request("http://a.example/x") as permit:
+            permit.status = 200
+    assert clock.sleeps == [1.0]
+    assert in_flight_while_sleeping == [0]
+
+# --- Against a local server that throttles ---
+
+def throttling_route(capacity, payload, delay=0.02):
+    """Route answering 429 while more than `capacity` requests are being handled at once."""
+    lock = threading.Lock()
+    state = {"active": 0, "rejected": 0}
+    def route(handler):
+        with lock:
+            state["active"] += 1
+            overloaded = state["active"] > capacity
+            state["rejected"] += overloaded
+        try:
+            time.sleep(delay)
+            return (429, {"detail": "slow down"}, {}) if overloaded else (200, payload, {})
+        finally:
+            with lock:
+                state["active"] -= 1
+    route.state = state
+    return route
+
+def test_fetch_many_adapts_to_a_throttling_server(local_api_server, sample_api_data):
+    """429s cut the host's concurrency limit below the worker count, and every fetch still succeeds."""
+    route = throttling_route(capacity=3, payload=sample_api_data)
+    local_api_server.routes["/data"] = route
+    limiter = RateLimiter(max_concurrency=16)
+    retry = RetryPolicy(max_attempts=50, base_delay=0.001, max_delay=0.01)
+
+    results = data_processor.fetch_many([f"{local_api_server.url}/data"] * 48, max_workers=16,
+                                        retry=retry, rate_limiter=limiter)
+
+    assert results == [sample_api_data] * 48
+    stats = limiter.stats()[local_api_server.url.split("//")[1]]
+    assert stats.overloads == route.state["rejected"] > 0
+    assert stats.limit < 16
+    assert stats.requests == 48 + route.state["rejected"]
+
+def test_fetch_respects_the_request_rate(local_api_server, sample_api_data):
+    """Requests to a host are spaced by the token bucket."""
+    local_api_server.routes["/data"] = (200, sample_api_data)
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        data_processor.fetch_data_from_api(f"{local_api_server.url}/data", rate_limiter=limiter)
+    assert time.monotonic() - start >= 0.1 - 0.01 # Five waits of 20 ms after the first request
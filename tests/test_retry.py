@@ -0,0 +1,186 @@
+"""Tests for the retry policy, retry budget and circuit breaker."""
+
+import pytest
+import requests
+from src.my_package import data_processor
+from src.my_package.data_processor import ExternalServiceError
+from src.my_package.retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy, parse_retry_after
+
+class FakeClock:
+    """Clock advanced by the fake sleep, so no test really waits."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def flaky(failures, error=ConnectionError):
+    """Returns a function failing `failures` times before returning 'ok'."""
+    timeouts = []
+    def func(timeout):
+        timeouts.append(timeout)
+        if len(timeouts) <= failures:
+            raise error("transient")
+        return "ok"
+    func.timeouts = timeouts
+    return func
+
+def test_retries_until_success(clock):
+    """Transient errors are retried with capped exponential backoff."""
+    policy = RetryPolicy(max_attempts=4, base_delay=1, max_delay=3, sleep=clock.sleep, clock=clock, rng=lambda: 1.0)
+    func = flaky(3)
+
+    assert policy.call(func, retryable=(ConnectionError,)) == "ok"
+    assert clock.sleeps == [1, 2, 3]
+
+def test_gives_up_after_max_attempts(clock):
+    """The last error is re-raised once all attempts are used."""
+    policy = RetryPolicy(max_attempts=2, sleep=clock.sleep, clock=clock)
+    func = flaky(5)
+    with pytest.raises(ConnectionError):
+        policy.call(func, retryable=(ConnectionError,))
+    assert len(func.timeouts) == 2
+
+def test_non_retryable_errors_are_raised_immediately(clock):
+    """Errors not listed as retryable are not retried."""
+    policy = RetryPolicy(sleep=clock.sleep, clock=clock)
+    func = flaky(1, error=KeyError)
+    with pytest.raises(KeyError):
+        policy.call(func, retryable=(ConnectionError,))
+    assert clock.sleeps == []
+
+def test_total_timeout_bounds_attempts(clock):
+    """Attempts share the total deadline, and no retry starts past it."""
+    policy = RetryPolicy(max_attempts=10, base_delay=4, attempt_timeout=5, total_timeout=7,
+                         sleep=clock.sleep, clock=clock, rng=lambda: 1.0)
+    func = flaky(10)
+    with pytest.raises(ConnectionError):
+        policy.call(func, retryable=(ConnectionError,))
+    assert func.timeouts == [5, 3] # Second attempt only gets what is left of the deadline
+
+def test_no_attempt_once_sleep_overruns_deadline(clock):
+    """A sleep that ends past the deadline re-raises the last error instead of trying with no time left."""
+    def late_sleep(seconds):
+        clock.sleep(seconds + 0.6)
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, total_timeout=1.0,
+                         sleep=late_sleep, clock=clock, rng=lambda: 1.0)
+    func = flaky(5)
+    with pytest.raises(ConnectionError):
+        policy.call(func, retryable=(ConnectionError,))
+    assert func.timeouts == [1.0]
+
+def test_retry_budget_limits_retries(clock):
+    """Retries stop when the shared budget runs out."""
+    budget = RetryBudget(ratio=0, min_tokens=1)
+    policy = RetryPolicy(max_attempts=5, budget=budget, sleep=clock.sleep, clock=clock)
+    func = flaky(10)
+    with pytest.raises(ConnectionError):
+        policy.call(func, retryable=(ConnectionError,))
+    assert len(func.timeouts) == 2
+    assert budget.tokens == 0
+
+def test_circuit_breaker_opens_and_recovers(clock):
+    """Consecutive failures open the circuit; a trial call after the timeout closes it."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    policy = RetryPolicy(max_attempts=1, breaker=breaker, sleep=clock.sleep, clock=clock)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            policy.call(flaky(1), "host", retryable=(ConnectionError,))
+    assert breaker.state("host") == "open"
+    with pytest.raises(CircuitOpenError, match="Circuit open for host"):
+        policy.call(flaky(0), "host")
+    assert breaker.state("other") == "closed"
+
+    clock.now += 10
+    assert breaker.state("host") == "half-open"
+    assert policy.call(flaky(0), "host") == "ok"
+    assert breaker.state("host") == "closed"
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("7", 7.0), ("Thu, 01 Jan 1970 00:01:40 GMT", 40.0), ("soon", None)],
+    ids=["missing", "seconds", "http-date", "invalid"]
+)
+def test_parse_retry_after(value, expected):
+    """Retry-After accepts delta-seconds and HTTP dates."""
+    assert parse_retry_after(value, now=60.0) == expected
+
+# --- Through fetch_data_from_api against the local server ---
+
+def failing_route(failures, status, payload, headers=None):
+    """Route answering `status` for the first `failures` requests, then 200."""
+    calls = []
+    def route(handler):
+        calls.append(handler.path)
+        if len(calls) <= failures:
+            return status, {"detail": "try later"}, headers or {}
+        return 200, payload, {}
+    return route
+
+def test_fetch_retries_server_errors(local_api_server, clock, sample_api_data):
+    """5xx responses are retried and Retry-After is honoured."""
+    local_api_server.routes["/data"] = failing_route(2, 503, sample_api_data, {"Retry-After": "2"})
+    policy = RetryPolicy(sleep=clock.sleep, clock=clock)
+
+    data = data_processor.fetch_data_from_api(f"{local_api_server.url}/data", retry=policy)
+
+    assert data == sample_api_data
+    assert clock.sleeps == [2.0, 2.0]
+    assert len(local_api_server.request_log) == 3
+
+def test_fetch_gives_up_on_long_retry_after(local_api_server, clock, sample_api_data):
+    """A Retry-After beyond max_delay fails the fetch instead of sleeping for it."""
+    local_api_server.routes["/data"] = failing_route(1, 503, sample_api_data, {"Retry-After": "86400"})
+    policy = RetryPolicy(max_delay=10, sleep=clock.sleep, clock=clock)
+    with pytest.raises(ExternalServiceError, match="503"):
+        data_processor.fetch_data_from_api(f"{local_api_server.url}/data", retry=policy)
+    assert clock.sleeps == []
+    assert len(local_api_server.request_log) == 1
+
+def test_fetch_does_not_retry_client_errors(local_api_server, clock):
+    """4xx responses other than 429 fail at once with ExternalServiceError."""
+    policy = RetryPolicy(sleep=clock.sleep, clock=clock)
+    with pytest.raises(ExternalServiceError, match="404"):
+        data_processor.fetch_data_from_api(f"{local_api_server.url}/missing", retry=policy)
+    assert len(local_api_server.request_log) == 1
+
+def test_fetch_maps_open_circuit(local_api_server, clock):
+    """A refused call surfaces as ExternalServiceError, without a request."""
+    breaker = CircuitBreaker(failure_threshold=1, clock=clock)
+    breaker.record_failure(local_api_server.url.split("//")[1])
+    policy = RetryPolicy(breaker=breaker, sleep=clock.sleep, clock=clock)
+    with pytest.raises(ExternalServiceError, match="Circuit open"):
+        data_processor.fetch_data_from_api(f"{local_api_server.url}/data", retry=policy)
+    assert local_api_server.request_log == []
+
+def test_fetch_retries_timeouts(mocker, clock, sample_api_data):
+    """Timeouts are retried with the per-attempt timeout passed to requests."""
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = sample_api_data
+    mock_get = mocker.patch("src.my_package.data_processor.requests.get",
+                            side_effect=[requests.exceptions.Timeout("slow"), mock_response])
+    policy = RetryPolicy(attempt_timeout=2.5, sleep=clock.sleep, clock=clock)
+
+    assert data_processor.fetch_data_from_api("http://retry-api.com/data", retry=policy) == sample_api_data
+    assert mock_get.call_count == 2
+    mock_get.assert_called_with("http://retry-api.com/data", timeout=2.5)
+
+def test_fetch_simulated_latency(mocker, sample_api_data):
+    """The simulated delay only happens when asked for."""
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = sample_api_data
+    mocker.patch("src.my_package.data_processor.requests.get", return_value=mock_response)
+    mock_sleep = mocker.patch("src.my_package.data_processor.time.sleep")
+
+    data_processor.fetch_data_from_api("http://slow-api.com/data", simulated_latency=0.5)
+
+    mock_sleep.assert_called_once_with(0.5)
@@ -0,0 +1,62 @@
+"""Tests for the multi-process job runner."""
+
+import json
+import pytest
+from src.my_package.runner import JobResult, JobRunner, run_jobs
+
+@pytest.fixture
+def jobs(tmp_path, local_api_server, sample_api_data):
+    """Ten jobs against the stub server; job 3 gets a 404 and job 7 a payload without results."""
+    local_api_server.routes["/bad"] = (200, {"count": 0})
+    jobs = []
+    for i in range(10):
+        local_api_server.routes[f"/items/{i}"] = (200, sample_api_data)
+        path = "/missing" if i == 3 else "/bad" if i == 7 else f"/items/{i}"
+        jobs.append((f"{local_api_server.url}{path}", str(tmp_path / f"out_{i}.json")))
+    return jobs
+
+def test_run_jobs_reports_each_job_in_order(jobs):
+    """Every job gets a result in input order, with error details on failure."""
+    results = run_jobs(jobs, max_workers=2, chunk_size=3)
+    assert [result.index for result in results] == list(range(10))
+    assert [result.ok for result in results] == [i not in (3, 7) for i in range(10)]
+    assert results[3].error_type == "ExternalServiceError"
+    assert "404" in results[3].error
+    assert results[7].error_type == "ValueError"
+    assert results[0] == JobResult(0, *jobs[0], True, None, None, results[0].duration)
+    with open(jobs[0][1], 'r', encoding='utf-8') as f:
+        assert json.load(f)["count"] == 2
+
+def test_runner_consumes_jobs_lazily(jobs):
+    """No more than max_in_flight chunks are taken from the job iterable ahead of the results."""
+    consumed = []
+
+    def generate():
+        for job in jobs:
+            consumed.append(job)
+            yield job
+
+    runner = JobRunner(max_workers=1, chunk_size=2, max_in_flight=1)
+    results = runner.iter_results(generate())
+    next(results)
+    assert len(consumed) <= 4 # The finished chunk and the one sent after it
+    results.close()
+
+def test_cancel_stops_dispatching(jobs):
+    """After cancel() only chunks already sent are reported; the next run is not cancelled."""
+    runner = JobRunner(max_workers=1, chunk_size=2, max_in_flight=1)
+    results = []
+    for result in runner.iter_results(jobs):
+        results.append(result)
+        runner.cancel()
+    assert runner.cancelled
+    assert len(results) == 2
+    assert len(runner.run(jobs)) == 10
+    assert not runner.cancelled
+
+def test_runner_rejects_bad_options():
+    """Unknown formats and chunk sizes below 1 are refused when the runner is created."""
+    with pytest.raises(ValueError, match="Unknown output format"):
+        JobRunner(format="xml")
+    with pytest.raises(ValueError, match="chunk_size"):
+        JobRunner(chunk_size=0)
@@ -0,0 +1,57 @@
+"""Tests for compiled payload schemas."""
+
+import pytest
+from array import array
+from src.my_package.schema import Field, PayloadSchema
+
+@pytest.fixture
+def schema():
+    return PayloadSchema(Field("name", str, default="Unknown"), Field("value", float), Field("id", int))
+
+def test_extract_well_formed_payload(schema):
+    """Typed fields become compact arrays, strings stay in a list."""
+    payload = {"results": [{"name": "A", "value": 1.5, "id": 1}, {"name": "B", "value": 2, "id": 2}]}
+    extraction = schema.extract(payload)
+    assert extraction.columns == {"name": ["A", "B"], "value": array("d", [1.5, 2.0]), "id": array("q", [1, 2])}
+    assert extraction.count == 2
+    assert extraction.invalid == []
+
+def test_extract_reports_invalid_rows(schema):
+    """Bad rows are skipped and reported by index; defaults fill optional fields."""
+    payload = {"results": [
+        {"name": "A", "value": 1.0, "id": 1},
+        "not an object",
+        {"value": 3.0, "id": 3},
+        {"name": "D", "value": "4", "id": 4},
+        {"name": "E", "value": 5.0},
+        {"name": "F", "value": 6.0, "id": True},
+        {"name": "G", "value": 7.0, "id": 1 << 70},
+        {"name": "H", "value": 10 ** 400, "id": 8},
+    ]}
+    extraction = schema.extract(payload)
+    assert extraction.columns["name"] == ["A", "Unknown"]
+    assert list(extraction.columns["id"]) == [1, 3]
+    assert extraction.count == 2
+    assert extraction.invalid == [
+        (1, "expected an object, got str"),
+        (3, "'value' must be float, got str"),
+        (4, "missing 'id'"),
+        (5, "'id' must be int, got bool"),
+        (6, "'id' is out of range"),
+        (7, "'value' is out of range"),
+    ]
+
+def test_untyped_field_accepts_any_value():
+    extraction = PayloadSchema(Field("name")).extract({"results": [{"name": 1}, {"name": None}]})
+    assert extraction.columns["name"] == [1, None]
+
+@pytest.mark.parametrize("payload, error", [([], TypeError), ({"count": 0}, ValueError), ({"results": {}}, ValueError)])
+def test_extract_rejects_malformed_payload(schema, payload, error):
+    with pytest.raises(error):
+        schema.extract(payload)
+
+def test_schema_rejects_unsupported_types():
+    with pytest.raises(ValueError, match="Unsupported field type"):
+        PayloadSchema(Field("when", complex))
+    with pytest.raises(ValueError, match="at least one field"):
+        PayloadSchema()
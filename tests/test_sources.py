@@ -0,0 +1,107 @@
+"""Tests for the streaming file readers in the sources module."""
+
+import io
+import json
+import pytest
+from src.my_package import sources
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16], ids=["1-char", "7-chars", "64k"])
+def test_iter_json_results(tmp_path, sample_api_data, chunk_size):
+    """Items are yielded one by one whatever the chunk boundaries."""
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(sample_api_data, indent=4), encoding="utf-8")
+
+    items = list(sources.iter_json_results(str(path), chunk_size=chunk_size))
+
+    assert items == sample_api_data["results"]
+
+def test_iter_json_results_numbers_across_chunks():
+    """Numbers split across chunk boundaries are decoded whole."""
+    text = '{"next": null, "results": [12345, 6.789e10, {"name": "x"}], "count": 3}'
+    assert list(sources.iter_json_results(io.StringIO(text), chunk_size=3)) == [12345, 6.789e10, {"name": "x"}]
+
+def test_iter_json_results_is_lazy():
+    """Items before a malformed one are yielded before the error is raised."""
+    stream = sources.iter_json_results(io.StringIO('{"results": [{"name": "A"}, oops]}'))
+    assert next(stream) == {"name": "A"}
+    with pytest.raises(ValueError, match="Malformed JSON"):
+        next(stream)
+
+@pytest.mark.parametrize("text", ['{"items": []}', '{"results": "not a list"}', '{}'])
+def test_iter_json_results_requires_results_list(text):
+    """Documents without a 'results' list are rejected like process_and_save_data does."""
+    with pytest.raises(ValueError, match="Input data must contain a 'results' list"):
+        list(sources.iter_json_results(io.StringIO(text)))
+
+def test_iter_ndjson_results(tmp_path, sample_api_data):
+    """Each non-blank line of an NDJSON file is one item."""
+    path = tmp_path / "dump.ndjson"
+    lines = [json.dumps(item) for item in sample_api_data["results"]]
+    path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+    assert list(sources.iter_ndjson_results(str(path))) == sample_api_data["results"]
+
+# Memory-mapped dumps
+
+TRICKY_ITEMS = [
+    {"name": "Item A", "value": 1},
+    {"value": 2},
+    {"name": "café \"quoted\"", "tags": ["x"]},
+    {"label": "name", "name": "Item D"},
+    {"name": "Item E", "nested": {"name": "inner"}},
+    {"name": 5},
+    [1, 2],
+    "just a string",
+    {"name": "été"},
+]
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".json"])
+def test_mapped_dump_names_match_process_and_save_data(tmp_path, suffix):
+    """Names come out as process_and_save_data extracts them, whichever path reads them."""
+    path = tmp_path / f"dump{suffix}"
+    if suffix == ".ndjson":
+        path.write_text("\n".join(json.dumps(item, ensure_ascii=False) for item in TRICKY_ITEMS) + "\n\n",
+                        encoding="utf-8")
+    else:
+        path.write_text(json.dumps({"count": 9, "results": TRICKY_ITEMS}, ensure_ascii=False), encoding="utf-8")
+
+    with sources.MappedDump(str(path)) as dump:
+        assert dump.format == suffix[1:]
+        assert list(dump.iter_results()) == TRICKY_ITEMS
+        assert list(dump.iter_names()) == ["Item A", "Unknown", "café \"quoted\"", "Item D", "Item E", 5,
+                                           "été"]
+        assert dump.skipped == 2
+
+@pytest.mark.parametrize("line", [
+    b'{"name": "bad" garbage}',
+    b'{"name": "x",}',
+    b'{"id": 01, "name": "x"}',
+    b'{"name": "tab\there"}',
+])
+def test_mapped_dump_rejects_malformed_flat_records(tmp_path, line):
+    """A malformed record fails as json.loads fails on it, even when its name could be read."""
+    path = tmp_path / "dump.ndjson"
+    path.write_bytes(b'{"name": "ok"}\n' + line + b"\n")
+    with sources.MappedDump(str(path)) as dump, pytest.raises(ValueError):
+        list(dump.iter_names())
+
+def test_mapped_dump_escaped_keys_use_json(tmp_path):
+    """Keys written with escapes are decoded by json, so the last "name" still wins."""
+    path = tmp_path / "dump.ndjson"
+    path.write_bytes(b'{"name": "first", "n\\u0061me": "second", "note": "a \\"quoted\\" \\u00e9"}\n')
+    with sources.MappedDump(str(path)) as dump:
+        assert list(dump.iter_names()) == ["second"]
+
+def test_mapped_text_keeps_multibyte_characters_whole():
+    """Mapped JSON is decoded chunk by chunk without splitting characters."""
+    items = [{"name": "é" * n} for n in range(1, 50)]
+    data = json.dumps({"results": items}, ensure_ascii=False).encode("utf-8")
+    assert list(sources.iter_json_results(sources._MappedText(data), chunk_size=7)) == items
+
+def test_mapped_dump_empty_and_unknown_format(tmp_path):
+    path = tmp_path / "empty.ndjson"
+    path.write_bytes(b"")
+    with sources.MappedDump(str(path)) as dump:
+        assert list(dump.iter_names()) == []
+    with pytest.raises(ValueError, match="Unknown dump format"):
+        sources.MappedDump(str(path), format="xml")
@@ -0,0 +1,94 @@
+"""Tests for the atomic writer used by the data pipeline."""
+
+import os
+import pytest
+from src.my_package.writers import AtomicWriter
+
+def test_atomic_write_replaces_target(tmp_path):
+    """The target is created and later replaced in full; no temporary files remain."""
+    target = tmp_path / "nested" / "out.bin"
+    writer = AtomicWriter()
+
+    with writer.open(str(target)) as f:
+        f.write(b"first")
+    with writer.open(str(target)) as f:
+        f.write(b"second")
+
+    assert target.read_bytes() == b"second"
+    assert os.listdir(target.parent) == ["out.bin"]
+
+def test_failed_write_leaves_target_untouched(tmp_path):
+    """If writing raises, the old contents survive and the temporary file is removed."""
+    target = tmp_path / "out.bin"
+    target.write_bytes(b"old")
+    writer = AtomicWriter()
+
+    with pytest.raises(RuntimeError):
+        with writer.open(str(target)) as f:
+            f.write(b"partial")
+            raise RuntimeError("crash midway")
+
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["out.bin"]
+
+def test_directories_are_created_once(mocker, tmp_path):
+    """os.makedirs runs once per directory, and again only if the directory disappears."""
+    spy_makedirs = mocker.spy(os, "makedirs")
+    writer = AtomicWriter()
+    out_dir = tmp_path / "out"
+
+    for i in range(3):
+        with writer.open(str(out_dir / f"{i}.bin")) as f:
+            f.write(b"x")
+    assert spy_makedirs.call_count == 1
+
+    for name in os.listdir(out_dir):
+        os.remove(out_dir / name)
+    os.rmdir(out_dir)
+    with writer.open(str(out_dir / "again.bin")) as f:
+        f.write(b"x")
+    assert (out_dir / "again.bin").exists()
+
+def test_fsync_always(mocker, tmp_path):
+    """In 'always' mode the file and its directory are fsynced."""
+    spy_fsync = mocker.spy(os, "fsync")
+    with AtomicWriter(fsync="always").open(str(tmp_path / "out.bin")) as f:
+        f.write(b"x")
+    assert spy_fsync.call_count == 2
+
+def test_group_commit(mocker, tmp_path):
+    """In 'group' mode files appear together on commit, with fsyncs batched."""
+    spy_fsync = mocker.spy(os, "fsync")
+    targets = [tmp_path / f"{i}.bin" for i in range(5)]
+
+    with AtomicWriter(fsync="group", group_size=3) as writer:
+        for target in targets:
+            with writer.open(str(target)) as f:
+                f.write(b"x")
+        # The first three were committed automatically, the last two are staged
+        assert [target.exists() for target in targets] == [True, True, True, False, False]
+        assert writer.pending == 2
+
+    assert all(target.exists() for target in targets)
+    assert writer.pending == 0
+    assert spy_fsync.call_count == 5 + 2 # One per file, one per directory per commit
+
+def test_when_visible_waits_for_group_commit(tmp_path):
+    """Callbacks for a staged file run after the commit; for anything else, at once."""
+    seen = []
+    writer = AtomicWriter(fsync="group")
+    target = tmp_path / "out.bin"
+    with writer.open(str(target)) as f:
+        f.write(b"x")
+    writer.when_visible(str(target), lambda: seen.append(target.exists()))
+    writer.when_visible(str(tmp_path / "other.bin"), lambda: seen.append("other"))
+    assert seen == ["other"]
+    writer.commit()
+    assert seen == ["other", True]
+    writer.commit()
+    assert seen == ["other", True] # Each callback runs once
+
+def test_invalid_fsync_mode():
+    """Unknown fsync modes are rejected."""
+    with pytest.raises(ValueError, match="fsync must be one of"):
+        AtomicWriter(fsync="sometimes")